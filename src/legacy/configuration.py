@@ -1,7 +1,7 @@
 import os
 from enum import Enum
 from dataclasses import dataclass, fields
-from typing import Any, Optional, Dict, Literal
+from typing import Any, List, Optional, Dict, Literal
 
 from langchain_core.runnables import RunnableConfig
 
@@ -35,6 +35,10 @@ class Configuration:
     report_structure: str = DEFAULT_REPORT_STRUCTURE
     search_api: SearchAPI = SearchAPI.TAVILY
     search_api_config: Optional[Dict[str, Any]] = None
+    additional_search_apis: Optional[List[SearchAPI]] = None # Queried concurrently with search_api, results merged
+    search_provider_timeout: float = 30.0 # Deadline of each search provider, in seconds
+    search_quorum: Optional[int] = None # Providers that must answer before searching stops (default: all)
+    search_time_budget: float = 45.0 # Overall search deadline, in seconds
     process_search_results: Literal["summarize", "split_and_rerank"] | None = None
     summarization_model_provider: str = "openai"
     summarization_model: str = "gpt-4.1"
@@ -35,6 +35,7 @@ from legacy.utils import (
     get_config_value, 
     get_search_params, 
     select_and_execute_search,
+    SearchFanout,
     get_today_str
 )
 
@@ -101,7 +102,7 @@ async def generate_report_plan(state: ReportState, config: RunnableConfig):
     query_list = [query.search_query for query in results.queries]
 
     # Search the web with parameters
-    source_str = await select_and_execute_search(search_api, query_list, params_to_pass)
+    source_str = await select_and_execute_search(search_api, query_list, params_to_pass, fanout=SearchFanout.from_configuration(configurable))
 
     # Format system instructions
     system_instructions_sections = report_planner_instructions.format(topic=topic, report_organization=report_structure, context=source_str, feedback=feedback)
@@ -261,7 +262,7 @@ async def search_web(state: SectionState, config: RunnableConfig):
     query_list = [query.search_query for query in search_queries]
 
     # Search the web with parameters
-    source_str = await select_and_execute_search(search_api, query_list, params_to_pass)
+    source_str = await select_and_execute_search(search_api, query_list, params_to_pass, fanout=SearchFanout.from_configuration(configurable))
 
     return {"source_str": source_str, "search_iterations": state["search_iterations"] + 1}
 
@@ -1,46 +1,67 @@
-import os
 import asyncio
-import json
-import datetime
-import requests
-import random 
 import concurrent
+import concurrent.futures
+import datetime
 import hashlib
-import aiohttp
-import httpx
-import time
-from typing import List, Optional, Dict, Any, Union, Literal, Annotated, cast
-from urllib.parse import unquote
-from collections import defaultdict
 import itertools
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import (
+    Annotated,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Union,
+    cast,
+)
+from urllib.parse import unquote, urlparse
 
-from exa_py import Exa
-from linkup import LinkupClient
-from tavily import AsyncTavilyClient
+import aiohttp
+import httpx
+import numpy as np
+import requests
 from azure.core.credentials import AzureKeyCredential
 from azure.search.documents.aio import SearchClient as AsyncAzureAISearchClient
-from duckduckgo_search import DDGS 
 from bs4 import BeautifulSoup
-from markdownify import markdownify
-from pydantic import BaseModel
+from duckduckgo_search import DDGS
+from exa_py import Exa
 from langchain.chat_models import init_chat_model
 from langchain.embeddings import init_embeddings
+from langchain_anthropic import ChatAnthropic
+from langchain_community.retrievers import ArxivRetriever
+from langchain_community.utilities.pubmed import PubMedAPIWrapper
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
-from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import InjectedToolArg
-from langchain_core.vectorstores import InMemoryVectorStore
-from langchain_community.retrievers import ArxivRetriever
-from langchain_community.utilities.pubmed import PubMedAPIWrapper
-from langchain_core.tools import tool
+from langchain_core.tools import InjectedToolArg, tool
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langsmith import traceable
+from linkup import LinkupClient
+from markdownify import markdownify
+from pydantic import BaseModel
+from tavily import AsyncTavilyClient
 
 from legacy.configuration import Configuration
-from legacy.state import Section
 from legacy.prompts import SUMMARIZATION_PROMPT
+from legacy.state import Section
+from open_deep_research.url_canonical import url_key
+
+try:
+    import fcntl
+except ImportError:  # Windows: the disk embedding cache is then single-process
+    fcntl = None
 
 
 def get_config_value(value):
@@ -116,14 +137,18 @@ def deduplicate_and_format_sources(
     for response in search_response:
         sources_list.extend(response['results'])
 
-    # Deduplicate by URL
+    # Deduplicate by canonical URL (tracking parameters, www., fragments... ignored)
     if deduplication_strategy == "keep_first":
         unique_sources = {}
         for source in sources_list:
-            if source['url'] not in unique_sources:
-                unique_sources[source['url']] = source
+            key = url_key(source['url'])
+            if key not in unique_sources:
+                unique_sources[key] = source
+            elif not unique_sources[key].get('raw_content') and source.get('raw_content'):
+                # Same page from another provider: keep its full content
+                unique_sources[key] = {**unique_sources[key], 'raw_content': source['raw_content']}
     elif deduplication_strategy == "keep_last":
-        unique_sources = {source['url']: source for source in sources_list}
+        unique_sources = {url_key(source['url']): source for source in sources_list}
     else:
         raise ValueError(f"Invalid deduplication strategy: {deduplication_strategy}")
 
@@ -370,6 +395,124 @@ def perplexity_search(search_queries):
     
     return search_docs
 
+class AsyncRateLimiter:
+    """Token bucket shared by every request sent to one search provider.
+
+    `rate` permits are added per second, up to `burst`. `acquire` reserves a permit
+    and sleeps until it is due, so concurrent callers start at the allowed pace
+    instead of after a fixed worst-case delay. `penalize` pauses the bucket after a
+    rate limit response (honoring its Retry-After); callers still waiting at that
+    point take a new reservation after the pause.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        """Create a full bucket: the first `burst` requests are sent at once."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._epoch = 0
+
+    def _reserve(self, cost: float) -> float:
+        """Take `cost` permits and return the seconds to wait before using them."""
+        now = time.monotonic()
+        start = max(now, self._blocked_until)
+        if start > self._updated:
+            self._tokens = min(self.burst, self._tokens + (start - self._updated) * self.rate)
+            self._updated = start
+        self._tokens -= cost
+        return start - now + max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        """Wait until `cost` permits are available (a request spending several API calls costs more)."""
+        while True:
+            epoch = self._epoch
+            delay = self._reserve(cost)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if epoch == self._epoch:
+                return
+
+    def penalize(self, retry_after: float) -> None:
+        """Stop handing out permits for `retry_after` seconds, then resume at the nominal rate."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        self._updated = self._blocked_until
+        self._tokens = min(1.0, self.burst)
+        self._epoch += 1
+
+
+# Published rate limits: (permits per second, burst)
+SEARCH_RATE_LIMITS: Dict[str, tuple] = {
+    "arxiv": (1 / 3, 1),        # 1 request every 3 seconds
+    "pubmed": (3.0, 3),         # NCBI E-utilities without an API key
+    "pubmed_api_key": (10.0, 10),  # NCBI E-utilities with an API key
+    "exa": (5.0, 5),
+}
+
+_rate_limiters: Dict[str, AsyncRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str) -> AsyncRateLimiter:
+    """Process-wide limiter of a provider listed in SEARCH_RATE_LIMITS."""
+    if provider not in _rate_limiters:
+        rate, burst = SEARCH_RATE_LIMITS[provider]
+        _rate_limiters[provider] = AsyncRateLimiter(rate, burst)
+    return _rate_limiters[provider]
+
+
+def rate_limit_retry_after(error: Exception) -> Optional[float]:
+    """Seconds to back off when `error` is a rate limit response, None for any other error.
+
+    Reads the Retry-After header (seconds or HTTP date) from requests/httpx errors
+    (`error.response.headers`) and urllib errors (`error.headers`). Rate limit errors
+    without the header back off for 5 seconds.
+    """
+    response = getattr(error, "response", None)
+    status = (
+        getattr(response, "status_code", None)
+        or getattr(error, "status_code", None)
+        or getattr(error, "code", None)
+        or getattr(error, "status", None)
+    )
+    if status != 429 and "429" not in str(error) and "Too Many Requests" not in str(error):
+        return None
+
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    retry_after = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            from email.utils import parsedate_to_datetime
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    return 5.0
+
+
+async def run_rate_limited(provider: str, fn: Callable[[], Any], cost: float = 1.0, max_retries: int = 2) -> Any:
+    """Run the blocking call `fn` in a thread once the provider's limiter grants a permit.
+
+    Only the start of each call is paced: the work itself (HTTP round trips, PDF
+    parsing...) runs in the thread pool while other queries wait for their permit.
+    Rate limit errors pause the provider's limiter and are retried up to `max_retries` times.
+    """
+    limiter = get_rate_limiter(provider)
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(cost)
+        try:
+            return await asyncio.to_thread(fn)
+        except Exception as e:
+            retry_after = rate_limit_retry_after(e)
+            if retry_after is None or attempt == max_retries:
+                raise
+            print(f"{provider} rate limit exceeded. Retrying in {retry_after:.1f}s...")
+            limiter.penalize(retry_after)
+
+
 @traceable
 async def exa_search(search_queries, max_characters: Optional[int] = None, num_results=5, 
                      include_domains: Optional[List[str]] = None, 
@@ -416,9 +559,6 @@ async def exa_search(search_queries, max_characters: Optional[int] = None, num_r
     
     # Define the function to process a single query
     async def process_query(query):
-        # Use run_in_executor to make the synchronous exa call in a non-blocking way
-        loop = asyncio.get_event_loop()
-        
         # Define the function for the executor with all parameters
         def exa_search_fn():
             # Build parameters dictionary
@@ -440,7 +580,8 @@ async def exa_search(search_queries, max_characters: Optional[int] = None, num_r
                 
             return exa.search_and_contents(query, **kwargs)
         
-        response = await loop.run_in_executor(None, exa_search_fn)
+        # Run the synchronous exa call in a thread once the Exa rate limiter grants a permit
+        response = await run_rate_limited("exa", exa_search_fn)
         
         # Format the response to match the expected output structure
         formatted_results = []
@@ -543,35 +684,25 @@ async def exa_search(search_queries, max_characters: Optional[int] = None, num_r
             "results": formatted_results
         }
     
-    # Process all queries sequentially with delay to respect rate limit
-    search_docs = []
-    for i, query in enumerate(search_queries):
+    async def process_query_safely(query):
         try:
-            # Add delay between requests (0.25s = 4 requests per second, well within the 5/s limit)
-            if i > 0:  # Don't delay the first request
-                await asyncio.sleep(0.25)
-            
-            result = await process_query(query)
-            search_docs.append(result)
+            return await process_query(query)
         except Exception as e:
             # Handle exceptions gracefully
             print(f"Error processing query '{query}': {str(e)}")
             # Add a placeholder result for failed queries to maintain index alignment
-            search_docs.append({
+            return {
                 "query": query,
                 "follow_up_questions": None,
                 "answer": None,
                 "images": [],
                 "results": [],
                 "error": str(e)
-            })
-            
-            # Add additional delay if we hit a rate limit error
-            if "429" in str(e):
-                print("Rate limit exceeded. Adding additional delay...")
-                await asyncio.sleep(1.0)  # Add a longer delay if we hit a rate limit
+            }
     
-    return search_docs
+    # Process all queries concurrently, paced by the shared Exa rate limiter (5 requests per second)
+    search_docs = await asyncio.gather(*(process_query_safely(query) for query in search_queries))
+    return list(search_docs)
 
 @traceable
 async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents=True, load_all_available_meta=True):
@@ -613,9 +744,9 @@ async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents
                 load_all_available_meta=load_all_available_meta
             )
             
-            # Run the synchronous retriever in a thread pool
-            loop = asyncio.get_event_loop()
-            docs = await loop.run_in_executor(None, lambda: retriever.invoke(query))
+            # Run the synchronous retriever (search, PDF download and parsing) in a thread pool.
+            # Only its start is paced, so parsing overlaps with waiting for the next permit.
+            docs = await run_rate_limited("arxiv", lambda: retriever.invoke(query))
             
             results = []
             # Assign decreasing scores based on the order
@@ -701,34 +832,9 @@ async def arxiv_search_async(search_queries, load_max_docs=5, get_full_documents
                 'error': str(e)
             }
     
-    # Process queries sequentially with delay to respect arXiv rate limit (1 request per 3 seconds)
-    search_docs = []
-    for i, query in enumerate(search_queries):
-        try:
-            # Add delay between requests (3 seconds per ArXiv's rate limit)
-            if i > 0:  # Don't delay the first request
-                await asyncio.sleep(3.0)
-            
-            result = await process_single_query(query)
-            search_docs.append(result)
-        except Exception as e:
-            # Handle exceptions gracefully
-            print(f"Error processing arXiv query '{query}': {str(e)}")
-            search_docs.append({
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            })
-            
-            # Add additional delay if we hit a rate limit error
-            if "429" in str(e) or "Too Many Requests" in str(e):
-                print("ArXiv rate limit exceeded. Adding additional delay...")
-                await asyncio.sleep(5.0)  # Add a longer delay if we hit a rate limit
-    
-    return search_docs
+    # Process queries concurrently, paced by the shared arXiv rate limiter (1 request per 3 seconds)
+    search_docs = await asyncio.gather(*(process_single_query(query) for query in search_queries))
+    return list(search_docs)
 
 @traceable
 async def pubmed_search_async(search_queries, top_k_results=5, email=None, api_key=None, doc_content_chars_max=4000):
@@ -774,11 +880,14 @@ async def pubmed_search_async(search_queries, top_k_results=5, email=None, api_k
                 api_key=api_key if api_key else ""
             )
             
-            # Run the synchronous wrapper in a thread pool
-            loop = asyncio.get_event_loop()
-            
+            # Run the synchronous wrapper in a thread pool once the PubMed rate limiter grants a permit.
+            # A query costs one esearch call plus one efetch call per returned article.
             # Use wrapper.lazy_load instead of load to get better visibility
-            docs = await loop.run_in_executor(None, lambda: list(wrapper.lazy_load(query)))
+            docs = await run_rate_limited(
+                "pubmed_api_key" if api_key else "pubmed",
+                lambda: list(wrapper.lazy_load(query)),
+                cost=1 + top_k_results,
+            )
             
             print(f"Query '{query}' returned {len(docs)} results")
             
@@ -839,44 +948,10 @@ async def pubmed_search_async(search_queries, top_k_results=5, email=None, api_k
                 'error': str(e)
             }
     
-    # Process all queries with a reasonable delay between them
-    search_docs = []
-    
-    # Start with a small delay that increases if we encounter rate limiting
-    delay = 1.0  # Start with a more conservative delay
-    
-    for i, query in enumerate(search_queries):
-        try:
-            # Add delay between requests
-            if i > 0:  # Don't delay the first request
-                # print(f"Waiting {delay} seconds before next query...")
-                await asyncio.sleep(delay)
-            
-            result = await process_single_query(query)
-            search_docs.append(result)
-            
-            # If query was successful with results, we can slightly reduce delay (but not below minimum)
-            if result.get('results') and len(result['results']) > 0:
-                delay = max(0.5, delay * 0.9)  # Don't go below 0.5 seconds
-            
-        except Exception as e:
-            # Handle exceptions gracefully
-            error_msg = f"Error in main loop processing PubMed query '{query}': {str(e)}"
-            print(error_msg)
-            
-            search_docs.append({
-                'query': query,
-                'follow_up_questions': None,
-                'answer': None,
-                'images': [],
-                'results': [],
-                'error': str(e)
-            })
-            
-            # If we hit an exception, increase delay for next query
-            delay = min(5.0, delay * 1.5)  # Don't exceed 5 seconds
-    
-    return search_docs
+    # Process all queries concurrently, paced by the shared PubMed rate limiter
+    # (3 requests per second, 10 with an API key)
+    search_docs = await asyncio.gather(*(process_single_query(query) for query in search_queries))
+    return list(search_docs)
 
 @traceable
 async def linkup_search(search_queries, depth: Optional[str] = "standard"):
@@ -1185,14 +1260,129 @@ async def google_search_async(search_queries: Union[str, List[str]], max_results
         if executor:
             executor.shutdown(wait=False)
 
+# Page scraping limits
+SCRAPE_MAX_CONCURRENCY = 10             # Pages fetched at the same time
+SCRAPE_MAX_CONNECTIONS_PER_HOST = 2     # Pages fetched at the same time from one host
+SCRAPE_MAX_BYTES = 2 * 1024 * 1024      # Body bytes read per page, the rest is dropped
+SCRAPE_CACHE_MAX_ENTRIES = 256          # Pages kept for conditional revalidation
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+GENERIC_CONTENT_TYPES = ("", "application/octet-stream", "binary/octet-stream")
+
+
+@dataclass
+class ScrapedPage:
+    """Markdown of a page with the validators used to revalidate it (ETag / Last-Modified)."""
+    content: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+# Scraped pages by canonical URL (LRU, only pages sent with a validator)
+_scrape_cache: "OrderedDict[str, ScrapedPage]" = OrderedDict()
+
+
+@lru_cache(maxsize=1)
+def get_markdown_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Process pool running markdownify, which is CPU bound and would block the event loop.
+
+    Workers are spawned, not forked: forking a process that already runs an event loop,
+    HTTP client pools and threads can copy held locks into the child and deadlock it.
+    """
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(4, os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+async def html_to_markdown(html: str) -> str:
+    """Convert HTML to markdown in the process pool, in a thread when the pool is unavailable."""
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_markdown_executor(), markdownify, html)
+    except (OSError, concurrent.futures.process.BrokenProcessPool):
+        get_markdown_executor.cache_clear()
+        return await asyncio.to_thread(markdownify, html)
+
+
+def sniff_content_type(content_type: str, head: bytes) -> str:
+    """Media type of a response, guessed from its first bytes when the header is missing or generic."""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in GENERIC_CONTENT_TYPES:
+        return media_type
+    start = head[:1024].lstrip().lower()
+    if start.startswith(b"%pdf"):
+        return "application/pdf"
+    if start.startswith((b"<!doctype html", b"<html")) or b"<html" in start:
+        return "text/html"
+    return media_type or "application/octet-stream"
+
+
+async def fetch_page_markdown(client: httpx.AsyncClient, url: str, host_limit: asyncio.Semaphore) -> str:
+    """Fetch one page and return its markdown (or a short note for non-HTML content).
+
+    Revalidates a cached copy with If-None-Match / If-Modified-Since, skips the body of
+    non-HTML responses, reads at most SCRAPE_MAX_BYTES and converts outside of the
+    host's connection slot.
+    """
+    cache_key = url_key(url)
+    cached = _scrape_cache.get(cache_key)
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    async with host_limit:
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                _scrape_cache.move_to_end(cache_key)
+                return cached.content
+            response.raise_for_status()
+            if response.status_code != 200:
+                return f"Error: Received status code {response.status_code}"
+
+            # Skip the download when the headers already tell the page is not HTML
+            content_type = response.headers.get("Content-Type", "")
+            media_type = sniff_content_type(content_type, b"")
+            if media_type not in GENERIC_CONTENT_TYPES and media_type not in HTML_CONTENT_TYPES:
+                return f"Content type: {content_type} (not converted to markdown)"
+
+            body = bytearray()
+            truncated = False
+            async for chunk in response.aiter_bytes():
+                if not body and media_type in GENERIC_CONTENT_TYPES:
+                    media_type = sniff_content_type(content_type, chunk)
+                    if media_type not in HTML_CONTENT_TYPES:
+                        return f"Content type: {content_type or media_type} (not converted to markdown)"
+                body += chunk
+                if len(body) > SCRAPE_MAX_BYTES:
+                    # Stop reading: closing the stream drops the rest of the body
+                    del body[SCRAPE_MAX_BYTES:]
+                    truncated = True
+                    break
+            html = bytes(body).decode(response.charset_encoding or "utf-8", errors="replace")
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+    content = await html_to_markdown(html)
+    if truncated:
+        content += f"\n\n[Content truncated after {SCRAPE_MAX_BYTES} bytes]"
+    if etag or last_modified:
+        _scrape_cache[cache_key] = ScrapedPage(content, etag, last_modified)
+        _scrape_cache.move_to_end(cache_key)
+        while len(_scrape_cache) > SCRAPE_CACHE_MAX_ENTRIES:
+            _scrape_cache.popitem(last=False)
+    return content
+
+
 async def scrape_pages(titles: List[str], urls: List[str]) -> str:
     """
     Scrapes content from a list of URLs and formats it into a readable markdown document.
     
     This function:
     1. Takes a list of page titles and URLs
-    2. Makes asynchronous HTTP requests to each URL
-    3. Converts HTML content to markdown
+    2. Fetches the URLs concurrently (at most SCRAPE_MAX_CONNECTIONS_PER_HOST per host),
+       revalidating pages already scraped with their ETag / Last-Modified
+    3. Converts HTML content to markdown in a process pool
     4. Formats all content with clear source attribution
     
     Args:
@@ -1205,33 +1395,21 @@ async def scrape_pages(titles: List[str], urls: List[str]) -> str:
     """
     
     # Create an async HTTP client
-    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
-        pages = []
+    limits = httpx.Limits(max_connections=SCRAPE_MAX_CONCURRENCY, max_keepalive_connections=SCRAPE_MAX_CONCURRENCY)
+    async with httpx.AsyncClient(follow_redirects=True, timeout=30.0, limits=limits) as client:
+        semaphore = asyncio.Semaphore(SCRAPE_MAX_CONCURRENCY)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(SCRAPE_MAX_CONNECTIONS_PER_HOST))
         
-        # Fetch each URL and convert to markdown
-        for url in urls:
-            try:
-                # Fetch the content
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                # Convert HTML to markdown if successful
-                if response.status_code == 200:
-                    # Handle different content types
-                    content_type = response.headers.get('Content-Type', '')
-                    if 'text/html' in content_type:
-                        # Convert HTML to markdown
-                        markdown_content = markdownify(response.text)
-                        pages.append(markdown_content)
-                    else:
-                        # For non-HTML content, just mention the content type
-                        pages.append(f"Content type: {content_type} (not converted to markdown)")
-                else:
-                    pages.append(f"Error: Received status code {response.status_code}")
+        async def fetch(url):
+            async with semaphore:
+                try:
+                    return await fetch_page_markdown(client, url, host_limits[urlparse(url).hostname])
+                except Exception as e:
+                    # Handle any exceptions during fetch
+                    return f"Error fetching URL: {str(e)}"
         
-            except Exception as e:
-                # Handle any exceptions during fetch
-                pages.append(f"Error fetching URL: {str(e)}")
+        # Fetch every URL concurrently and convert to markdown
+        pages = await asyncio.gather(*(fetch(url) for url in urls))
         
         # Create formatted output
         formatted_output = f"Search results: \n\n"
@@ -1498,13 +1676,134 @@ async def azureaisearch_search(queries: List[str], max_results: int = 5, topic:
         return "No valid search results found. Please try different search queries or use a different search API."
 
 
-async def select_and_execute_search(search_api: str, query_list: list[str], params_to_pass: dict) -> str:
+# Search providers returning structured responses ({'query': str, 'results': [...]}, one per query)
+SEARCH_PROVIDERS: Dict[str, Callable[..., Awaitable[List[dict]]]] = {
+    "tavily": tavily_search_async,
+    "perplexity": lambda search_queries, **params: asyncio.to_thread(perplexity_search, search_queries, **params),
+    "exa": exa_search,
+    "arxiv": arxiv_search_async,
+    "pubmed": pubmed_search_async,
+    "linkup": linkup_search,
+    "googlesearch": google_search_async,
+    "azureaisearch": azureaisearch_search_async,
+}
+
+
+@dataclass
+class SearchFanout:
+    """Additional search providers queried concurrently with the configured `search_api`.
+
+    Every provider gets `provider_timeout` seconds. The fan-out returns as soon as
+    `quorum` providers answered (default: all of them) or when `time_budget`
+    seconds elapsed, with the results gathered so far.
+    """
+    providers: List[str]
+    search_api_config: Dict[str, Any]
+    provider_timeout: float = 30.0
+    quorum: Optional[int] = None
+    time_budget: float = 45.0
+
+    @classmethod
+    def from_configuration(cls, configurable: Configuration) -> Optional["SearchFanout"]:
+        """Build the fan-out settings of a configuration, None when no additional provider is set."""
+        providers = configurable.additional_search_apis or []
+        if isinstance(providers, str):
+            providers = providers.split(",")
+        providers = [get_config_value(provider).strip().lower() for provider in providers]
+        providers = [provider for provider in providers if provider and provider != "none"]
+        if not providers:
+            return None
+        return cls(
+            providers=providers,
+            search_api_config=configurable.search_api_config or {},
+            provider_timeout=float(configurable.search_provider_timeout),
+            quorum=int(configurable.search_quorum) if configurable.search_quorum else None,
+            time_budget=float(configurable.search_time_budget),
+        )
+
+
+async def fan_out_search(
+    providers: Dict[str, Dict[str, Any]],
+    query_list: list[str],
+    provider_timeout: float = 30.0,
+    quorum: Optional[int] = None,
+    time_budget: float = 45.0
+) -> List[dict]:
+    """Query several search providers concurrently and merge their responses.
+
+    Args:
+        providers: Provider names (keys of SEARCH_PROVIDERS), in priority order, with their parameters
+        query_list: Search queries sent to every provider
+        provider_timeout: Deadline of each provider, in seconds
+        quorum: Number of providers that must answer before returning (default: all)
+        time_budget: Overall deadline, in seconds: slower providers are cancelled
+
+    Returns:
+        Search responses of the providers that answered in time, in priority order. Results
+        are deduplicated by canonical URL across providers, the first provider keeping them.
+    """
+    unknown = [name for name in providers if name not in SEARCH_PROVIDERS]
+    if unknown:
+        raise ValueError(f"Search API(s) {', '.join(unknown)} cannot be combined with other providers")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + time_budget
+    tasks = {
+        asyncio.create_task(asyncio.wait_for(SEARCH_PROVIDERS[name](query_list, **params), provider_timeout)): name
+        for name, params in providers.items()
+    }
+    quorum = min(quorum or len(tasks), len(tasks))
+
+    responses_by_provider: Dict[str, List[dict]] = {}
+    pending = set(tasks)
+    while pending and len(responses_by_provider) < quorum:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = tasks[task]
+            try:
+                responses_by_provider[name] = task.result()
+            except asyncio.TimeoutError:
+                print(f"Search provider {name} timed out after {provider_timeout}s")
+            except Exception as e:
+                print(f"Search provider {name} failed: {str(e)}")
+    for task in pending:
+        print(f"Search provider {tasks[task]} cancelled: quorum or time budget reached")
+        task.cancel()
+
+    # Merge in priority order, each canonical URL kept once
+    kept: Dict[str, dict] = {}
+    merged = []
+    for name in providers:
+        for response in responses_by_provider.get(name) or []:
+            results = []
+            for result in response.get('results', []):
+                key = url_key(result['url'])
+                if key not in kept:
+                    kept[key] = {**result, 'provider': name}
+                    results.append(kept[key])
+                elif not kept[key].get('raw_content') and result.get('raw_content'):
+                    # Same page from a lower-priority provider: keep its full content
+                    kept[key]['raw_content'] = result['raw_content']
+            merged.append({**response, 'results': results})
+    return merged
+
+
+async def select_and_execute_search(
+    search_api: str,
+    query_list: list[str],
+    params_to_pass: dict,
+    fanout: Optional[SearchFanout] = None
+) -> str:
     """Select and execute the appropriate search API.
     
     Args:
         search_api: Name of the search API to use
         query_list: List of search queries to execute
         params_to_pass: Parameters to pass to the search API
+        fanout: Additional providers to query concurrently (see SearchFanout)
         
     Returns:
         Formatted string containing search results
@@ -1512,27 +1811,26 @@ async def select_and_execute_search(search_api: str, query_list: list[str], para
     Raises:
         ValueError: If an unsupported search API is specified
     """
-    if search_api == "tavily":
+    if fanout and fanout.providers:
+        providers = {search_api: params_to_pass}
+        for provider in fanout.providers:
+            providers.setdefault(provider, get_search_params(provider, fanout.search_api_config))
+        search_results = await fan_out_search(
+            providers,
+            query_list,
+            provider_timeout=fanout.provider_timeout,
+            quorum=fanout.quorum,
+            time_budget=fanout.time_budget,
+        )
+    elif search_api == "tavily":
         # Tavily search tool used with both workflow and agent 
         # and returns a formatted source string
         return await tavily_search.ainvoke({'queries': query_list, **params_to_pass})
     elif search_api == "duckduckgo":
         # DuckDuckGo search tool used with both workflow and agent 
         return await duckduckgo_search.ainvoke({'search_queries': query_list})
-    elif search_api == "perplexity":
-        search_results = perplexity_search(query_list, **params_to_pass)
-    elif search_api == "exa":
-        search_results = await exa_search(query_list, **params_to_pass)
-    elif search_api == "arxiv":
-        search_results = await arxiv_search_async(query_list, **params_to_pass)
-    elif search_api == "pubmed":
-        search_results = await pubmed_search_async(query_list, **params_to_pass)
-    elif search_api == "linkup":
-        search_results = await linkup_search(query_list, **params_to_pass)
-    elif search_api == "googlesearch":
-        search_results = await google_search_async(query_list, **params_to_pass)
-    elif search_api == "azureaisearch":
-        search_results = await azureaisearch_search_async(query_list, **params_to_pass)
+    elif search_api in SEARCH_PROVIDERS:
+        search_results = await SEARCH_PROVIDERS[search_api](query_list, **params_to_pass)
     else:
         raise ValueError(f"Unsupported search API: {search_api}")
 
@@ -1570,6 +1868,162 @@ async def summarize_webpage(model: BaseChatModel, webpage_content: str) -> str:
     return format_summary(summary)
 
 
+class EmbeddingCache:
+    """Embeddings of text chunks keyed by a hash of (model, text), kept in memory and on disk.
+
+    On disk every model gets a directory holding `vectors.f32` (one float32 row per
+    chunk, read through `np.memmap`) and `keys.txt` (the hash of row i on line i).
+    Rows are appended under an exclusive file lock and each writer first picks up the
+    rows appended by other processes, so several workers can share the directory.
+    Pass `path=None` to keep the cache in memory only.
+    """
+
+    def __init__(self, model: str, path: Optional[str] = None, max_memory_entries: int = 50_000):
+        """Create the cache of `model`, backed by a directory under `path` when one is given."""
+        self.model = model
+        self.max_memory_entries = max_memory_entries
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._directory = None
+        self._rows: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._dimension: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        if path:
+            self._directory = os.path.join(path, hashlib.sha256(model.encode()).hexdigest()[:16])
+            os.makedirs(self._directory, exist_ok=True)
+            with open(os.path.join(self._directory, "model.txt"), "w", encoding="utf-8") as f:
+                f.write(model)
+            self._sync_disk()
+
+    def key(self, text: str) -> str:
+        """Hash of the model name and `text`, so a model change never reuses stale vectors."""
+        return hashlib.sha256(f"{self.model}\0{text}".encode()).hexdigest()
+
+    # Disk -------------------------------------------------------------------
+
+    def _sync_disk(self) -> None:
+        """Read the keys appended since the last sync and remap the vectors file."""
+        keys_path = os.path.join(self._directory, "keys.txt")
+        vectors_path = os.path.join(self._directory, "vectors.f32")
+        if not os.path.exists(keys_path):
+            return
+        with open(keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            new_keys = f.read()
+        # Ignore a trailing partial line, written by a process that is still appending
+        complete = new_keys[:new_keys.rfind(b"\n") + 1]
+        if not complete:
+            return
+        self._keys_offset += len(complete)
+        for line in complete.decode().splitlines():
+            self._rows.setdefault(line, len(self._rows))
+        row_count = len(self._rows)
+        if self._dimension is None:
+            self._dimension = os.path.getsize(vectors_path) // (4 * row_count)
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(row_count, self._dimension))
+
+    def _append_disk(self, vectors: Dict[str, np.ndarray]) -> None:
+        with open(os.path.join(self._directory, "keys.lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._sync_disk()
+            new = {key: vector for key, vector in vectors.items() if key not in self._rows}
+            if not new:
+                return
+            matrix = np.asarray(list(new.values()), dtype=np.float32)
+            if self._dimension is None:
+                self._dimension = matrix.shape[1]
+            if matrix.shape[1] != self._dimension:
+                return
+            # Vectors first, at the row of the first new key, then the keys that make them visible
+            with open(os.path.join(self._directory, "vectors.f32"), "ab") as f:
+                f.truncate(len(self._rows) * self._dimension * 4)
+                f.write(matrix.tobytes())
+            with open(os.path.join(self._directory, "keys.txt"), "ab") as f:
+                f.write("".join(f"{key}\n" for key in new).encode())
+            self._sync_disk()
+
+    # Lookups -------------------------------------------------------------------
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return the cached vectors of `keys`; missing keys are absent from the result."""
+        found = {}
+        with self._lock:
+            if self._directory and any(key not in self._memory and key not in self._rows for key in keys):
+                self._sync_disk()
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                elif key in self._rows and self._vectors is not None:
+                    found[key] = self._remember(key, np.array(self._vectors[self._rows[key]]))
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Cache `vectors` in memory and append them to the disk cache, if any."""
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, np.asarray(vector, dtype=np.float32))
+            if self._directory:
+                try:
+                    self._append_disk(vectors)
+                except OSError as e:
+                    print(f"Could not write the embedding cache: {e}")
+
+    def _remember(self, key: str, vector: np.ndarray) -> np.ndarray:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+        return vector
+
+
+def embedding_model_name(embeddings: Embeddings) -> str:
+    """Identify the model behind an Embeddings instance, vectors of different models never mix."""
+    model = getattr(embeddings, "model", None) or getattr(embeddings, "model_name", None)
+    return f"{type(embeddings).__name__}:{model}"
+
+
+_embedding_caches: Dict[str, EmbeddingCache] = {}
+
+
+def get_embedding_cache(embeddings: Embeddings) -> EmbeddingCache:
+    """Process-wide cache of a model, in memory only unless EMBEDDING_CACHE_PATH names a directory."""
+    model = embedding_model_name(embeddings)
+    if model not in _embedding_caches:
+        _embedding_caches[model] = EmbeddingCache(model, os.getenv("EMBEDDING_CACHE_PATH") or None)
+    return _embedding_caches[model]
+
+
+def embed_with_cache(embeddings: Embeddings, texts: List[str], query: bool = False) -> np.ndarray:
+    """Embed `texts` as a float32 matrix, calling the model once for the chunks not cached yet."""
+    cache = get_embedding_cache(embeddings)
+    keys = [cache.key(f"query:{text}" if query else text) for text in texts]
+    vectors = cache.get_many(keys)
+    missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+    if missing:
+        if query:
+            computed = [embeddings.embed_query(text) for text in missing.values()]
+        else:
+            computed = embeddings.embed_documents(list(missing.values()))
+        new_vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, computed)}
+        cache.put_many(new_vectors)
+        vectors.update(new_vectors)
+    return np.vstack([vectors[key] for key in keys])
+
+
+def top_k_by_cosine(query_vector: np.ndarray, matrix: np.ndarray, k: int) -> List[int]:
+    """Row indices of the `k` rows of `matrix` most similar to `query_vector`, best first."""
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+    scores = (matrix @ query_vector) / np.where(norms == 0, 1.0, norms)
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")].tolist()
+
+
 def split_and_rerank_search_results(embeddings: Embeddings, query: str, search_results: list[dict], max_chunks: int = 5):
     # split webpage content into chunks
     text_splitter = RecursiveCharacterTextSplitter(
@@ -1583,14 +2037,15 @@ def split_and_rerank_search_results(embeddings: Embeddings, query: str, search_r
         for result in search_results
     ]
     all_splits = text_splitter.split_documents(documents)
+    if not all_splits:
+        return []
 
-    # index chunks
-    vector_store = InMemoryVectorStore(embeddings)
-    vector_store.add_documents(documents=all_splits)
+    # embed chunks (only the ones never seen before reach the model)
+    chunk_vectors = embed_with_cache(embeddings, [split.page_content for split in all_splits])
+    query_vector = embed_with_cache(embeddings, [query], query=True)[0]
 
-    # retrieve relevant chunks
-    retrieved_docs = vector_store.similarity_search(query, k=max_chunks)
-    return retrieved_docs
+    # retrieve relevant chunks (cosine similarity, like InMemoryVectorStore)
+    return [all_splits[i] for i in top_k_by_cosine(query_vector, chunk_vectors, max_chunks)]
 
 
 def stitch_documents_by_url(documents: list[Document]) -> list[Document]:
@@ -0,0 +1,468 @@
+"""Per-owner admission control for research runs.
+
+Every run is created through the ``threads.create_run`` auth handler, which
+knows the owner of the run. This module decides when the run may start, so that
+one tenant launching dozens of runs cannot starve the others of provider quota:
+
+- Rate: a token bucket per owner (``runs_per_minute``, bursts up to the same amount)
+- Concurrency: at most ``max_concurrent_runs`` runs per owner, and optionally
+  ``global_max_concurrent_runs`` in total, shared fairly: when the global limit
+  is set, each active owner gets at most an equal share of it
+- Fair queue: a run over a limit is not rejected but delayed (the run's
+  ``after_seconds``) to the first slot where it fits, in per-owner FIFO order.
+  Only runs that would wait more than ``max_queue_delay_seconds`` are rejected
+  (HTTP 429 + Retry-After)
+- Usage counters per owner: admitted, delayed and rejected runs, total delay
+
+Auth handlers do not see runs finish: the graphs free the slot themselves, their
+nodes are wrapped with ``ends_run`` which calls ``release`` when the run reaches
+END or a node raises. ``run_lease_seconds`` (the longest expected run) only
+bounds how long a slot stays held when a run dies without reaching either, e.g.
+a killed worker.
+
+State is kept in memory (one server process) or in a shared SQLite file
+(``AUTH_ADMISSION_DB``) when several workers serve the same deployment.
+"""
+
+import asyncio
+import functools
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from langgraph.graph import END
+from langgraph.types import Command
+
+from open_deep_research.metrics import REGISTRY
+
+# =============================================================================
+# LIMITS AND DECISIONS
+# =============================================================================
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    """Admission limits, shared by every owner."""
+
+    max_concurrent_runs: int = 3
+    runs_per_minute: float = 10.0
+    global_max_concurrent_runs: int = 0  # 0: no global limit
+    run_lease_seconds: float = 900.0
+    max_queue_delay_seconds: float = 3600.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionLimits":
+        """Read the limits from the ``AUTH_*`` environment variables."""
+        return cls(
+            max_concurrent_runs=int(os.getenv("AUTH_MAX_CONCURRENT_RUNS", "3")),
+            runs_per_minute=float(os.getenv("AUTH_RUNS_PER_MINUTE", "10")),
+            global_max_concurrent_runs=int(os.getenv("AUTH_GLOBAL_MAX_CONCURRENT_RUNS", "0")),
+            run_lease_seconds=float(os.getenv("AUTH_RUN_LEASE_SECONDS", "900")),
+            max_queue_delay_seconds=float(os.getenv("AUTH_MAX_QUEUE_DELAY_SECONDS", "3600")),
+        )
+
+
+AdmissionStatus = Literal["admitted", "delayed", "rejected"]
+
+
+@dataclass
+class Admission:
+    """Admission decision for one run."""
+
+    status: AdmissionStatus
+    run_id: str
+    delay_seconds: float = 0.0
+    retry_after_seconds: Optional[int] = None
+    active_runs: int = 0
+
+    @property
+    def after_seconds(self) -> int:
+        """Delay to set on the run (whole seconds, rounded up)."""
+        return math.ceil(self.delay_seconds)
+
+
+@dataclass
+class OwnerUsage:
+    """Admission counters of one owner."""
+
+    admitted: int = 0
+    delayed: int = 0
+    rejected: int = 0
+    delay_seconds: float = 0.0
+    last_admitted_at: Optional[float] = None
+
+
+ADMISSION_RUNS = REGISTRY.counter(
+    "admission_runs_total", "Run admission decisions, by outcome",
+    ("outcome",),
+)
+ADMISSION_DELAY = REGISTRY.histogram(
+    "admission_delay_seconds", "Delay imposed on admitted runs",
+    (), (0, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+
+def _schedule(
+    limits: AdmissionLimits,
+    now: float,
+    not_before: float,
+    bucket: Optional[Tuple[float, float]],
+    owner_leases: List[Tuple[float, float]],
+    all_leases: List[Tuple[float, float]],
+    active_owners: int
+) -> Tuple[float, float]:
+    """Compute the earliest start of a new run.
+
+    Args:
+        limits: Admission limits
+        now: Current time
+        not_before: Start requested by the caller
+        bucket: Owner token bucket ``(tokens, updated_at)``, None for a new owner
+        owner_leases: Live ``(start, end)`` leases of the owner
+        all_leases: Every live ``(start, end)`` lease (all owners)
+        active_owners: Owners holding a live lease, this one included
+
+    Returns:
+        ``(start, tokens)``: start time of the run and the owner's bucket level once it is reserved
+    """
+    # Token bucket with reservation: a missing token is a wait, not a refusal
+    rate = limits.runs_per_minute / 60
+    burst = max(limits.runs_per_minute, 1.0)
+    tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+    start = max(now, not_before)
+    if tokens < 1 and rate > 0:
+        start = max(start, now + (1 - tokens) / rate)
+    tokens -= 1
+
+    # FIFO per owner: never start before a run the owner queued earlier
+    if owner_leases:
+        start = max(start, max(lease_start for lease_start, _ in owner_leases))
+
+    # Concurrency per owner: wait for enough of the owner's runs to end. With a
+    # global limit, the owner only gets its fair share of it
+    limit = limits.max_concurrent_runs
+    if limits.global_max_concurrent_runs > 0:
+        limit = min(limit, max(1, limits.global_max_concurrent_runs // max(active_owners, 1)))
+    overlapping = sorted(end for _, end in owner_leases if end > start)
+    if len(overlapping) >= limit:
+        start = overlapping[len(overlapping) - limit]
+
+    # Global concurrency: only runs started by then count, so that a newcomer is
+    # not queued behind the runs other owners have already queued
+    if limits.global_max_concurrent_runs > 0:
+        running = sorted(end for lease_start, end in all_leases if lease_start <= start < end)
+        if len(running) >= limits.global_max_concurrent_runs:
+            start = running[len(running) - limits.global_max_concurrent_runs]
+    return start, tokens
+
+
+def _decide(limits: AdmissionLimits, run_id: str, now: float, start: float, active_runs: int) -> Admission:
+    delay = start - now
+    if delay > limits.max_queue_delay_seconds:
+        return Admission(
+            status="rejected",
+            run_id=run_id,
+            delay_seconds=delay,
+            retry_after_seconds=max(1, math.ceil(delay - limits.max_queue_delay_seconds)),
+            active_runs=active_runs,
+        )
+    return Admission(
+        status="delayed" if delay >= 1 else "admitted",
+        run_id=run_id,
+        delay_seconds=delay if delay >= 1 else 0.0,
+        active_runs=active_runs,
+    )
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+@dataclass
+class _OwnerState:
+    tokens: float
+    updated_at: float
+    leases: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+
+class MemoryAdmissionController:
+    """Admission state of a single server process."""
+
+    def __init__(self, limits: AdmissionLimits):
+        """Create a controller with no runs admitted yet."""
+        self.limits = limits
+        self._owners: Dict[str, _OwnerState] = {}
+        self._usage: Dict[str, OwnerUsage] = {}
+        self._lock = threading.Lock()
+
+    def admit(self, owner: str, run_id: Optional[str] = None, after_seconds: float = 0.0) -> Admission:
+        """Decide when a new run of an owner may start, and reserve its slot unless rejected.
+
+        Args:
+            owner: Identity of the run owner
+            run_id: Run id (generated when missing), used by ``release``
+            after_seconds: Delay already requested for the run
+
+        Returns:
+            Admission decision
+        """
+        run_id = run_id or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            for state in self._owners.values():
+                for expired in [key for key, (_, end) in state.leases.items() if end <= now]:
+                    del state.leases[expired]
+            state = self._owners.get(owner)
+            owner_leases = list(state.leases.values()) if state else []
+            active_owners = sum(1 for name, other in self._owners.items() if other.leases and name != owner) + 1
+            all_leases = [lease for other in self._owners.values() for lease in other.leases.values()]
+            start, tokens = _schedule(
+                self.limits, now, now + after_seconds,
+                (state.tokens, state.updated_at) if state else None,
+                owner_leases, all_leases, active_owners,
+            )
+            admission = _decide(self.limits, run_id, now, start, sum(1 for lease_start, _ in owner_leases if lease_start <= now))
+            usage = self._usage.setdefault(owner, OwnerUsage())
+            _count(usage, admission, now)
+            if admission.status != "rejected":
+                if state is None:
+                    state = self._owners[owner] = _OwnerState(tokens, now)
+                state.tokens, state.updated_at = tokens, now
+                state.leases[run_id] = (start, start + self.limits.run_lease_seconds)
+        return admission
+
+    def release(self, run_id: str):
+        """Free the concurrency slot of a finished run."""
+        with self._lock:
+            for state in self._owners.values():
+                state.leases.pop(run_id, None)
+
+    def usage(self) -> Dict[str, OwnerUsage]:
+        """Admission counters by owner."""
+        with self._lock:
+            return {owner: OwnerUsage(**vars(usage)) for owner, usage in self._usage.items()}
+
+
+class SQLiteAdmissionController:
+    """Admission state shared by several worker processes through a SQLite file.
+
+    Each decision runs in one ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers see each other's reservations.
+    """
+
+    def __init__(self, path: str, limits: AdmissionLimits):
+        """Open (or create) the admission database at ``path``."""
+        self.path = path
+        self.limits = limits
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS admission_buckets (
+                    owner TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS admission_leases (
+                    run_id TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    starts_at REAL NOT NULL,
+                    ends_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS admission_leases_owner ON admission_leases (owner, ends_at);
+                CREATE TABLE IF NOT EXISTS admission_usage (
+                    owner TEXT PRIMARY KEY,
+                    admitted INTEGER NOT NULL DEFAULT 0,
+                    delayed INTEGER NOT NULL DEFAULT 0,
+                    rejected INTEGER NOT NULL DEFAULT 0,
+                    delay_seconds REAL NOT NULL DEFAULT 0,
+                    last_admitted_at REAL
+                );
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # isolation_level=None: transactions are opened explicitly (BEGIN IMMEDIATE)
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def admit(self, owner: str, run_id: Optional[str] = None, after_seconds: float = 0.0) -> Admission:
+        """Decide when a new run of an owner may start, and reserve its slot unless rejected.
+
+        Args:
+            owner: Identity of the run owner
+            run_id: Run id (generated when missing), used by ``release``
+            after_seconds: Delay already requested for the run
+
+        Returns:
+            Admission decision
+        """
+        run_id = run_id or uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM admission_leases WHERE ends_at <= ?", (now,))
+            bucket = connection.execute(
+                "SELECT tokens, updated_at FROM admission_buckets WHERE owner = ?", (owner,)
+            ).fetchone()
+            owner_leases = connection.execute(
+                "SELECT starts_at, ends_at FROM admission_leases WHERE owner = ?", (owner,)
+            ).fetchall()
+            all_leases = connection.execute("SELECT starts_at, ends_at FROM admission_leases").fetchall()
+            other_owners = connection.execute(
+                "SELECT COUNT(DISTINCT owner) FROM admission_leases WHERE owner != ?", (owner,)
+            ).fetchone()[0]
+            start, tokens = _schedule(
+                self.limits, now, now + after_seconds, bucket, owner_leases, all_leases, other_owners + 1,
+            )
+            admission = _decide(self.limits, run_id, now, start, sum(1 for lease_start, _ in owner_leases if lease_start <= now))
+            usage = OwnerUsage()
+            _count(usage, admission, now)
+            connection.execute(
+                """
+                INSERT INTO admission_usage (owner, admitted, delayed, rejected, delay_seconds, last_admitted_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (owner) DO UPDATE SET
+                    admitted = admitted + excluded.admitted,
+                    delayed = delayed + excluded.delayed,
+                    rejected = rejected + excluded.rejected,
+                    delay_seconds = delay_seconds + excluded.delay_seconds,
+                    last_admitted_at = COALESCE(excluded.last_admitted_at, last_admitted_at)
+                """,
+                (owner, usage.admitted, usage.delayed, usage.rejected, usage.delay_seconds, usage.last_admitted_at),
+            )
+            if admission.status != "rejected":
+                connection.execute(
+                    "INSERT OR REPLACE INTO admission_buckets VALUES (?, ?, ?)", (owner, tokens, now)
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO admission_leases VALUES (?, ?, ?, ?)",
+                    (run_id, owner, start, start + self.limits.run_lease_seconds),
+                )
+        return admission
+
+    def release(self, run_id: str):
+        """Free the concurrency slot of a finished run."""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM admission_leases WHERE run_id = ?", (run_id,))
+
+    def usage(self) -> Dict[str, OwnerUsage]:
+        """Admission counters by owner."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT owner, admitted, delayed, rejected, delay_seconds, last_admitted_at FROM admission_usage"
+            ).fetchall()
+        return {row[0]: OwnerUsage(*row[1:]) for row in rows}
+
+
+def _count(usage: OwnerUsage, admission: Admission, now: float):
+    """Add a decision to the owner's counters and to the process metrics."""
+    ADMISSION_RUNS.inc(outcome=admission.status)
+    if admission.status == "rejected":
+        usage.rejected += 1
+        return
+    usage.admitted += 1
+    usage.last_admitted_at = now
+    if admission.status == "delayed":
+        usage.delayed += 1
+        usage.delay_seconds += admission.delay_seconds
+    ADMISSION_DELAY.observe(admission.delay_seconds)
+
+
+# =============================================================================
+# SHARED CONTROLLER
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def get_admission_controller():
+    """Get the process-wide admission controller (SQLite when ``AUTH_ADMISSION_DB`` is set)."""
+    limits = AdmissionLimits.from_env()
+    path = os.getenv("AUTH_ADMISSION_DB")
+    if path:
+        return SQLiteAdmissionController(path, limits)
+    return MemoryAdmissionController(limits)
+
+
+async def admit_run(owner: str, run_id: Optional[str] = None, after_seconds: float = 0.0) -> Admission:
+    """Admit a run without blocking the event loop (the SQLite backend runs in a thread)."""
+    controller = get_admission_controller()
+    if isinstance(controller, SQLiteAdmissionController):
+        return await asyncio.to_thread(controller.admit, owner, run_id, after_seconds)
+    return controller.admit(owner, run_id, after_seconds)
+
+
+async def release_run(run_id: Optional[str]):
+    """Free the concurrency slot of a finished run (no-op without a run id)."""
+    if not run_id:
+        return
+    controller = get_admission_controller()
+    if isinstance(controller, SQLiteAdmissionController):
+        await asyncio.to_thread(controller.release, run_id)
+    else:
+        controller.release(run_id)
+
+
+def run_id_from_config(config: Optional[Mapping[str, Any]]) -> Optional[str]:
+    """Run id set by the LangGraph server in the run config, None outside of a server run."""
+    config = config or {}
+    run_id = (config.get("configurable") or {}).get("run_id") or (config.get("metadata") or {}).get("run_id")
+    return str(run_id) if run_id else None
+
+
+def ends_run(node: Callable[..., Awaitable[Any]], terminal: bool = False) -> Callable[..., Awaitable[Any]]:
+    """Wrap an async graph node so the run's admission slot is freed when the run ends there.
+
+    The slot is released when the node raises (the run fails), when it routes to END
+    with a ``Command``, or after every call when ``terminal`` is set (nodes followed
+    by an edge to END).
+
+    Args:
+        node: Async node function ``(state, config)``
+        terminal: The node is always the last one of the run
+
+    Returns:
+        Wrapped node with the same signature and annotations (LangGraph routing hints are kept)
+    """
+    @functools.wraps(node)
+    async def wrapper(state, config):
+        try:
+            result = await node(state, config)
+        except BaseException:
+            await release_run(run_id_from_config(config))
+            raise
+        if terminal or (isinstance(result, Command) and result.goto == END):
+            await release_run(run_id_from_config(config))
+        return result
+
+    return wrapper
@@ -9,10 +9,10 @@ This module implements the cascade enrichment workflow:
 
 import asyncio
 import json
+from functools import lru_cache
 from typing import Literal, Dict, Any, List
 from datetime import datetime
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
@@ -23,16 +23,24 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Command
 
+from open_deep_research.admission import ends_run
+from open_deep_research.candidate_matching import rank_amazon_products
 from open_deep_research.configuration_enrichment import (
     EnrichmentConfiguration,
-    calculate_matching_score,
     should_route_to_referentiel,
     should_route_to_web,
 )
+from open_deep_research.media_prober import check_article_media
+from open_deep_research.metrics import observe_routing_decision, timed_node
 from open_deep_research.prompts_enrichment import (
     article_to_research_brief_prompt,
     deep_researcher_article_enrichment_prompt,
 )
+from open_deep_research.resolution_index import (
+    decision_from_index,
+    lookup_resolution,
+    record_resolution,
+)
 from open_deep_research.state_enrichment import (
     EnrichmentState,
     ArticlePayload,
@@ -40,23 +48,39 @@ from open_deep_research.state_enrichment import (
     AmazonProduct,
     WebSource,
     RoutingDecision,
-    extract_asin_from_url,
-    extract_domain_from_url,
+    SearchPayload,
 )
 from open_deep_research.utils_enrichment import (
     tavily_search_amazon,
     tavily_search_web,
     tavily_extract_content,
+    run_search_phase,
+    first_pass_search_depth,
+    start_speculative_search,
+    cancel_speculative_search,
+    dedupe_search_hits,
     think_tool,
     format_article_for_search,
     get_today_str,
 )
-
-# Initialize configurable model
-configurable_model = init_chat_model(
-    configurable_fields=("model", "max_tokens", "api_key"),
+from open_deep_research.yield_priors import plan_search, record_search_yield
+from open_deep_research.utils_logging import (
+    get_deep_researcher_logger,
+    get_enrichment_logger,
+    log_event,
+    log_node_entry,
+    log_node_exit,
+    log_search_phase,
+    log_amazon_results,
+    log_web_results,
+    log_routing_decision,
+    log_final_summary,
 )
 
+# Loggers (structured events, written off the event loop)
+logger = get_enrichment_logger()
+researcher_logger = get_deep_researcher_logger()
+
 
 # =============================================================================
 # NODE 1: CREATE RESEARCH BRIEF
@@ -80,6 +104,7 @@ async def create_research_brief(
         Command to proceed to deep_researcher with research brief
     """
     article = state["article_payload"]
+    log_node_entry(logger, "create_research_brief", state)
 
     # Format article into multi-language queries
     queries = format_article_for_search({
@@ -111,6 +136,7 @@ async def create_research_brief(
         }
     )
 
+    log_node_exit(logger, "create_research_brief", "deep_researcher")
     return Command(
         goto="deep_researcher",
         update={
@@ -133,7 +159,7 @@ async def deep_researcher(
 
     This node performs:
     1. Phase 1: Amazon multi-country search
-    2. Phase 2: General web search (if Amazon fails)
+    2. Phase 2: General web search (if Amazon fails, or alongside Phase 1 in speculative mode)
     3. Phase 3: Technical documentation search
     4. Routing decision based on findings
 
@@ -150,47 +176,117 @@ async def deep_researcher(
     enrichment_config = EnrichmentConfiguration()
     article = state["article_payload"]
     research_brief = state.get("research_brief")
+    log_node_entry(researcher_logger, "deep_researcher", state)
 
     # Extract search queries
     queries = research_brief.search_queries if research_brief else {}
 
+    # =========================================================================
+    # RESOLUTION INDEX: Reuse a previous resolution of the same product
+    # =========================================================================
+    index_lookup = await lookup_resolution(article, enrichment_config)
+
+    if index_lookup.status == "hit":
+        routing_decision = decision_from_index(index_lookup)
+        log_event(
+            researcher_logger, "index_hit", "⚡ [INDEX] Hit %s", index_lookup.matched_key,
+            key=index_lookup.matched_key, age_hours=round(index_lookup.age_hours, 1),
+        )
+        observe_routing_decision(routing_decision)
+        log_routing_decision(researcher_logger, routing_decision)
+        next_node = "amazon_subgraph" if routing_decision.enrichment_type == "REFERENTIEL" else "web_subgraph"
+        log_node_exit(researcher_logger, "deep_researcher", next_node)
+
+        return Command(
+            goto=next_node,
+            update={
+                "routing_decision": routing_decision,
+                "amazon_products_found": routing_decision.amazon_data or [],
+                "web_sources_found": routing_decision.web_sources or [],
+                "enrichment_type": routing_decision.enrichment_type,
+                "search_iterations_count": 0,
+            }
+        )
+
+    # Partial hit: the previous resolution is stale or weaker, use it as a warm start
+    warm_start_asins = index_lookup.known_asins() if index_lookup.status == "partial" else []
+    skip_amazon_phase = index_lookup.status == "partial" and index_lookup.decision.enrichment_type == "WEB"
+
     # =========================================================================
     # PHASE 1: AMAZON MULTI-COUNTRY SEARCH
     # =========================================================================
-    print("\n🔍 PHASE 1: Searching Amazon across multiple countries...")
-
-    amazon_queries = []
-    if queries.get("universal"):
-        amazon_queries.extend(queries["universal"])
-    if queries.get("english"):
-        amazon_queries.extend(queries["english"][:2])  # Limit to 2
-    if queries.get("french"):
-        amazon_queries.extend(queries["french"][:1])  # Limit to 1
-
-    # Limit total Amazon queries to max_amazon_searches
-    amazon_queries = amazon_queries[:enrichment_config.max_amazon_searches]
-
-    amazon_results_raw = await tavily_search_amazon.ainvoke({
-        "queries": amazon_queries,
-        "max_results": enrichment_config.tavily_max_results
-    })
+    # Web queries are built up front so the web phase can start speculatively.
+    # Previously resolved ASINs are searched first on Amazon.
+    # Languages and Amazon domains are ordered and pruned by their learned yield
+    search_plan = await plan_search(article, queries, enrichment_config, priority_amazon_queries=warm_start_asins[:1])
+
+    if skip_amazon_phase:
+        # Product was previously resolved on the web only: Amazon is not worth the credits
+        log_event(researcher_logger, "amazon_phase_skipped", "⚡ [INDEX] Produit résolu sur le web, recherche Amazon ignorée")
+        search_plan.amazon_queries = []
+
+    amazon_queries, web_queries = search_plan.amazon_queries, search_plan.web_queries
+    log_search_phase(researcher_logger, 1, "Recherche Amazon Multi-pays", amazon_queries)
+    if search_plan.pruned:
+        log_event(researcher_logger, "priors_pruned", "🧭 [PRIORS] Éléments à faible rendement ignorés", pruned=search_plan.pruned)
+    web_search_args = {
+        "queries": web_queries,
+        "max_results": enrichment_config.tavily_max_results,
+        "max_concurrency": enrichment_config.tavily_max_concurrent_queries,
+        "timeout": enrichment_config.tavily_query_timeout
+    }
+    amazon_search_args = {**web_search_args, "queries": amazon_queries, "include_domains": search_plan.amazon_domains}
+    web_search_depth = enrichment_config.get_search_depth("web")
+
+    # Tavily credits spent by the search phases, reported on the routing decision
+    search_credits = 0
+
+    # Speculative mode: start the web phase now rather than after an Amazon miss
+    speculative_web_search = None
+    if enrichment_config.speculative_search and amazon_queries and web_queries:
+        log_event(researcher_logger, "speculative_web_started", "⚡ [SPECULATIF] Recherche web lancée en parallèle d'Amazon")
+        speculative_web_search = start_speculative_search(
+            tavily_search_web,
+            {**web_search_args, "search_depth": first_pass_search_depth(web_search_depth)},
+            delay=enrichment_config.speculative_web_delay_seconds
+        )
 
-    print(f"✅ Amazon search completed. Results:\n{amazon_results_raw[:500]}...")
+    # Adaptive depth: basic first, advanced only if the basic results are not conclusive
+    _, amazon_payload, amazon_credits = await run_search_phase(
+        tavily_search_amazon,
+        amazon_search_args,
+        enrichment_config.get_search_depth("amazon"),
+        lambda payload: is_amazon_conclusive(payload, article, enrichment_config),
+        useful_urls=lambda payload: [product.url for product in parse_amazon_results(payload, article)]
+    )
+    search_credits += amazon_credits
 
     # Parse Amazon results
-    amazon_products = parse_amazon_results(amazon_results_raw, article)
+    amazon_products = parse_amazon_results(amazon_payload, article)
+    log_amazon_results(researcher_logger, amazon_products)
 
     # =========================================================================
     # DECISION POINT: If Amazon found, route to REFERENTIEL
     # =========================================================================
     if amazon_products:
-        print(f"\n✅ Found {len(amazon_products)} Amazon product(s)!")
-
-        # Calculate confidence score
-        confidence = calculate_amazon_confidence(amazon_products[0], article, enrichment_config)
+        # Score every candidate and keep the best match first
+        amazon_products, confidence = rank_amazon_products(amazon_products, article, enrichment_config)
 
         if should_route_to_referentiel(confidence, enrichment_config):
-            print(f"✅ Confidence score {confidence:.2f} >= threshold. Routing to REFERENTIEL.")
+
+            # Settle the speculative web phase: cancel it, or keep its sources as a fallback.
+            # A phase that already finished is kept; requests sent before a cancel stay counted.
+            fallback_web_sources = []
+            if speculative_web_search is not None:
+                if (
+                    enrichment_config.speculative_cancel_on_amazon_hit
+                    and await cancel_speculative_search(speculative_web_search)
+                ):
+                    log_event(researcher_logger, "speculative_web_cancelled", "⚡ [SPECULATIF] Recherche web annulée")
+                else:
+                    _, fallback_payload = await speculative_web_search
+                    fallback_web_sources = parse_web_results(fallback_payload, article, enrichment_config)
+                search_credits += speculative_web_search.credits
 
             routing_decision = RoutingDecision(
                 enrichment_type="REFERENTIEL",
@@ -205,59 +301,54 @@ async def deep_researcher(
                     "queries_count": len(amazon_queries),
                     "results_count": len(amazon_products),
                     "languages": ["universal", "english", "french"],
-                }
+                },
+                search_credits=search_credits
             )
 
+            await record_resolution(article, routing_decision, enrichment_config)
+            await record_search_yield(search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload)
+            observe_routing_decision(routing_decision)
+            log_routing_decision(researcher_logger, routing_decision)
+            log_node_exit(researcher_logger, "deep_researcher", "amazon_subgraph")
+
             return Command(
                 goto="amazon_subgraph",
                 update={
                     "routing_decision": routing_decision,
                     "amazon_products_found": amazon_products,
+                    "web_sources_found": fallback_web_sources,
                     "enrichment_type": "REFERENTIEL",
                     "search_iterations_count": len(amazon_queries),
                 }
             )
 
-    print("\n❌ No suitable Amazon products found. Proceeding to Phase 2...")
-
     # =========================================================================
     # PHASE 2: GENERAL WEB SEARCH
     # =========================================================================
-    print("\n🔍 PHASE 2: Searching general web...")
-
-    web_queries = []
-    if queries.get("english"):
-        web_queries.extend(queries["english"][:2])
-    if queries.get("french"):
-        web_queries.extend(queries["french"][:1])
-    if queries.get("italian"):
-        web_queries.extend(queries["italian"][:1])
-
-    # Limit total web queries
-    web_queries = web_queries[:enrichment_config.max_web_searches]
-
-    web_results_raw = await tavily_search_web.ainvoke({
-        "queries": web_queries,
-        "max_results": enrichment_config.tavily_max_results
-    })
-
-    print(f"✅ Web search completed. Results:\n{web_results_raw[:500]}...")
+    log_search_phase(researcher_logger, 2, "Recherche Web Générale", web_queries)
+
+    _, web_payload, web_credits = await run_search_phase(
+        tavily_search_web,
+        web_search_args,
+        web_search_depth,
+        lambda payload: is_web_conclusive(payload, article, enrichment_config),
+        first_pass=speculative_web_search,
+        useful_urls=lambda payload: [source.url for source in parse_web_results(payload, article, enrichment_config)]
+    )
+    search_credits += web_credits
 
     # Parse web results
-    web_sources = parse_web_results(web_results_raw, article, enrichment_config)
+    web_sources = parse_web_results(web_payload, article, enrichment_config)
+    log_web_results(researcher_logger, web_sources)
 
     # =========================================================================
     # DECISION POINT: If web sources found, route to WEB
     # =========================================================================
     if len(web_sources) >= enrichment_config.scoring_thresholds.min_web_sources:
-        print(f"\n✅ Found {len(web_sources)} relevant web source(s)!")
-
         # Calculate confidence based on consensus
         confidence = calculate_web_confidence(web_sources, enrichment_config)
 
         if should_route_to_web(confidence, len(web_sources), enrichment_config):
-            print(f"✅ Confidence score {confidence:.2f} >= threshold. Routing to WEB.")
-
             routing_decision = RoutingDecision(
                 enrichment_type="WEB",
                 confidence_score=confidence,
@@ -271,8 +362,17 @@ async def deep_researcher(
                     "queries_count": len(web_queries),
                     "results_count": len(web_sources),
                     "languages": ["english", "french", "italian"],
-                }
+                },
+                search_credits=search_credits
+            )
+
+            await record_resolution(article, routing_decision, enrichment_config)
+            await record_search_yield(
+                search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload, web_payload=web_payload
             )
+            observe_routing_decision(routing_decision)
+            log_routing_decision(researcher_logger, routing_decision)
+            log_node_exit(researcher_logger, "deep_researcher", "web_subgraph")
 
             return Command(
                 goto="web_subgraph",
@@ -284,21 +384,21 @@ async def deep_researcher(
                 }
             )
 
-    print("\n❌ Insufficient web sources found. Checking for GENERATIF eligibility...")
-
     # =========================================================================
     # DECISION POINT: Check GENERATIF eligibility
     # =========================================================================
-    has_images = article.images_disponibles and article.images_urls
-    has_technical_data = (
+    # Declared media are checked first: dead links and empty storage folders do not count
+    media = await check_article_media(article, enrichment_config)
+    if media.unavailable:
+        log_event(researcher_logger, "media_unavailable", "🖼️  [MEDIA] Liens inutilisables", urls=media.unavailable)
+    has_images = bool(media.images)
+    has_technical_data = bool(
         article.specifications_techniques or
-        article.fiche_technique_url or
-        article.documents_techniques
+        media.datasheet_url or
+        media.documents
     )
 
     if has_images and has_technical_data:
-        print("\n✅ Article has required data for GENERATIF enrichment!")
-
         routing_decision = RoutingDecision(
             enrichment_type="GENERATIF",
             confidence_score=0.65,  # Default for generative
@@ -306,10 +406,10 @@ async def deep_researcher(
             amazon_data=None,
             web_sources=None,
             generatif_data={
-                "images": article.images_urls,
+                "images": media.images,
                 "technical_specs": article.specifications_techniques,
-                "technical_docs": article.documents_techniques or [],
-                "datasheet_url": article.fiche_technique_url,
+                "technical_docs": media.documents,
+                "datasheet_url": media.datasheet_url,
             },
             missing_data=None,
             search_summary={
@@ -317,8 +417,16 @@ async def deep_researcher(
                 "queries_count": len(amazon_queries) + len(web_queries),
                 "results_count": 0,
                 "reason": "Not found online, using available data",
-            }
+            },
+            search_credits=search_credits
+        )
+
+        await record_search_yield(
+            search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload, web_payload=web_payload
         )
+        observe_routing_decision(routing_decision)
+        log_routing_decision(researcher_logger, routing_decision)
+        log_node_exit(researcher_logger, "deep_researcher", "generative_subgraph")
 
         return Command(
             goto="generative_subgraph",
@@ -332,8 +440,6 @@ async def deep_researcher(
     # =========================================================================
     # FALLBACK: Route to EN_ATTENTE
     # =========================================================================
-    print("\n❌ Insufficient data for enrichment. Routing to EN_ATTENTE...")
-
     missing_data = []
     if not has_images:
         missing_data.append("Images produit")
@@ -353,9 +459,17 @@ async def deep_researcher(
             "queries_count": len(amazon_queries) + len(web_queries),
             "results_count": 0,
             "reason": "Missing required data",
-        }
+        },
+        search_credits=search_credits
     )
 
+    await record_search_yield(
+        search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload, web_payload=web_payload
+    )
+    observe_routing_decision(routing_decision)
+    log_routing_decision(researcher_logger, routing_decision)
+    log_node_exit(researcher_logger, "deep_researcher", "pending_node")
+
     return Command(
         goto="pending_node",
         update={
@@ -372,103 +486,63 @@ async def deep_researcher(
 # =============================================================================
 
 def parse_amazon_results(
-    results_raw: str,
+    payload: SearchPayload,
     article: ArticlePayload
 ) -> List[AmazonProduct]:
     """
-    Parse Tavily Amazon search results into structured AmazonProduct objects.
+    Map Tavily Amazon search results into structured AmazonProduct objects.
 
     Args:
-        results_raw: Raw string results from tavily_search_amazon
+        payload: Structured results from tavily_search_amazon
         article: Original article payload
 
     Returns:
-        List of AmazonProduct objects
+        List of AmazonProduct objects (only results with an ASIN)
     """
-    products = []
-
-    # Simple parsing - in production, this would use structured Tavily responses
-    # For now, we'll do regex-based parsing from the formatted string
-    import re
-
-    # Find all URLs in the results
-    url_pattern = r'URL: (https?://[^\s]+)'
-    urls = re.findall(url_pattern, results_raw)
-
-    for url in urls:
-        asin = extract_asin_from_url(url)
-        domain = extract_domain_from_url(url)
-
-        if asin and domain:
-            # Extract title (line before URL)
-            title_pattern = rf'(\d+)\. (.+?)\n\s+URL: {re.escape(url)}'
-            title_match = re.search(title_pattern, results_raw)
-            title = title_match.group(2) if title_match else None
-
-            # Extract score
-            score_pattern = rf'URL: {re.escape(url)}.*?Score: ([\d.]+)'
-            score_match = re.search(score_pattern, results_raw, re.DOTALL)
-            score = float(score_match.group(1)) if score_match else 0.0
-
-            products.append(AmazonProduct(
-                asin=asin,
-                domain=domain,
-                url=url,
-                title=title,
-                metadata={"tavily_score": score}
-            ))
-
-    return products
+    return [
+        AmazonProduct(
+            asin=hit.asin,
+            domain=hit.domain,
+            url=hit.url,
+            title=hit.title,
+            content_snippet=hit.content or None,
+            metadata={"tavily_score": hit.score}
+        )
+        for hit in dedupe_search_hits(payload.hits)
+        if hit.asin and hit.domain
+    ]
 
 
 def parse_web_results(
-    results_raw: str,
+    payload: SearchPayload,
     article: ArticlePayload,
     config: EnrichmentConfiguration
 ) -> List[WebSource]:
     """
-    Parse Tavily web search results into structured WebSource objects.
+    Map Tavily web search results into structured WebSource objects.
 
     Args:
-        results_raw: Raw string results from tavily_search_web
+        payload: Structured results from tavily_search_web
         article: Original article payload
         config: Enrichment configuration
 
     Returns:
         List of WebSource objects with score >= threshold
     """
-    sources = []
-
-    import re
-
-    # Find all URLs and scores
-    url_pattern = r'URL: (https?://[^\s]+)'
-    urls = re.findall(url_pattern, results_raw)
-
-    for url in urls:
-        domain = extract_domain_from_url(url)
-
-        # Extract title
-        title_pattern = rf'(\d+)\. (.+?)\n\s+URL: {re.escape(url)}'
-        title_match = re.search(title_pattern, results_raw)
-        title = title_match.group(2) if title_match else None
-
-        # Extract score
-        score_pattern = rf'URL: {re.escape(url)}.*?Score: ([\d.]+)'
-        score_match = re.search(score_pattern, results_raw, re.DOTALL)
-        score = float(score_match.group(1)) if score_match else 0.0
-
+    threshold = config.scoring_thresholds.tavily_relevance_threshold
+    return [
+        WebSource(
+            url=hit.url,
+            title=hit.title,
+            domain=hit.domain or "",
+            content_snippet=hit.content or None,
+            relevance_score=hit.score,
+            metadata={"tavily_score": hit.score}
+        )
+        for hit in dedupe_search_hits(payload.hits)
         # Only include sources above threshold
-        if score >= config.scoring_thresholds.tavily_relevance_threshold:
-            sources.append(WebSource(
-                url=url,
-                title=title,
-                domain=domain,
-                relevance_score=score,
-                metadata={"tavily_score": score}
-            ))
-
-    return sources
+        if hit.score >= threshold
+    ]
 
 
 def calculate_amazon_confidence(
@@ -487,28 +561,57 @@ def calculate_amazon_confidence(
     Returns:
         Confidence score (0.0 to 1.0)
     """
-    # For now, simple heuristic based on having an ASIN
-    # In production, this would check EAN, brand, model matching
-
-    ean_match = False  # Would need to fetch Amazon product data to verify
-    brand_match = False  # Would check if brand appears in title
-    model_match = False  # Would check if model appears in title
-    category_match = False
-
-    # Simple title-based matching if title available
-    if product.title and article.marque:
-        brand_match = article.marque.lower() in product.title.lower()
-
-    if product.title and article.libelle:
-        model_match = article.libelle.lower() in product.title.lower()
-
-    return calculate_matching_score(
-        ean_match=ean_match,
-        brand_match=brand_match,
-        model_match=model_match,
-        category_match=category_match,
-        config=config
-    )
+    _, confidence = rank_amazon_products([product], article, config)
+    return confidence
+
+
+def is_amazon_conclusive(
+    payload: SearchPayload,
+    article: ArticlePayload,
+    config: EnrichmentConfiguration
+) -> bool:
+    """
+    Check whether Amazon results are good enough to route to REFERENTIEL.
+
+    Used by adaptive search depth to decide whether the phase needs an advanced pass.
+
+    Args:
+        payload: Structured results from tavily_search_amazon
+        article: Original article payload
+        config: Enrichment configuration
+
+    Returns:
+        True if the best candidate meets the REFERENTIEL threshold
+    """
+    products = parse_amazon_results(payload, article)
+    if not products:
+        return False
+    _, confidence = rank_amazon_products(products, article, config)
+    return should_route_to_referentiel(confidence, config)
+
+
+def is_web_conclusive(
+    payload: SearchPayload,
+    article: ArticlePayload,
+    config: EnrichmentConfiguration
+) -> bool:
+    """
+    Check whether web results are good enough to route to WEB.
+
+    Used by adaptive search depth to decide whether the phase needs an advanced pass.
+
+    Args:
+        payload: Structured results from tavily_search_web
+        article: Original article payload
+        config: Enrichment configuration
+
+    Returns:
+        True if the relevant sources meet the WEB thresholds
+    """
+    sources = parse_web_results(payload, article, config)
+    if len(sources) < config.scoring_thresholds.min_web_sources:
+        return False
+    return should_route_to_web(calculate_web_confidence(sources, config), len(sources), config)
 
 
 def calculate_web_confidence(
@@ -550,7 +653,8 @@ async def amazon_subgraph(
 
     To be implemented later. For now, just passes through.
     """
-    print("\n📦 Amazon Subgraph (STUB - Not implemented yet)")
+    log_node_entry(logger, "amazon_subgraph (STUB)", state)
+    log_node_exit(logger, "amazon_subgraph", "output_results")
 
     return Command(
         goto="output_results",
@@ -569,7 +673,8 @@ async def web_subgraph(
 
     To be implemented later. For now, just passes through.
     """
-    print("\n🌐 Web Subgraph (STUB - Not implemented yet)")
+    log_node_entry(logger, "web_subgraph (STUB)", state)
+    log_node_exit(logger, "web_subgraph", "output_results")
 
     return Command(
         goto="output_results",
@@ -588,7 +693,8 @@ async def generative_subgraph(
 
     To be implemented later. For now, just passes through.
     """
-    print("\n✨ Generative Subgraph (STUB - Not implemented yet)")
+    log_node_entry(logger, "generative_subgraph (STUB)", state)
+    log_node_exit(logger, "generative_subgraph", "output_results")
 
     return Command(
         goto="output_results",
@@ -605,7 +711,9 @@ async def pending_node(
     """
     Handle articles with missing data (EN_ATTENTE).
     """
-    print("\n⏳ Pending Node - Missing data identified")
+    log_node_entry(logger, "pending_node", state)
+    log_event(logger, "pending", "⏳ [PENDING] Article en attente - Données manquantes", missing_data=state.get("missing_data_list"))
+    log_node_exit(logger, "pending_node", "output_results")
 
     return Command(
         goto="output_results",
@@ -636,84 +744,18 @@ async def output_results(
     Returns:
         Command to end the workflow
     """
-    print("\n" + "="*80)
-    print("📊 ENRICHMENT RESULTS")
-    print("="*80)
+    log_node_entry(logger, "output_results", state)
 
-    routing = state.get("routing_decision")
-    article = state["article_payload"]
-
-    # Article info
-    print(f"\n📦 Article: {article.marque} {article.libelle}")
-    if article.ean:
-        print(f"   EAN: {article.ean}")
-    if article.reference_fournisseur:
-        print(f"   Ref: {article.reference_fournisseur}")
-
-    # Routing decision
-    if routing:
-        print(f"\n🎯 ROUTING DECISION: {routing.enrichment_type}")
-        print(f"   Confidence Score: {routing.confidence_score:.2f}")
-        print(f"   Justification: {routing.justification}")
-
-        # Search summary
-        summary = routing.search_summary
-        print(f"\n🔍 Search Summary:")
-        print(f"   Phase: {summary.get('phase')}")
-        print(f"   Queries: {summary.get('queries_count')}")
-        print(f"   Results: {summary.get('results_count')}")
-        if summary.get('languages'):
-            print(f"   Languages: {', '.join(summary.get('languages', []))}")
-
-        # Type-specific results
-        if routing.enrichment_type == "REFERENTIEL" and routing.amazon_data:
-            print(f"\n🛒 Amazon Products Found: {len(routing.amazon_data)}")
-            for idx, product in enumerate(routing.amazon_data, 1):
-                print(f"   {idx}. ASIN: {product.asin}")
-                print(f"      Domain: {product.domain}")
-                print(f"      URL: {product.url}")
-                if product.title:
-                    print(f"      Title: {product.title}")
-
-        elif routing.enrichment_type == "WEB" and routing.web_sources:
-            print(f"\n🌐 Web Sources Found: {len(routing.web_sources)}")
-            for idx, source in enumerate(routing.web_sources, 1):
-                print(f"   {idx}. Domain: {source.domain}")
-                print(f"      Score: {source.relevance_score:.2f}")
-                print(f"      URL: {source.url}")
-                if source.title:
-                    print(f"      Title: {source.title}")
-
-        elif routing.enrichment_type == "GENERATIF" and routing.generatif_data:
-            print(f"\n✨ Generative Data Available:")
-            data = routing.generatif_data
-            if data.get('images'):
-                print(f"   Images: {len(data['images'])}")
-            if data.get('technical_specs'):
-                print(f"   Technical Specs: Yes")
-            if data.get('datasheet_url'):
-                print(f"   Datasheet: {data['datasheet_url']}")
-
-        elif routing.enrichment_type == "EN_ATTENTE" and routing.missing_data:
-            print(f"\n⏳ Missing Data:")
-            for item in routing.missing_data:
-                print(f"   - {item}")
-
-    # Next node indication
-    print(f"\n➡️  Next Node: {routing.enrichment_type}_subgraph")
-
-    # Processing metadata
-    if state.get("processing_start_time"):
-        duration = (datetime.now() - state["processing_start_time"]).total_seconds()
-        print(f"\n⏱️  Processing Time: {duration:.2f} seconds")
-
-    print("\n" + "="*80)
+    # One summary event; the routing details were logged by deep_researcher
+    end_time = datetime.now()
+    log_final_summary(logger, {**state, "processing_end_time": end_time})
+    log_node_exit(logger, "output_results", "END")
 
     # Store final state
     return Command(
         goto=END,
         update={
-            "processing_end_time": datetime.now(),
+            "processing_end_time": end_time,
             "enrichment_status": "RESEARCH_COMPLETE"
         }
     )
@@ -723,24 +765,27 @@ async def output_results(
 # GRAPH ASSEMBLY
 # =============================================================================
 
-def create_enrichment_graph():
+def create_enrichment_graph(checkpointer=None):
     """
     Create and compile the article enrichment graph.
 
+    Args:
+        checkpointer: Optional checkpointer to compile the graph with
+
     Returns:
         Compiled LangGraph workflow
     """
     # Create graph builder
     graph_builder = StateGraph(EnrichmentState)
 
-    # Add nodes
-    graph_builder.add_node("create_research_brief", create_research_brief)
-    graph_builder.add_node("deep_researcher", deep_researcher)
-    graph_builder.add_node("amazon_subgraph", amazon_subgraph)
-    graph_builder.add_node("web_subgraph", web_subgraph)
-    graph_builder.add_node("generative_subgraph", generative_subgraph)
-    graph_builder.add_node("pending_node", pending_node)
-    graph_builder.add_node("output_results", output_results)
+    # Add nodes (timed in enrichment_node_seconds)
+    graph_builder.add_node("create_research_brief", ends_run(timed_node("create_research_brief", create_research_brief)))
+    graph_builder.add_node("deep_researcher", ends_run(timed_node("deep_researcher", deep_researcher)))
+    graph_builder.add_node("amazon_subgraph", ends_run(timed_node("amazon_subgraph", amazon_subgraph)))
+    graph_builder.add_node("web_subgraph", ends_run(timed_node("web_subgraph", web_subgraph)))
+    graph_builder.add_node("generative_subgraph", ends_run(timed_node("generative_subgraph", generative_subgraph)))
+    graph_builder.add_node("pending_node", ends_run(timed_node("pending_node", pending_node)))
+    graph_builder.add_node("output_results", ends_run(timed_node("output_results", output_results)))
 
     # Define edges
     graph_builder.add_edge(START, "create_research_brief")
@@ -751,14 +796,23 @@ def create_enrichment_graph():
     # output_results → END (set by Command)
 
     # Compile graph
-    graph = graph_builder.compile()
+    graph = graph_builder.compile(checkpointer=checkpointer)
 
     return graph
 
 
 # =============================================================================
-# ENTRY POINT FOR TESTING
+# ENTRY POINT
 # =============================================================================
 
-# Export the graph for use by LangGraph
-enrichment_graph = create_enrichment_graph()
+@lru_cache(maxsize=1)
+def get_enrichment_graph():
+    """Get the enrichment graph without checkpointer, compiled on first use."""
+    return create_enrichment_graph()
+
+
+def __getattr__(name: str):
+    # `enrichment_graph` stays importable by name but is only compiled on first access
+    if name == "enrichment_graph":
+        return get_enrichment_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
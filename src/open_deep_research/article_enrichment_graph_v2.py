@@ -5,10 +5,11 @@ Cette version inclut un système de logging structuré dans le terminal.
 
 import asyncio
 import json
+import logging
+from functools import lru_cache
 from typing import Literal, Dict, Any, List
 from datetime import datetime
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
@@ -19,16 +20,24 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Command
 
+from open_deep_research.admission import ends_run
+from open_deep_research.candidate_matching import rank_amazon_products
 from open_deep_research.configuration_enrichment import (
     EnrichmentConfiguration,
-    calculate_matching_score,
     should_route_to_referentiel,
     should_route_to_web,
 )
+from open_deep_research.media_prober import check_article_media
+from open_deep_research.metrics import observe_routing_decision, timed_node
 from open_deep_research.prompts_enrichment import (
     article_to_research_brief_prompt,
     deep_researcher_article_enrichment_prompt,
 )
+from open_deep_research.resolution_index import (
+    decision_from_index,
+    lookup_resolution,
+    record_resolution,
+)
 from open_deep_research.state_enrichment import (
     EnrichmentState,
     ArticlePayload,
@@ -36,22 +45,28 @@ from open_deep_research.state_enrichment import (
     AmazonProduct,
     WebSource,
     RoutingDecision,
-    extract_asin_from_url,
-    extract_domain_from_url,
+    SearchPayload,
 )
 from open_deep_research.utils_enrichment import (
     tavily_search_amazon,
     tavily_search_web,
     tavily_extract_content,
+    run_search_phase,
+    first_pass_search_depth,
+    start_speculative_search,
+    cancel_speculative_search,
+    dedupe_search_hits,
     think_tool,
     format_article_for_search,
     get_today_str,
 )
+from open_deep_research.yield_priors import plan_search, record_search_yield
 
 # Import des loggers
 from open_deep_research.utils_logging import (
     get_deep_researcher_logger,
     get_enrichment_logger,
+    log_event,
     log_node_entry,
     log_node_exit,
     log_article_info,
@@ -64,11 +79,6 @@ from open_deep_research.utils_logging import (
     log_final_summary,
 )
 
-# Initialize configurable model
-configurable_model = init_chat_model(
-    configurable_fields=("model", "max_tokens", "api_key"),
-)
-
 # Logger principal
 logger = get_enrichment_logger()
 
@@ -99,11 +109,10 @@ async def create_research_brief(
         "reference_fournisseur": article.reference_fournisseur,
     })
 
-    logger.info("📝 [BRIEF_CREATION] Génération du brief de recherche")
-    logger.info(f"  • Requêtes générées: {sum(len(q) for q in queries.values())}")
-    for lang, lang_queries in queries.items():
-        if lang_queries:
-            logger.info(f"    - {lang}: {len(lang_queries)} requêtes")
+    log_event(
+        logger, "research_brief", "📝 [BRIEF_CREATION] %d requêtes générées", sum(len(q) for q in queries.values()),
+        queries_by_language={lang: len(lang_queries) for lang, lang_queries in queries.items() if lang_queries},
+    )
 
     # Create research brief
     research_brief = ResearchBrief(
@@ -163,30 +172,100 @@ async def deep_researcher(
     queries = research_brief.search_queries if research_brief else {}
 
     # =========================================================================
-    # PHASE 1: AMAZON MULTI-COUNTRY SEARCH
+    # RESOLUTION INDEX: Reuse a previous resolution of the same product
     # =========================================================================
-    amazon_queries = []
-    if queries.get("universal"):
-        amazon_queries.extend(queries["universal"])
-    if queries.get("english"):
-        amazon_queries.extend(queries["english"][:2])
-    if queries.get("french"):
-        amazon_queries.extend(queries["french"][:1])
+    index_lookup = await lookup_resolution(article, enrichment_config)
+
+    if index_lookup.status == "hit":
+        routing_decision = decision_from_index(index_lookup)
+        next_node = "amazon_subgraph" if routing_decision.enrichment_type == "REFERENTIEL" else "web_subgraph"
+        log_event(
+            researcher_logger, "index_hit", "⚡ [INDEX] Produit déjà résolu (%s) - recherche ignorée", index_lookup.matched_key,
+            key=index_lookup.matched_key, age_hours=round(index_lookup.age_hours, 1),
+        )
+        observe_routing_decision(routing_decision)
+        log_routing_decision(researcher_logger, routing_decision)
+        log_node_exit(researcher_logger, "deep_researcher", next_node)
 
-    amazon_queries = amazon_queries[:enrichment_config.max_amazon_searches]
+        return Command(
+            goto=next_node,
+            update={
+                "routing_decision": routing_decision,
+                "amazon_products_found": routing_decision.amazon_data or [],
+                "web_sources_found": routing_decision.web_sources or [],
+                "enrichment_type": routing_decision.enrichment_type,
+                "search_iterations_count": 0,
+            }
+        )
+
+    # Partial hit: the previous resolution is stale or weaker, use it as a warm start
+    warm_start_asins = index_lookup.known_asins() if index_lookup.status == "partial" else []
+    skip_amazon_phase = index_lookup.status == "partial" and index_lookup.decision.enrichment_type == "WEB"
+    if index_lookup.status == "partial":
+        log_event(
+            researcher_logger, "index_warm_start", "♻️  [INDEX] Résolution partielle (%s) utilisée comme point de départ",
+            index_lookup.matched_key, key=index_lookup.matched_key,
+        )
+
+    # =========================================================================
+    # PHASE 1: AMAZON MULTI-COUNTRY SEARCH
+    # =========================================================================
+    # Web queries are built up front so the web phase can start speculatively.
+    # Previously resolved ASINs are searched first on Amazon.
+    # Languages and Amazon domains are ordered and pruned by their learned yield
+    search_plan = await plan_search(article, queries, enrichment_config, priority_amazon_queries=warm_start_asins[:1])
+
+    if skip_amazon_phase:
+        # Product was previously resolved on the web only: Amazon is not worth the credits
+        log_event(researcher_logger, "amazon_phase_skipped", "⚡ [INDEX] Produit résolu sur le web, recherche Amazon ignorée")
+        search_plan.amazon_queries = []
+
+    amazon_queries, web_queries = search_plan.amazon_queries, search_plan.web_queries
+    if search_plan.pruned:
+        log_event(researcher_logger, "priors_pruned", "🧭 [PRIORS] Éléments à faible rendement ignorés", pruned=search_plan.pruned)
+    web_search_args = {
+        "queries": web_queries,
+        "max_results": enrichment_config.tavily_max_results,
+        "max_concurrency": enrichment_config.tavily_max_concurrent_queries,
+        "timeout": enrichment_config.tavily_query_timeout
+    }
+    amazon_search_args = {**web_search_args, "queries": amazon_queries, "include_domains": search_plan.amazon_domains}
+    web_search_depth = enrichment_config.get_search_depth("web")
+
+    # Tavily credits spent by the search phases, reported on the routing decision
+    search_credits = 0
 
     log_search_phase(researcher_logger, 1, "Recherche Amazon Multi-pays", amazon_queries)
 
+    # Speculative mode: start the web phase now rather than after an Amazon miss
+    speculative_web_search = None
+    if enrichment_config.speculative_search and amazon_queries and web_queries:
+        log_event(researcher_logger, "speculative_web_started", "⚡ [SPECULATIF] Recherche web lancée en parallèle d'Amazon")
+        speculative_web_search = start_speculative_search(
+            tavily_search_web,
+            {**web_search_args, "search_depth": first_pass_search_depth(web_search_depth)},
+            delay=enrichment_config.speculative_web_delay_seconds
+        )
+
+    amazon_payload = web_payload = None
     try:
-        amazon_results_raw = await tavily_search_amazon.ainvoke({
-            "queries": amazon_queries,
-            "max_results": enrichment_config.tavily_max_results
-        })
+        # Adaptive depth: basic first, advanced only if the basic results are not conclusive
+        amazon_results_text, amazon_payload, amazon_credits = await run_search_phase(
+            tavily_search_amazon,
+            amazon_search_args,
+            enrichment_config.get_search_depth("amazon"),
+            lambda payload: is_amazon_conclusive(payload, article, enrichment_config),
+            useful_urls=lambda payload: [product.url for product in parse_amazon_results(payload, article)]
+        )
+        search_credits += amazon_credits
 
-        researcher_logger.info("✅ [PHASE 1] Recherche Amazon terminée")
+        log_event(
+            researcher_logger, "search_phase_done", "✅ [PHASE %s] Recherche terminée (%s crédits)", 1, amazon_credits,
+            phase=1, credits=amazon_credits,
+        )
 
         # Parse Amazon results
-        amazon_products = parse_amazon_results(amazon_results_raw, article)
+        amazon_products = parse_amazon_results(amazon_payload, article)
         log_amazon_results(researcher_logger, amazon_products)
 
         log_tavily_call(researcher_logger, "tavily_search_amazon", amazon_queries, len(amazon_products), success=True)
@@ -199,15 +278,26 @@ async def deep_researcher(
     # DECISION POINT: If Amazon found, route to REFERENTIEL
     # =========================================================================
     if amazon_products:
-        researcher_logger.info(f"🎯 [DECISION] {len(amazon_products)} produit(s) Amazon trouvé(s)")
-
-        # Calculate confidence score
-        confidence = calculate_amazon_confidence(amazon_products[0], article, enrichment_config)
-        researcher_logger.info(f"📊 [CONFIDENCE] Score calculé: {confidence:.2f}")
+        # Score every candidate and keep the best match first
+        amazon_products, confidence = rank_amazon_products(amazon_products, article, enrichment_config)
 
         if should_route_to_referentiel(confidence, enrichment_config):
-            researcher_logger.info(f"✅ [ROUTING] Confidence {confidence:.2f} >= {enrichment_config.scoring_thresholds.referentiel_min}")
-            researcher_logger.info(f"➡️  [ROUTING] Direction: REFERENTIEL (Amazon)")
+            # Settle the speculative web phase: cancel it, or keep its sources as a fallback.
+            # A phase that already finished is kept; requests sent before a cancel stay counted.
+            fallback_web_sources = []
+            if speculative_web_search is not None:
+                if (
+                    enrichment_config.speculative_cancel_on_amazon_hit
+                    and await cancel_speculative_search(speculative_web_search)
+                ):
+                    log_event(researcher_logger, "speculative_web_cancelled", "⚡ [SPECULATIF] Recherche web annulée")
+                else:
+                    try:
+                        _, fallback_payload = await speculative_web_search
+                        fallback_web_sources = parse_web_results(fallback_payload, article, enrichment_config)
+                    except Exception as e:
+                        log_error(researcher_logger, "deep_researcher", f"Erreur recherche web spéculative: {str(e)}")
+                search_credits += speculative_web_search.credits
 
             routing_decision = RoutingDecision(
                 enrichment_type="REFERENTIEL",
@@ -222,54 +312,63 @@ async def deep_researcher(
                     "queries_count": len(amazon_queries),
                     "results_count": len(amazon_products),
                     "languages": ["universal", "english", "french"],
-                }
+                },
+                search_credits=search_credits
             )
 
+            observe_routing_decision(routing_decision)
             log_routing_decision(researcher_logger, routing_decision)
             log_node_exit(researcher_logger, "deep_researcher", "amazon_subgraph")
 
+            await record_resolution(article, routing_decision, enrichment_config)
+            await record_search_yield(search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload)
+
             return Command(
                 goto="amazon_subgraph",
                 update={
                     "routing_decision": routing_decision,
                     "amazon_products_found": amazon_products,
+                    "web_sources_found": fallback_web_sources,
                     "enrichment_type": "REFERENTIEL",
                     "search_iterations_count": len(amazon_queries),
                 }
             )
         else:
-            researcher_logger.info(f"⚠️  [ROUTING] Confidence {confidence:.2f} < {enrichment_config.scoring_thresholds.referentiel_min}")
-            researcher_logger.info("➡️  [ROUTING] Passage à Phase 2 (Web)")
+            log_event(
+                researcher_logger, "phase_fallthrough", "➡️  [ROUTING] Phase 1 → Phase 2 (confiance %.2f)", confidence,
+                level=logging.DEBUG, phase=1, reason="low_confidence", results_count=len(amazon_products),
+                confidence=round(confidence, 3), threshold=enrichment_config.scoring_thresholds.referentiel_min,
+            )
 
     else:
-        researcher_logger.info("❌ [PHASE 1] Aucun produit Amazon trouvé")
-        researcher_logger.info("➡️  [ROUTING] Passage à Phase 2 (Web)")
+        log_event(
+            researcher_logger, "phase_fallthrough", "➡️  [ROUTING] Phase 1 → Phase 2 (aucun produit Amazon)",
+            level=logging.DEBUG, phase=1, reason="no_results", results_count=0,
+        )
 
     # =========================================================================
     # PHASE 2: GENERAL WEB SEARCH
     # =========================================================================
-    web_queries = []
-    if queries.get("english"):
-        web_queries.extend(queries["english"][:2])
-    if queries.get("french"):
-        web_queries.extend(queries["french"][:1])
-    if queries.get("italian"):
-        web_queries.extend(queries["italian"][:1])
-
-    web_queries = web_queries[:enrichment_config.max_web_searches]
-
     log_search_phase(researcher_logger, 2, "Recherche Web Générale", web_queries)
 
     try:
-        web_results_raw = await tavily_search_web.ainvoke({
-            "queries": web_queries,
-            "max_results": enrichment_config.tavily_max_results
-        })
+        web_results_text, web_payload, web_credits = await run_search_phase(
+            tavily_search_web,
+            web_search_args,
+            web_search_depth,
+            lambda payload: is_web_conclusive(payload, article, enrichment_config),
+            first_pass=speculative_web_search,
+            useful_urls=lambda payload: [source.url for source in parse_web_results(payload, article, enrichment_config)]
+        )
+        search_credits += web_credits
 
-        researcher_logger.info("✅ [PHASE 2] Recherche web terminée")
+        log_event(
+            researcher_logger, "search_phase_done", "✅ [PHASE %s] Recherche terminée (%s crédits)", 2, web_credits,
+            phase=2, credits=web_credits,
+        )
 
         # Parse web results
-        web_sources = parse_web_results(web_results_raw, article, enrichment_config)
+        web_sources = parse_web_results(web_payload, article, enrichment_config)
         log_web_results(researcher_logger, web_sources)
 
         log_tavily_call(researcher_logger, "tavily_search_web", web_queries, len(web_sources), success=True)
@@ -282,16 +381,10 @@ async def deep_researcher(
     # DECISION POINT: If web sources found, route to WEB
     # =========================================================================
     if len(web_sources) >= enrichment_config.scoring_thresholds.min_web_sources:
-        researcher_logger.info(f"🎯 [DECISION] {len(web_sources)} source(s) web trouvée(s)")
-
         # Calculate confidence based on consensus
         confidence = calculate_web_confidence(web_sources, enrichment_config)
-        researcher_logger.info(f"📊 [CONFIDENCE] Score calculé: {confidence:.2f}")
 
         if should_route_to_web(confidence, len(web_sources), enrichment_config):
-            researcher_logger.info(f"✅ [ROUTING] Confidence {confidence:.2f} >= {enrichment_config.scoring_thresholds.web_min}")
-            researcher_logger.info(f"➡️  [ROUTING] Direction: WEB (Multi-sources)")
-
             routing_decision = RoutingDecision(
                 enrichment_type="WEB",
                 confidence_score=confidence,
@@ -305,12 +398,19 @@ async def deep_researcher(
                     "queries_count": len(web_queries),
                     "results_count": len(web_sources),
                     "languages": ["english", "french", "italian"],
-                }
+                },
+                search_credits=search_credits
             )
 
+            observe_routing_decision(routing_decision)
             log_routing_decision(researcher_logger, routing_decision)
             log_node_exit(researcher_logger, "deep_researcher", "web_subgraph")
 
+            await record_resolution(article, routing_decision, enrichment_config)
+            await record_search_yield(
+                search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload, web_payload=web_payload
+            )
+
             return Command(
                 goto="web_subgraph",
                 update={
@@ -321,32 +421,34 @@ async def deep_researcher(
                 }
             )
         else:
-            researcher_logger.info(f"⚠️  [ROUTING] Confidence {confidence:.2f} < {enrichment_config.scoring_thresholds.web_min}")
-            researcher_logger.info("➡️  [ROUTING] Passage à Phase 3 (GENERATIF)")
+            log_event(
+                researcher_logger, "phase_fallthrough", "➡️  [ROUTING] Phase 2 → Phase 3 (confiance %.2f)", confidence,
+                level=logging.DEBUG, phase=2, reason="low_confidence", results_count=len(web_sources),
+                confidence=round(confidence, 3), threshold=enrichment_config.scoring_thresholds.web_min,
+            )
 
     else:
-        researcher_logger.info(f"❌ [PHASE 2] Seulement {len(web_sources)} source(s) (min: {enrichment_config.scoring_thresholds.min_web_sources})")
-        researcher_logger.info("➡️  [ROUTING] Passage à Phase 3 (GENERATIF)")
+        log_event(
+            researcher_logger, "phase_fallthrough", "➡️  [ROUTING] Phase 2 → Phase 3 (%d source(s) web)", len(web_sources),
+            level=logging.DEBUG, phase=2, reason="too_few_sources", results_count=len(web_sources),
+            threshold=enrichment_config.scoring_thresholds.min_web_sources,
+        )
 
     # =========================================================================
     # DECISION POINT: Check GENERATIF eligibility
     # =========================================================================
-    researcher_logger.info("🔍 [PHASE 3] Vérification éligibilité GENERATIF")
-
-    has_images = article.images_disponibles and article.images_urls
-    has_technical_data = (
+    # Declared media are checked first: dead links and empty storage folders do not count
+    media = await check_article_media(article, enrichment_config)
+    if media.unavailable:
+        log_event(researcher_logger, "media_unavailable", "🖼️  [MEDIA] Liens inutilisables", urls=media.unavailable)
+    has_images = bool(media.images)
+    has_technical_data = bool(
         article.specifications_techniques or
-        article.fiche_technique_url or
-        article.documents_techniques
+        media.datasheet_url or
+        media.documents
     )
 
-    researcher_logger.info(f"  • Images: {'✅' if has_images else '❌'}")
-    researcher_logger.info(f"  • Données techniques: {'✅' if has_technical_data else '❌'}")
-
     if has_images and has_technical_data:
-        researcher_logger.info("✅ [ROUTING] Éligible pour GENERATIF")
-        researcher_logger.info("➡️  [ROUTING] Direction: GENERATIF (IA Native)")
-
         routing_decision = RoutingDecision(
             enrichment_type="GENERATIF",
             confidence_score=0.65,
@@ -354,10 +456,10 @@ async def deep_researcher(
             amazon_data=None,
             web_sources=None,
             generatif_data={
-                "images": article.images_urls,
+                "images": media.images,
                 "technical_specs": article.specifications_techniques,
-                "technical_docs": article.documents_techniques or [],
-                "datasheet_url": article.fiche_technique_url,
+                "technical_docs": media.documents,
+                "datasheet_url": media.datasheet_url,
             },
             missing_data=None,
             search_summary={
@@ -365,9 +467,15 @@ async def deep_researcher(
                 "queries_count": len(amazon_queries) + len(web_queries),
                 "results_count": 0,
                 "reason": "Not found online, using available data",
-            }
+            },
+            search_credits=search_credits
+        )
+
+        await record_search_yield(
+            search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload, web_payload=web_payload
         )
 
+        observe_routing_decision(routing_decision)
         log_routing_decision(researcher_logger, routing_decision)
         log_node_exit(researcher_logger, "deep_researcher", "generative_subgraph")
 
@@ -383,19 +491,12 @@ async def deep_researcher(
     # =========================================================================
     # FALLBACK: Route to EN_ATTENTE
     # =========================================================================
-    researcher_logger.info("❌ [ROUTING] Données insuffisantes pour tous les types")
-    researcher_logger.info("➡️  [ROUTING] Direction: EN_ATTENTE (Pending)")
-
     missing_data = []
     if not has_images:
         missing_data.append("Images produit")
     if not has_technical_data:
         missing_data.append("Données techniques ou fiche technique")
 
-    researcher_logger.info(f"⏳ [MISSING_DATA] Données manquantes:")
-    for item in missing_data:
-        researcher_logger.info(f"    • {item}")
-
     routing_decision = RoutingDecision(
         enrichment_type="EN_ATTENTE",
         confidence_score=0.0,
@@ -409,9 +510,15 @@ async def deep_researcher(
             "queries_count": len(amazon_queries) + len(web_queries),
             "results_count": 0,
             "reason": "Missing required data",
-        }
+        },
+        search_credits=search_credits
+    )
+
+    await record_search_yield(
+        search_plan, routing_decision, enrichment_config, amazon_payload=amazon_payload, web_payload=web_payload
     )
 
+    observe_routing_decision(routing_decision)
     log_routing_decision(researcher_logger, routing_decision)
     log_node_exit(researcher_logger, "deep_researcher", "pending_node")
 
@@ -431,73 +538,43 @@ async def deep_researcher(
 # =============================================================================
 
 def parse_amazon_results(
-    results_raw: str,
+    payload: SearchPayload,
     article: ArticlePayload
 ) -> List[AmazonProduct]:
-    """Parse Tavily Amazon search results."""
-    products = []
-    import re
-
-    url_pattern = r'URL: (https?://[^\s]+)'
-    urls = re.findall(url_pattern, results_raw)
-
-    for url in urls:
-        asin = extract_asin_from_url(url)
-        domain = extract_domain_from_url(url)
-
-        if asin and domain:
-            title_pattern = rf'(\d+)\. (.+?)\n\s+URL: {re.escape(url)}'
-            title_match = re.search(title_pattern, results_raw)
-            title = title_match.group(2) if title_match else None
-
-            score_pattern = rf'URL: {re.escape(url)}.*?Score: ([\d.]+)'
-            score_match = re.search(score_pattern, results_raw, re.DOTALL)
-            score = float(score_match.group(1)) if score_match else 0.0
-
-            products.append(AmazonProduct(
-                asin=asin,
-                domain=domain,
-                url=url,
-                title=title,
-                metadata={"tavily_score": score}
-            ))
-
-    return products
+    """Map Tavily Amazon search results to AmazonProduct objects."""
+    return [
+        AmazonProduct(
+            asin=hit.asin,
+            domain=hit.domain,
+            url=hit.url,
+            title=hit.title,
+            content_snippet=hit.content or None,
+            metadata={"tavily_score": hit.score}
+        )
+        for hit in dedupe_search_hits(payload.hits)
+        if hit.asin and hit.domain
+    ]
 
 
 def parse_web_results(
-    results_raw: str,
+    payload: SearchPayload,
     article: ArticlePayload,
     config: EnrichmentConfiguration
 ) -> List[WebSource]:
-    """Parse Tavily web search results."""
-    sources = []
-    import re
-
-    url_pattern = r'URL: (https?://[^\s]+)'
-    urls = re.findall(url_pattern, results_raw)
-
-    for url in urls:
-        domain = extract_domain_from_url(url)
-
-        title_pattern = rf'(\d+)\. (.+?)\n\s+URL: {re.escape(url)}'
-        title_match = re.search(title_pattern, results_raw)
-        title = title_match.group(2) if title_match else None
-
-        score_pattern = rf'URL: {re.escape(url)}.*?Score: ([\d.]+)'
-        score_match = re.search(score_pattern, results_raw, re.DOTALL)
-        score = float(score_match.group(1)) if score_match else 0.0
-
-        if score >= config.scoring_thresholds.tavily_relevance_threshold:
-            sources.append(WebSource(
-                url=url,
-                title=title,
-                domain=domain,
-                relevance_score=score,
-                metadata={"tavily_score": score}
-            ))
-
-    return sources
+    """Map Tavily web search results to WebSource objects above the relevance threshold."""
+    threshold = config.scoring_thresholds.tavily_relevance_threshold
+    return [
+        WebSource(
+            url=hit.url,
+            title=hit.title,
+            domain=hit.domain or "",
+            content_snippet=hit.content or None,
+            relevance_score=hit.score,
+            metadata={"tavily_score": hit.score}
+        )
+        for hit in dedupe_search_hits(payload.hits)
+        if hit.score >= threshold
+    ]
 
 
 def calculate_amazon_confidence(
@@ -506,24 +583,33 @@ def calculate_amazon_confidence(
     config: EnrichmentConfiguration
 ) -> float:
     """Calculate confidence score for Amazon product match."""
-    ean_match = False
-    brand_match = False
-    model_match = False
-    category_match = False
-
-    if product.title and article.marque:
-        brand_match = article.marque.lower() in product.title.lower()
-
-    if product.title and article.libelle:
-        model_match = article.libelle.lower() in product.title.lower()
-
-    return calculate_matching_score(
-        ean_match=ean_match,
-        brand_match=brand_match,
-        model_match=model_match,
-        category_match=category_match,
-        config=config
-    )
+    _, confidence = rank_amazon_products([product], article, config)
+    return confidence
+
+
+def is_amazon_conclusive(
+    payload: SearchPayload,
+    article: ArticlePayload,
+    config: EnrichmentConfiguration
+) -> bool:
+    """Whether Amazon results meet the REFERENTIEL threshold (adaptive search depth)."""
+    products = parse_amazon_results(payload, article)
+    if not products:
+        return False
+    _, confidence = rank_amazon_products(products, article, config)
+    return should_route_to_referentiel(confidence, config)
+
+
+def is_web_conclusive(
+    payload: SearchPayload,
+    article: ArticlePayload,
+    config: EnrichmentConfiguration
+) -> bool:
+    """Whether web results meet the WEB thresholds (adaptive search depth)."""
+    sources = parse_web_results(payload, article, config)
+    if len(sources) < config.scoring_thresholds.min_web_sources:
+        return False
+    return should_route_to_web(calculate_web_confidence(sources, config), len(sources), config)
 
 
 def calculate_web_confidence(
@@ -549,7 +635,6 @@ async def amazon_subgraph(
 ) -> Command[Literal["output_results"]]:
     """STUB: Amazon enrichment subgraph."""
     log_node_entry(logger, "amazon_subgraph (STUB)", state)
-    logger.info("📦 [STUB] Amazon Subgraph - À implémenter")
     log_node_exit(logger, "amazon_subgraph", "output_results")
 
     return Command(
@@ -564,7 +649,6 @@ async def web_subgraph(
 ) -> Command[Literal["output_results"]]:
     """STUB: Web enrichment subgraph."""
     log_node_entry(logger, "web_subgraph (STUB)", state)
-    logger.info("🌐 [STUB] Web Subgraph - À implémenter")
     log_node_exit(logger, "web_subgraph", "output_results")
 
     return Command(
@@ -579,7 +663,6 @@ async def generative_subgraph(
 ) -> Command[Literal["output_results"]]:
     """STUB: Generative enrichment subgraph."""
     log_node_entry(logger, "generative_subgraph (STUB)", state)
-    logger.info("✨ [STUB] Generative Subgraph - À implémenter")
     log_node_exit(logger, "generative_subgraph", "output_results")
 
     return Command(
@@ -594,7 +677,7 @@ async def pending_node(
 ) -> Command[Literal["output_results"]]:
     """Handle articles with missing data."""
     log_node_entry(logger, "pending_node", state)
-    logger.info("⏳ [PENDING] Article en attente - Données manquantes")
+    log_event(logger, "pending", "⏳ [PENDING] Article en attente - Données manquantes", missing_data=state.get("missing_data_list"))
     log_node_exit(logger, "pending_node", "output_results")
 
     return Command(
@@ -614,16 +697,16 @@ async def output_results(
     """Output the search results and routing decision."""
     log_node_entry(logger, "output_results", state)
 
-    # Log final summary
-    log_final_summary(logger, state)
-
-    # Store final state
+    # One summary event; the routing details were logged by deep_researcher
+    end_time = datetime.now()
+    log_final_summary(logger, {**state, "processing_end_time": end_time})
     log_node_exit(logger, "output_results", "END")
 
+    # Store final state
     return Command(
         goto=END,
         update={
-            "processing_end_time": datetime.now(),
+            "processing_end_time": end_time,
             "enrichment_status": "RESEARCH_COMPLETE"
         }
     )
@@ -633,31 +716,40 @@ async def output_results(
 # GRAPH ASSEMBLY
 # =============================================================================
 
-def create_enrichment_graph():
+def create_enrichment_graph(checkpointer=None):
     """Create and compile the article enrichment graph."""
-    logger.info("🏗️  [GRAPH] Création du graph d'enrichissement...")
-
     graph_builder = StateGraph(EnrichmentState)
 
-    # Add nodes
-    graph_builder.add_node("create_research_brief", create_research_brief)
-    graph_builder.add_node("deep_researcher", deep_researcher)
-    graph_builder.add_node("amazon_subgraph", amazon_subgraph)
-    graph_builder.add_node("web_subgraph", web_subgraph)
-    graph_builder.add_node("generative_subgraph", generative_subgraph)
-    graph_builder.add_node("pending_node", pending_node)
-    graph_builder.add_node("output_results", output_results)
+    # Add nodes (timed in enrichment_node_seconds)
+    graph_builder.add_node("create_research_brief", ends_run(timed_node("create_research_brief", create_research_brief)))
+    graph_builder.add_node("deep_researcher", ends_run(timed_node("deep_researcher", deep_researcher)))
+    graph_builder.add_node("amazon_subgraph", ends_run(timed_node("amazon_subgraph", amazon_subgraph)))
+    graph_builder.add_node("web_subgraph", ends_run(timed_node("web_subgraph", web_subgraph)))
+    graph_builder.add_node("generative_subgraph", ends_run(timed_node("generative_subgraph", generative_subgraph)))
+    graph_builder.add_node("pending_node", ends_run(timed_node("pending_node", pending_node)))
+    graph_builder.add_node("output_results", ends_run(timed_node("output_results", output_results)))
 
     # Define edges
     graph_builder.add_edge(START, "create_research_brief")
 
     # Compile graph
-    graph = graph_builder.compile()
-
-    logger.info("✅ [GRAPH] Graph compilé avec succès")
+    graph = graph_builder.compile(checkpointer=checkpointer)
 
     return graph
 
 
-# Export the graph
-enrichment_graph = create_enrichment_graph()
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def get_enrichment_graph():
+    """Get the enrichment graph without checkpointer, compiled on first use."""
+    return create_enrichment_graph()
+
+
+def __getattr__(name: str):
+    # `enrichment_graph` stays importable by name but is only compiled on first access
+    if name == "enrichment_graph":
+        return get_enrichment_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
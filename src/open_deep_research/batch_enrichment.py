@@ -0,0 +1,573 @@
+"""Batch enrichment runner for large catalogs.
+
+Streams articles from a JSONL or CSV file through the enrichment graph with
+bounded concurrency, checkpoints progress per article ident in SQLite so an
+interrupted job resumes where it stopped, and appends one EnrichmentReport per
+line to the output file. Articles whose search fields are unchanged since a
+still-fresh result are skipped (see ``results_store``). Search queries are planned across the whole batch so
+that sibling articles share the results of identical queries (see
+``query_planner``).
+
+Usage:
+    python -m open_deep_research.batch_enrichment catalog.jsonl --output reports.jsonl --concurrency 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from open_deep_research.configuration_enrichment import EnrichmentConfiguration
+from open_deep_research.instrumentation import estimate_search_credits
+from open_deep_research.media_prober import prefetch_media
+from open_deep_research.metrics import write_metrics_file
+from open_deep_research.query_planner import (
+    BatchQueryPlanner,
+    track_query_usage,
+    use_query_planner,
+)
+from open_deep_research.results_store import get_results_store, record_result
+from open_deep_research.state_enrichment import (
+    ArticlePayload,
+    EnrichmentReport,
+    create_initial_enrichment_state,
+)
+from open_deep_research.utils_enrichment import (
+    first_pass_search_depth,
+    format_article_for_search,
+)
+from open_deep_research.utils_logging import setup_logger
+from open_deep_research.yield_priors import plan_search_sync
+
+logger = setup_logger("batch_enrichment")
+
+
+# =============================================================================
+# INPUT READING
+# =============================================================================
+
+# Optimia_v2 webhook field names → enrichment ArticlePayload field names.
+# When several aliases map to the same field, the first one present wins.
+FIELD_ALIASES = {
+    "ident": "article_id",
+    "refFournisseur": "reference_fournisseur",
+    "lib_famille": "famille_produit",
+    "famille": "famille_produit",
+    "images_url": "images_urls",
+    "file_url": "fiche_technique_url",
+}
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def row_to_article(row: Dict[str, Any]) -> ArticlePayload:
+    """Convert an input row (enrichment or Optimia_v2 field names) to an ArticlePayload.
+
+    Args:
+        row: Parsed JSONL object or CSV row
+
+    Returns:
+        Validated ArticlePayload
+
+    Raises:
+        pydantic.ValidationError: If required fields are missing
+    """
+    data = {key: value for key, value in row.items() if key not in FIELD_ALIASES and not _is_blank(value)}
+    for alias, field in FIELD_ALIASES.items():
+        if not _is_blank(row.get(alias)):
+            data.setdefault(field, row[alias])
+
+    if "article_id" in data:
+        data["article_id"] = str(data["article_id"])
+
+    images = data.get("images_urls")
+    if isinstance(images, str):
+        data["images_urls"] = [url.strip() for url in images.replace("|", ",").split(",") if url.strip()]
+    if "images_disponibles" not in data:
+        data["images_disponibles"] = bool(data.get("images_urls"))
+
+    specs = data.get("specifications_techniques")
+    if isinstance(specs, str):
+        data["specifications_techniques"] = json.loads(specs)
+
+    fields = ArticlePayload.model_fields
+    return ArticlePayload(**{key: value for key, value in data.items() if key in fields})
+
+
+def iter_input_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows from a JSONL or CSV file without loading it in memory.
+
+    Args:
+        path: Input file path (``.csv`` is read as CSV, anything else as JSONL)
+
+    Yields:
+        One dictionary per article
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# =============================================================================
+# PROGRESS CHECKPOINT
+# =============================================================================
+
+class BatchProgressStore:
+    """SQLite record of processed article idents, used to resume interrupted batches."""
+
+    def __init__(self, path: str):
+        """Open (or create) the progress database at ``path``."""
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS batch_progress (
+                ident TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                enrichment_type TEXT,
+                credits INTEGER NOT NULL DEFAULT 0,
+                duration_seconds REAL,
+                error TEXT,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+
+    def completed_idents(self) -> set:
+        """Get the idents that were already enriched successfully."""
+        rows = self.connection.execute("SELECT ident FROM batch_progress WHERE status = 'DONE'")
+        return {ident for (ident,) in rows}
+
+    def mark(
+        self,
+        ident: str,
+        status: str,
+        enrichment_type: Optional[str] = None,
+        credits: int = 0,
+        duration_seconds: Optional[float] = None,
+        error: Optional[str] = None
+    ):
+        """Record the outcome of one article. Failed articles are retried on resume."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO batch_progress VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (ident, status, enrichment_type, credits, duration_seconds, error, datetime.now().isoformat()),
+        )
+        self.connection.commit()
+
+    def close(self):
+        """Close the underlying connection."""
+        self.connection.close()
+
+
+# =============================================================================
+# CREDIT TRACKING AND REPORTING
+# =============================================================================
+
+class TavilyCreditCounter(BaseCallbackHandler):
+    """Estimate the Tavily credits spent by the search tools of a single run.
+
+    Only used for runs that end without a routing decision: otherwise the
+    credits metered by the search phases (``RoutingDecision.search_credits``)
+    are reported.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        """Start the count at zero credits."""
+        self.credits = 0
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, tags=None, metadata=None, inputs=None, **kwargs):
+        """Add the estimated credits of a search tool call."""
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        self.credits += estimate_search_credits(name, inputs)
+
+
+def build_enrichment_report(
+    article: ArticlePayload,
+    final_state: Dict[str, Any],
+    duration_seconds: float,
+    credits: int
+) -> EnrichmentReport:
+    """Build the EnrichmentReport of an article from the final graph state.
+
+    Uses the report produced by the graph when there is one, otherwise derives
+    it from the routing decision.
+
+    Args:
+        article: Enriched article
+        final_state: Final enrichment graph state
+        duration_seconds: Wall time of the graph run
+        credits: Tavily credits spent on the article
+
+    Returns:
+        EnrichmentReport for the article
+    """
+    if final_state.get("enrichment_report"):
+        return final_state["enrichment_report"]
+
+    routing = final_state.get("routing_decision")
+    sources = []
+    if routing:
+        sources.extend({"type": "amazon", "url": p.url, "asin": p.asin} for p in routing.amazon_data or [])
+        sources.extend({"type": "web", "url": s.url, "score": s.relevance_score} for s in routing.web_sources or [])
+
+    return EnrichmentReport(
+        article_reference=article.article_id,
+        enrichment_type=routing.enrichment_type if routing else "EN_ATTENTE",
+        enrichment_status=final_state.get("enrichment_status") or "EN_ATTENTE",
+        confidence_score=routing.confidence_score if routing else 0.0,
+        processing_timestamp=datetime.now().isoformat(),
+        processing_time_seconds=duration_seconds,
+        treatment_summary={
+            "justification": routing.justification if routing else None,
+            "search_summary": routing.search_summary if routing else {},
+            "tavily_credits": credits,
+        },
+        enriched_data=final_state.get("enriched_data"),
+        warnings=final_state.get("warnings") or [],
+        sources_used=sources,
+        missing_data=(routing.missing_data if routing else None) or final_state.get("missing_data_list") or None,
+        suggestions=final_state.get("suggestions_list") or None,
+    )
+
+
+class BatchStats:
+    """Running throughput, cost and routing statistics of a batch."""
+
+    def __init__(self):
+        """Start the clock for the throughput statistics."""
+        self.started_at = time.monotonic()
+        self.processed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.unchanged = 0
+        self.invalid = 0
+        self.credits = 0
+        self.routing: Counter = Counter()
+        self.query_planner: Optional[BatchQueryPlanner] = None
+
+    def record(self, enrichment_type: str, credits: int):
+        """Record one successfully enriched article."""
+        self.processed += 1
+        self.credits += credits
+        self.routing[enrichment_type] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the current statistics."""
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "unchanged": self.unchanged,
+            "invalid": self.invalid,
+            "elapsed_seconds": round(elapsed, 1),
+            "articles_per_min": round(self.processed / elapsed * 60, 2) if elapsed else 0.0,
+            "credits_per_article": round(self.credits / self.processed, 2) if self.processed else 0.0,
+            "routing_distribution": {
+                enrichment_type: round(count / self.processed, 3)
+                for enrichment_type, count in self.routing.most_common()
+            } if self.processed else {},
+            "query_sharing": self.query_planner.snapshot() if self.query_planner else None,
+        }
+
+    def log(self, prefix: str = "📊 [BATCH]"):
+        """Log the current statistics."""
+        stats = self.snapshot()
+        routing = ", ".join(f"{key}={value:.0%}" for key, value in stats["routing_distribution"].items())
+        sharing = stats["query_sharing"]
+        sharing_summary = (
+            f" | {sharing['queries_shared']} requêtes partagées ({sharing['credits_saved']} crédits économisés)"
+            if sharing else ""
+        )
+        logger.info(
+            f"{prefix} {stats['processed']} enrichis, {stats['failed']} échecs, {stats['skipped']} déjà traités, "
+            f"{stats['unchanged']} inchangés | "
+            f"{stats['articles_per_min']} articles/min | {stats['credits_per_article']} crédits/article | {routing}"
+            f"{sharing_summary}"
+        )
+
+
+# =============================================================================
+# QUERY PLANNING
+# =============================================================================
+
+def iter_pending_articles(input_path: str, skip_idents: set) -> Iterator[ArticlePayload]:
+    """Stream the valid articles of an input file that are not in ``skip_idents``."""
+    for row in iter_input_rows(input_path):
+        try:
+            article = row_to_article(row)
+        except Exception:
+            continue
+        if article.article_id not in skip_idents:
+            yield article
+
+
+def plan_batch_queries(
+    input_path: str,
+    skip_idents: set,
+    planner: BatchQueryPlanner,
+    enrichment_config: Optional[EnrichmentConfiguration] = None
+) -> Dict[str, Any]:
+    """Declare the search queries of every pending article of a batch to the planner.
+
+    Reads the input once more without enriching anything; the queries are the
+    ones ``deep_researcher`` builds for the Amazon and web phases (including the
+    yield priors ordering and pruning).
+
+    Args:
+        input_path: JSONL or CSV file of articles
+        skip_idents: Idents already enriched (not planned)
+        planner: Planner to fill
+        enrichment_config: Configuration providing the per-phase query limits
+
+    Returns:
+        Plan summary from BatchQueryPlanner.finalize()
+    """
+    enrichment_config = enrichment_config or EnrichmentConfiguration()
+    # Demand is planned for the first pass; adaptive re-runs at advanced depth do not consume it
+    amazon_depth = first_pass_search_depth(enrichment_config.get_search_depth("amazon"))
+    web_depth = first_pass_search_depth(enrichment_config.get_search_depth("web"))
+    for article in iter_pending_articles(input_path, skip_idents):
+        queries = format_article_for_search({
+            "ean": article.ean,
+            "marque": article.marque,
+            "libelle": article.libelle,
+            "reference_fournisseur": article.reference_fournisseur,
+        })
+        search_plan = plan_search_sync(article, queries, enrichment_config)
+        reference = article.reference_fournisseur
+        planner.add_queries("tavily_search_amazon", search_plan.amazon_queries, amazon_depth, reference)
+        planner.add_queries("tavily_search_web", search_plan.web_queries, web_depth, reference)
+
+    return planner.finalize()
+
+
+# =============================================================================
+# BATCH RUNNER
+# =============================================================================
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    progress_path: Optional[str] = None,
+    concurrency: int = 4,
+    graph=None,
+    config: Optional[Dict[str, Any]] = None,
+    progress_every: int = 25,
+    quiet: bool = True,
+    share_queries: bool = True,
+    incremental: bool = True,
+    metrics_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """Enrich every article of a JSONL/CSV file and stream reports to a JSONL file.
+
+    Articles already marked as done in the progress store are skipped, so
+    re-running the same command after a crash resumes the batch. Reports are
+    written before the article is marked as done: a crash in between yields at
+    most a duplicate report, never a lost one.
+
+    With ``share_queries``, the queries of all pending articles are planned
+    before the first article starts, and each unique query is executed once
+    for the whole batch. Credits reported per article only count the queries
+    that were actually sent.
+
+    With ``incremental``, articles whose fingerprint (EAN, brand, label,
+    supplier reference, family) matches a stored result younger than the max
+    age of its enrichment type are skipped; no report is written for them.
+    Every enriched article's report is stored for the next run either way.
+
+    Args:
+        input_path: JSONL or CSV file of articles
+        output_path: JSONL file that EnrichmentReports are appended to
+        progress_path: SQLite progress file (default: ``<output_path>.progress.sqlite``)
+        concurrency: Maximum number of articles enriched at the same time
+        graph: Compiled enrichment graph (default: article_enrichment_graph)
+        config: Extra RunnableConfig passed to every graph run
+        progress_every: Log statistics every N finished articles
+        quiet: Silence the graph's console output
+        share_queries: Share search results between articles issuing the same queries
+        incremental: Skip articles that did not change since a still-fresh result
+        metrics_path: Prometheus textfile rewritten with the statistics and at the end (see ``metrics``)
+
+    Returns:
+        Final batch statistics
+    """
+    if graph is None:
+        from open_deep_research.article_enrichment_graph import enrichment_graph
+        graph = enrichment_graph
+
+    progress = BatchProgressStore(progress_path or f"{output_path}.progress.sqlite")
+    completed = progress.completed_idents()
+    stats = BatchStats()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks = set()
+
+    if completed:
+        logger.info(f"♻️  [BATCH] Reprise: {len(completed)} article(s) déjà traités seront ignorés")
+
+    enrichment_config = EnrichmentConfiguration()
+    unchanged = set()
+    if incremental and enrichment_config.incremental_enabled:
+        results_store = get_results_store(enrichment_config.results_store_path)
+        unchanged = await asyncio.to_thread(
+            results_store.fresh_idents, iter_pending_articles(input_path, completed), enrichment_config
+        )
+        if unchanged:
+            logger.info(f"🔁 [BATCH] Incrémental: {len(unchanged)} article(s) inchangé(s) seront ignorés")
+    skip_idents = completed | unchanged
+
+    planner = None
+    if share_queries:
+        planner = BatchQueryPlanner()
+        plan = plan_batch_queries(input_path, skip_idents, planner)
+        stats.query_planner = planner
+        logger.info(
+            f"🧮 [PLAN] {plan['planned_queries']} requêtes planifiées, {plan['unique_queries']} uniques "
+            f"({plan['variant_groups']} groupes de variantes) → jusqu'à {plan['projected_credits_saved']} crédits économisés"
+        )
+
+    # Media links are checked ahead of the graph runs, which then read the probe cache
+    media_prefetch = None
+    if enrichment_config.media_probe_enabled:
+        media_prefetch = asyncio.create_task(
+            prefetch_media(iter_pending_articles(input_path, set(skip_idents)), enrichment_config)
+        )
+
+    async def enrich(article: ArticlePayload, output):
+        counter = TavilyCreditCounter()
+        run_config = {**(config or {}), "callbacks": [*(config or {}).get("callbacks", []), counter]}
+        start = time.monotonic()
+        try:
+            with track_query_usage() as usage:
+                final_state = await graph.ainvoke(create_initial_enrichment_state(article), run_config)
+            routing = final_state.get("routing_decision")
+            # The search phases meter the requests actually sent; the callback estimate (minus the
+            # queries served from another article's results) only covers runs without a decision
+            credits = routing.search_credits if routing else counter.credits - usage.credits_saved
+            duration = time.monotonic() - start
+            report = build_enrichment_report(article, final_state, duration, credits)
+            output.write(report.model_dump_json() + "\n")
+            output.flush()
+            await record_result(article, report, enrichment_config)
+            progress.mark(article.article_id, "DONE", report.enrichment_type, credits, duration)
+            stats.record(report.enrichment_type, credits)
+        except Exception as e:
+            stats.failed += 1
+            progress.mark(article.article_id, "FAILED", None, counter.credits, time.monotonic() - start, str(e))
+            logger.error(f"❌ [BATCH] {article.article_id}: {e}")
+        finally:
+            semaphore.release()
+
+        finished = stats.processed + stats.failed
+        if progress_every and finished % progress_every == 0:
+            stats.log()
+            write_metrics_file(metrics_path)
+
+    stdout_target = open(os.devnull, "w") if quiet else sys.stdout
+    try:
+        with (
+            open(output_path, "a", encoding="utf-8") as output,
+            contextlib.redirect_stdout(stdout_target),
+            use_query_planner(planner),
+        ):
+            for row in iter_input_rows(input_path):
+                try:
+                    article = row_to_article(row)
+                except Exception as e:
+                    stats.invalid += 1
+                    logger.warning(f"⚠️  [BATCH] Ligne ignorée (invalide): {str(e).splitlines()[0]}")
+                    continue
+
+                if article.article_id in completed:
+                    stats.skipped += 1
+                    continue
+                if article.article_id in unchanged:
+                    stats.unchanged += 1
+                    continue
+                # Avoid enriching the same ident twice within one batch
+                completed.add(article.article_id)
+
+                # Backpressure: only read the next row once a slot is free
+                await semaphore.acquire()
+                task = asyncio.create_task(enrich(article, output))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+
+        if media_prefetch is not None:
+            media_counts = await media_prefetch
+            if media_counts:
+                logger.info(f"🖼️  [MEDIA] Liens vérifiés: {media_counts}")
+    finally:
+        if media_prefetch is not None and not media_prefetch.done():
+            media_prefetch.cancel()
+        if quiet:
+            stdout_target.close()
+        progress.close()
+
+    stats.log("✅ [BATCH] Terminé:")
+    write_metrics_file(metrics_path)
+    return stats.snapshot()
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv=None) -> int:
+    """Run a batch enrichment from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or CSV file of articles")
+    parser.add_argument("--output", required=True, help="JSONL file to append EnrichmentReports to")
+    parser.add_argument("--progress", help="SQLite progress file (default: <output>.progress.sqlite)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Articles enriched concurrently")
+    parser.add_argument("--progress-every", type=int, default=25, help="Log statistics every N articles")
+    parser.add_argument("--model", help="Model override passed as configurable.model")
+    parser.add_argument("--verbose", action="store_true", help="Keep the graph's console output")
+    parser.add_argument("--no-query-sharing", action="store_true", help="Let every article run its own search queries")
+    parser.add_argument("--full", action="store_true", help="Re-enrich unchanged articles (ignore stored results)")
+    parser.add_argument("--metrics-file", help="Prometheus textfile to write the enrichment metrics to")
+    args = parser.parse_args(argv)
+
+    config = {"configurable": {"model": args.model}} if args.model else None
+    stats = asyncio.run(run_batch(
+        args.input,
+        args.output,
+        progress_path=args.progress,
+        concurrency=args.concurrency,
+        config=config,
+        progress_every=args.progress_every,
+        quiet=not args.verbose,
+        share_queries=not args.no_query_sharing,
+        incremental=not args.full,
+        metrics_path=args.metrics_file,
+    ))
+    # Final statistics go to stdout as JSON; logs stay on stderr
+    sys.stdout.write(json.dumps(stats, indent=2) + "\n")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Candidate matching engine for enrichment confidence scoring.
+
+Scores every search candidate of an article at once instead of trusting the
+first hit. Each candidate (title + snippet) is compared with the article on:
+
+- EAN: barcodes detected in the candidate text, compared as GTIN-14
+- Brand, model and category: character trigram containment of the article
+  value in the candidate text
+- Supplier reference: trigram containment on separator-free text, so that
+  "GV9580-C0" matches "GV9580C0" (counts towards the model criterion)
+
+Trigrams are hashed into a fixed number of buckets with NumPy on the raw
+bytes of all candidates in one pass, and the similarities of all candidates
+are computed with one membership test and bincount per criterion. The criteria
+are combined with the ``ScoringThresholds`` weights.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from open_deep_research.configuration_enrichment import (
+    EnrichmentConfiguration,
+    ScoringThresholds,
+)
+from open_deep_research.resolution_index import ean_key
+from open_deep_research.state_enrichment import AmazonProduct, ArticlePayload
+
+# =============================================================================
+# TEXT NORMALIZATION
+# =============================================================================
+
+# Number of hash buckets for character trigrams
+NGRAM_BUCKETS = 1 << 14
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+# 8 to 14 digits, optionally grouped with spaces or dashes ("3 760123 456789")
+_BARCODE = re.compile(r"(?<![\d])\d(?:[ -]?\d){7,13}(?![\d])")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalize text for matching: accents stripped, case-folded, one space between tokens.
+
+    Example:
+        "Fer à Repasser GV9580-C0" → "fer a repasser gv9580 c0"
+    """
+    # NFKD splits accented letters into letter + combining mark; the ASCII encode drops the marks
+    text = unicodedata.normalize("NFKD", (text or "").casefold()).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def compact_text(text: Optional[str]) -> str:
+    """Normalize text and drop every separator (for supplier references)."""
+    return normalize_text(text).replace(" ", "")
+
+
+def detect_eans(text: Optional[str]) -> List[str]:
+    """Find barcodes in free text.
+
+    Args:
+        text: Title, snippet or URL
+
+    Returns:
+        GTIN-14 keys of the barcodes found (see resolution_index.ean_key)
+    """
+    keys = (ean_key(match.group(0)) for match in _BARCODE.finditer(text or ""))
+    return [key for key in keys if key]
+
+
+def _trigram_ids(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash the character trigrams of several texts in one vectorized pass.
+
+    Args:
+        texts: Normalized texts
+
+    Returns:
+        Tuple of (text index, trigram bucket) arrays, one entry per trigram
+    """
+    # Pad each text with a space so word starts/ends form trigrams, and
+    # separate texts with a NUL byte so no trigram spans two texts
+    padded = [f" {text} ".encode() for text in texts]
+    data = np.frombuffer(b"\0".join(padded), dtype=np.uint8).astype(np.int64)
+    if data.size < 3:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    lengths = np.array([len(text) for text in padded])
+    owners = np.repeat(np.arange(len(padded)), lengths + 1)[:data.size]
+
+    ids = (data[:-2] * 65599 * 65599 + data[1:-1] * 65599 + data[2:]) % NGRAM_BUCKETS
+    # Drop trigrams that straddle a separator
+    valid = (owners[:-2] == owners[2:]) & (data[:-2] != 0) & (data[2:] != 0)
+    return owners[:-2][valid], ids[valid]
+
+
+class _TrigramIndex:
+    """Trigram buckets of each candidate text, stored as flat (text, bucket) arrays."""
+
+    def __init__(self, texts: Sequence[str]):
+        self.size = len(texts)
+        self.rows, self.ids = _trigram_ids(texts)
+
+    def containment(self, needle: str) -> np.ndarray:
+        """Share of the needle's distinct trigrams found in each text (0.0 when the needle is empty)."""
+        if not needle:
+            return np.zeros(self.size)
+        _, needle_ids = _trigram_ids([needle])
+        needle_ids = np.unique(needle_ids)
+        if needle_ids.size == 0:
+            return np.zeros(self.size)
+
+        # Position of each bucket in the needle, -1 for buckets the needle does not have
+        positions = np.full(NGRAM_BUCKETS, -1)
+        positions[needle_ids] = np.arange(needle_ids.size)
+        candidate_positions = positions[self.ids]
+        found = candidate_positions >= 0
+
+        present = np.zeros((self.size, needle_ids.size), dtype=bool)
+        present[self.rows[found], candidate_positions[found]] = True
+        return present.mean(axis=1)
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+@dataclass
+class CandidateScores:
+    """Per-criterion and combined scores of all candidates of an article."""
+
+    ean: np.ndarray
+    brand: np.ndarray
+    model: np.ndarray
+    category: np.ndarray
+    total: np.ndarray
+
+    @property
+    def best_index(self) -> int:
+        """Index of the best candidate (the first one on ties)."""
+        return int(np.argmax(self.total)) if self.total.size else -1
+
+    @property
+    def best_score(self) -> float:
+        """Combined score of the best candidate (0.0 without candidates)."""
+        return float(self.total.max()) if self.total.size else 0.0
+
+    def breakdown(self, index: int) -> dict:
+        """Criterion scores of one candidate, rounded for reporting."""
+        return {
+            "ean": round(float(self.ean[index]), 3),
+            "brand": round(float(self.brand[index]), 3),
+            "model": round(float(self.model[index]), 3),
+            "category": round(float(self.category[index]), 3),
+            "total": round(float(self.total[index]), 3),
+        }
+
+
+def score_candidates(
+    article: ArticlePayload,
+    candidate_texts: Sequence[str],
+    thresholds: ScoringThresholds
+) -> CandidateScores:
+    """Score every candidate text against an article.
+
+    Args:
+        article: Article being enriched
+        candidate_texts: One text per candidate (title, snippet, URL...)
+        thresholds: Scoring weights
+
+    Returns:
+        CandidateScores with one entry per candidate, in input order
+    """
+    count = len(candidate_texts)
+    if count == 0:
+        empty = np.zeros(0)
+        return CandidateScores(empty, empty, empty, empty, empty)
+
+    normalized = [normalize_text(text) for text in candidate_texts]
+    words = _TrigramIndex(normalized)
+
+    brand = words.containment(normalize_text(article.marque))
+    model = words.containment(normalize_text(article.libelle))
+    category = words.containment(normalize_text(article.famille_produit))
+
+    reference = compact_text(article.reference_fournisseur)
+    if reference:
+        compact = _TrigramIndex([text.replace(" ", "") for text in normalized])
+        model = np.maximum(model, compact.containment(reference))
+
+    article_ean = ean_key(article.ean)
+    ean = np.array(
+        [float(article_ean is not None and article_ean in detect_eans(text)) for text in candidate_texts]
+    )
+
+    total = (
+        ean * thresholds.ean_match_weight
+        + brand * thresholds.brand_match_weight
+        + model * thresholds.model_match_weight
+        + category * thresholds.category_match_weight
+    )
+    return CandidateScores(ean=ean, brand=brand, model=model, category=category, total=np.minimum(total, 1.0))
+
+
+def _amazon_candidate_text(product: AmazonProduct) -> str:
+    return " ".join(part for part in (product.title, product.content_snippet, product.url) if part)
+
+
+def rank_amazon_products(
+    products: List[AmazonProduct],
+    article: ArticlePayload,
+    config: EnrichmentConfiguration
+) -> Tuple[List[AmazonProduct], float]:
+    """Score all Amazon candidates and order them from best to worst match.
+
+    Each product's metadata gets a ``match_scores`` breakdown.
+
+    Args:
+        products: Amazon products found
+        article: Original article payload
+        config: Enrichment configuration (scoring weights)
+
+    Returns:
+        Tuple of (products sorted by decreasing score, best score)
+    """
+    scores = score_candidates(article, [_amazon_candidate_text(product) for product in products], config.scoring_thresholds)
+    # Stable sort: equal scores keep the search engine's order
+    order = np.argsort(-scores.total, kind="stable")
+
+    ranked = []
+    for index in order:
+        product = products[index]
+        ranked.append(product.model_copy(update={
+            "metadata": {**(product.metadata or {}), "match_scores": scores.breakdown(index)}
+        }))
+    return ranked, scores.best_score
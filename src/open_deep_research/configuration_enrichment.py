@@ -3,8 +3,9 @@
 This module defines the configuration options for the cascade enrichment process.
 """
 
+import os
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -110,6 +111,27 @@ class ScoringThresholds(BaseModel):
     )
 
 
+def default_data_path(filename: str) -> str:
+    """
+    Default location of a local enrichment store.
+
+    Stores live in ``ENRICHMENT_DATA_DIR`` when set, else in the user data directory
+    (``$XDG_DATA_HOME/open_deep_research``, ``~/.local/share/open_deep_research`` by default),
+    never in the current working directory.
+
+    Args:
+        filename: File name of the store
+
+    Returns:
+        Path of the store file
+    """
+    data_dir = os.getenv("ENRICHMENT_DATA_DIR") or os.path.join(
+        os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+        "open_deep_research",
+    )
+    return os.path.join(data_dir, filename)
+
+
 class EnrichmentConfiguration(BaseModel):
     """Main configuration for the Article Enrichment system."""
 
@@ -175,9 +197,20 @@ class EnrichmentConfiguration(BaseModel):
         description="Maximum searches for technical documentation phase"
     )
 
-    tavily_search_depth: str = Field(
-        default="advanced",
-        description="Tavily search depth: 'basic' (1 credit) or 'advanced' (2 credits)"
+    tavily_search_depth: Literal["basic", "advanced", "adaptive"] = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_SEARCH_DEPTH", "adaptive"),
+        description="Tavily search depth: 'basic' (1 credit), 'advanced' (2 credits) or 'adaptive' "
+                    "(basic first, re-run at advanced when the phase's confidence threshold is not met)"
+    )
+
+    amazon_search_depth: Optional[Literal["basic", "advanced", "adaptive"]] = Field(
+        default=None,
+        description="Override of tavily_search_depth for the Amazon phase"
+    )
+
+    web_search_depth: Optional[Literal["basic", "advanced", "adaptive"]] = Field(
+        default=None,
+        description="Override of tavily_search_depth for the general web phase"
     )
 
     tavily_max_results: int = Field(
@@ -187,6 +220,133 @@ class EnrichmentConfiguration(BaseModel):
         description="Maximum results per Tavily search"
     )
 
+    tavily_max_concurrent_queries: int = Field(
+        default=5,
+        ge=1,
+        le=20,
+        description="Maximum number of Tavily queries in flight per search phase"
+    )
+
+    tavily_query_timeout: float = Field(
+        default=30.0,
+        ge=5.0,
+        le=120.0,
+        description="Timeout in seconds for each Tavily query"
+    )
+
+    # =========================================================================
+    # SPECULATIVE SEARCH (latency vs credits trade-off)
+    # =========================================================================
+
+    speculative_search: bool = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_SPECULATIVE_SEARCH", "false").lower() == "true",
+        description="Run the web phase concurrently with the Amazon phase instead of after an Amazon miss. "
+                    "Articles missing on Amazon save one search latency; articles found on Amazon may spend web credits"
+    )
+
+    speculative_web_delay_seconds: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=30.0,
+        description="Delay before the speculative web phase starts. An Amazon hit within this window spends no web credits"
+    )
+
+    speculative_cancel_on_amazon_hit: bool = Field(
+        default=True,
+        description="Cancel the speculative web phase on a confident REFERENTIEL match. "
+                    "If False, wait for it and keep its sources as a fallback in web_sources_found"
+    )
+
+    # =========================================================================
+    # RESOLUTION INDEX (skip searches for already resolved products)
+    # =========================================================================
+
+    resolution_index_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_INDEX_ENABLED", "true").lower() == "true",
+        description="Reuse routing decisions previously resolved for the same EAN or brand + reference"
+    )
+
+    resolution_index_path: str = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_INDEX_PATH") or default_data_path("enrichment_index.sqlite"),
+        description="SQLite file of the local product resolution index"
+    )
+
+    resolution_index_referentiel_ttl_hours: float = Field(
+        default=24 * 30,
+        ge=0.0,
+        description="Hours an indexed REFERENTIEL (Amazon) resolution is reused without searching"
+    )
+
+    resolution_index_web_ttl_hours: float = Field(
+        default=24 * 7,
+        ge=0.0,
+        description="Hours an indexed WEB resolution is reused without searching"
+    )
+
+    # =========================================================================
+    # INCREMENTAL ENRICHMENT (skip unchanged articles on catalog re-sends)
+    # =========================================================================
+
+    incremental_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_INCREMENTAL", "true").lower() == "true",
+        description="Skip articles whose search fields are unchanged since a result that is still fresh"
+    )
+
+    results_store_path: str = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_RESULTS_PATH") or default_data_path("enrichment_results.sqlite"),
+        description="SQLite file of the enrichment results store (fingerprint + last report per ident)"
+    )
+
+    result_max_age_hours: Dict[str, float] = Field(
+        default_factory=lambda: {
+            "REFERENTIEL": 24 * 30,
+            "WEB": 24 * 14,
+            "GENERATIF": 24 * 30,
+            "EN_ATTENTE": 24,
+        },
+        description="Hours a stored result stays fresh, per enrichment type (unlisted types: always re-run)"
+    )
+
+    # =========================================================================
+    # YIELD PRIORS (order and prune query languages and Amazon domains)
+    # =========================================================================
+
+    yield_priors_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_PRIORS_ENABLED", "true").lower() == "true",
+        description="Learn which query languages and Amazon domains lead to confident matches per family and brand"
+    )
+
+    yield_priors_path: str = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_PRIORS_PATH") or default_data_path("enrichment_priors.sqlite"),
+        description="SQLite file of the search yield statistics"
+    )
+
+    yield_priors_exploration_rate: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Probability of keeping a pruned language or domain so its estimate keeps learning"
+    )
+
+    yield_priors_min_yield: float = Field(
+        default=0.05,
+        ge=0.0,
+        le=1.0,
+        description="Expected yield below which a language or domain is pruned"
+    )
+
+    yield_priors_min_observations: int = Field(
+        default=20,
+        ge=1,
+        description="Attempts of a language or domain (all families and brands) before it can be reordered or pruned"
+    )
+
+    yield_priors_strength: float = Field(
+        default=5.0,
+        gt=0.0,
+        description="Weight, in attempts, of the family / brand / global rate when smoothing a (family, brand) hit rate"
+    )
+
     # =========================================================================
     # SCORING AND MATCHING
     # =========================================================================
@@ -250,6 +410,25 @@ class EnrichmentConfiguration(BaseModel):
         description="Timeout in seconds for Tavily extraction"
     )
 
+    tavily_extract_batch_size: int = Field(
+        default=20,
+        ge=1,
+        le=20,
+        description="URLs sent per Tavily Extract request (billed per 5 URLs)"
+    )
+
+    tavily_extract_max_chars: int = Field(
+        default=2000,
+        ge=0,
+        description="Characters of extracted content kept per page (0 = no truncation)"
+    )
+
+    extract_cache_ttl_hours: float = Field(
+        default_factory=lambda: float(os.getenv("ENRICHMENT_EXTRACT_CACHE_TTL_HOURS", "24")),
+        ge=0.0,
+        description="Hours extracted content is reused before revalidation (0 disables the extract cache)"
+    )
+
     # =========================================================================
     # GENERATIF PRE-REQUISITES
     # =========================================================================
@@ -264,6 +443,32 @@ class EnrichmentConfiguration(BaseModel):
         description="Whether GENERATIF enrichment requires technical data or PDF"
     )
 
+    media_probe_enabled: bool = Field(
+        default_factory=lambda: os.getenv("ENRICHMENT_MEDIA_PROBE", "true").lower() == "true",
+        description="Check that image, datasheet and document URLs are reachable (and storage folders "
+                    "non-empty) before counting them towards GENERATIF eligibility"
+    )
+
+    media_probe_timeout: float = Field(
+        default=3.0,
+        gt=0.0,
+        le=30.0,
+        description="Timeout in seconds for each media availability check"
+    )
+
+    media_probe_max_concurrency: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Maximum number of media availability checks in flight"
+    )
+
+    media_probe_cache_ttl_hours: float = Field(
+        default=6.0,
+        ge=0.0,
+        description="Hours a media availability result is reused"
+    )
+
     # =========================================================================
     # OUTPUT SETTINGS
     # =========================================================================
@@ -283,6 +488,38 @@ class EnrichmentConfiguration(BaseModel):
         description="Include detailed confidence scoring in report"
     )
 
+    def get_search_depth(self, phase: Literal["amazon", "web"]) -> str:
+        """
+        Get the Tavily search depth of a search phase.
+
+        Args:
+            phase: "amazon" or "web"
+
+        Returns:
+            "basic", "advanced" or "adaptive"
+        """
+        override = self.amazon_search_depth if phase == "amazon" else self.web_search_depth
+        return override or self.tavily_search_depth
+
+    def get_extract_args(self, urls: List[str]) -> Dict[str, Any]:
+        """
+        Build tavily_extract_content arguments from the extraction settings.
+
+        Args:
+            urls: URLs to extract
+
+        Returns:
+            Tool arguments
+        """
+        return {
+            "urls": urls,
+            "extract_depth": self.tavily_extract_depth,
+            "max_content_chars": self.tavily_extract_max_chars,
+            "batch_size": self.tavily_extract_batch_size,
+            "cache_ttl_seconds": self.extract_cache_ttl_hours * 3600,
+            "timeout": self.tavily_extract_timeout,
+        }
+
 
 # =============================================================================
 # DEFAULT CONFIGURATION INSTANCE
@@ -1,9 +1,9 @@
 """Main LangGraph implementation for the Deep Research agent."""
 
 import asyncio
-from typing import Literal
+from functools import lru_cache
+from typing import Literal, Optional
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
@@ -16,9 +16,11 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Command
 
+from open_deep_research.admission import ends_run
 from open_deep_research.configuration import (
     Configuration,
 )
+from open_deep_research.media_prober import any_available
 from open_deep_research.prompts import (
     clarify_with_user_instructions,
     compress_research_simple_human_message,
@@ -52,10 +54,19 @@ from open_deep_research.utils import (
     think_tool,
 )
 
-# Initialize a configurable model that we will use throughout the agent
-configurable_model = init_chat_model(
-    configurable_fields=("model", "max_tokens", "api_key"),
-)
+
+@lru_cache(maxsize=1)
+def get_configurable_model():
+    """Get the configurable model used throughout the agent, created on first use.
+
+    `langchain.chat_models` and the provider integrations it loads are only
+    imported when the first node runs, not when this module is imported.
+    """
+    from langchain.chat_models import init_chat_model
+
+    return init_chat_model(
+        configurable_fields=("model", "max_tokens", "api_key"),
+    )
 
 async def clarify_with_user(state: AgentState, config: RunnableConfig) -> Command[Literal["write_research_brief", "__end__"]]:
     """Analyze user messages and ask clarifying questions if the research scope is unclear.
@@ -87,7 +98,7 @@ async def clarify_with_user(state: AgentState, config: RunnableConfig) -> Comman
     
     # Configure model with structured output and retry logic
     clarification_model = (
-        configurable_model
+        get_configurable_model()
         .with_structured_output(ClarifyWithUser)
         .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
         .with_config(model_config)
@@ -131,10 +142,14 @@ async def write_research_brief(state: AgentState, config: RunnableConfig) -> Com
     Returns:
         Command to proceed to research supervisor with initialized context
     """
-    from open_deep_research.prompts import article_enrichment_transform_prompt, article_enrichment_supervisor_prompt
-    from open_deep_research.state import ArticlePayload
     import json
 
+    from open_deep_research.prompts import (
+        article_enrichment_supervisor_prompt,
+        article_enrichment_transform_prompt,
+    )
+    from open_deep_research.state import ArticlePayload
+
     # Step 1: Set up the research model for structured output
     configurable = Configuration.from_runnable_config(config)
     research_model_config = {
@@ -146,7 +161,7 @@ async def write_research_brief(state: AgentState, config: RunnableConfig) -> Com
 
     # Configure model for structured research question generation
     research_model = (
-        configurable_model
+        get_configurable_model()
         .with_structured_output(ResearchQuestion)
         .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
         .with_config(research_model_config)
@@ -280,7 +295,7 @@ async def supervisor(state: SupervisorState, config: RunnableConfig) -> Command[
     
     # Configure model with tools, retry logic, and model settings
     research_model = (
-        configurable_model
+        get_configurable_model()
         .bind_tools(lead_researcher_tools)
         .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
         .with_config(research_model_config)
@@ -368,14 +383,17 @@ async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Co
             allowed_conduct_research_calls = conduct_research_calls[:configurable.max_concurrent_research_units]
             overflow_conduct_research_calls = conduct_research_calls[configurable.max_concurrent_research_units:]
             
-            # Execute research tasks in parallel
+            # Execute research tasks in parallel, tagging each run with its research unit
             research_tasks = [
-                researcher_subgraph.ainvoke({
+                build_researcher_subgraph().ainvoke({
                     "researcher_messages": [
                         HumanMessage(content=tool_call["args"]["research_topic"])
                     ],
                     "research_topic": tool_call["args"]["research_topic"]
-                }, config) 
+                }, {
+                    **config,
+                    "metadata": {**config.get("metadata", {}), "research_unit": tool_call["id"]}
+                })
                 for tool_call in allowed_conduct_research_calls
             ]
             
@@ -427,17 +445,35 @@ async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Co
 
 # Supervisor Subgraph Construction
 # Creates the supervisor workflow that manages research delegation and coordination
-supervisor_builder = StateGraph(SupervisorState, config_schema=Configuration)
+@lru_cache(maxsize=1)
+def build_supervisor_subgraph():
+    """Build and compile the supervisor subgraph on first use."""
+    supervisor_builder = StateGraph(SupervisorState, config_schema=Configuration)
+
+    # Add supervisor nodes for research management
+    supervisor_builder.add_node("supervisor", supervisor)           # Main supervisor logic
+    supervisor_builder.add_node("supervisor_tools", supervisor_tools)  # Tool execution handler
+
+    # Define supervisor workflow edges
+    supervisor_builder.add_edge(START, "supervisor")  # Entry point to supervisor
 
-# Add supervisor nodes for research management
-supervisor_builder.add_node("supervisor", supervisor)           # Main supervisor logic
-supervisor_builder.add_node("supervisor_tools", supervisor_tools)  # Tool execution handler
+    # Compile supervisor subgraph for use in main workflow
+    return supervisor_builder.compile()
 
-# Define supervisor workflow edges
-supervisor_builder.add_edge(START, "supervisor")  # Entry point to supervisor
+async def research_supervisor(state: AgentState, config: RunnableConfig):
+    """Run the supervisor subgraph (research execution phase).
 
-# Compile supervisor subgraph for use in main workflow
-supervisor_subgraph = supervisor_builder.compile()
+    Wrapping the subgraph in a node lets ``ends_run`` free the run's admission
+    slot when research fails.
+
+    Args:
+        state: Current agent state with the research brief and supervisor messages
+        config: Runtime configuration, passed through to the subgraph
+
+    Returns:
+        Final supervisor state (notes, raw notes and supervisor messages)
+    """
+    return await build_supervisor_subgraph().ainvoke(state, config)
 
 async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[Literal["researcher_tools"]]:
     """Individual researcher that conducts focused research on specific topics.
@@ -481,7 +517,7 @@ async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[
     
     # Configure model with tools, retry logic, and settings
     research_model = (
-        configurable_model
+        get_configurable_model()
         .bind_tools(tools)
         .with_retry(stop_after_attempt=configurable.max_structured_output_retries)
         .with_config(research_model_config)
@@ -601,7 +637,7 @@ async def compress_research(state: ResearcherState, config: RunnableConfig):
     """
     # Step 1: Configure the compression model
     configurable = Configuration.from_runnable_config(config)
-    synthesizer_model = configurable_model.with_config({
+    synthesizer_model = get_configurable_model().with_config({
         "model": configurable.compression_model,
         "max_tokens": configurable.compression_model_max_tokens,
         "api_key": get_api_key_for_model(configurable.compression_model, config),
@@ -663,23 +699,26 @@ async def compress_research(state: ResearcherState, config: RunnableConfig):
 
 # Researcher Subgraph Construction
 # Creates individual researcher workflow for conducting focused research on specific topics
-researcher_builder = StateGraph(
-    ResearcherState, 
-    output=ResearcherOutputState, 
-    config_schema=Configuration
-)
+@lru_cache(maxsize=1)
+def build_researcher_subgraph():
+    """Build and compile the researcher subgraph on first use."""
+    researcher_builder = StateGraph(
+        ResearcherState, 
+        output=ResearcherOutputState, 
+        config_schema=Configuration
+    )
 
-# Add researcher nodes for research execution and compression
-researcher_builder.add_node("researcher", researcher)                 # Main researcher logic
-researcher_builder.add_node("researcher_tools", researcher_tools)     # Tool execution handler
-researcher_builder.add_node("compress_research", compress_research)   # Research compression
+    # Add researcher nodes for research execution and compression
+    researcher_builder.add_node("researcher", researcher)                 # Main researcher logic
+    researcher_builder.add_node("researcher_tools", researcher_tools)     # Tool execution handler
+    researcher_builder.add_node("compress_research", compress_research)   # Research compression
 
-# Define researcher workflow edges
-researcher_builder.add_edge(START, "researcher")           # Entry point to researcher
-researcher_builder.add_edge("compress_research", END)      # Exit point after compression
+    # Define researcher workflow edges
+    researcher_builder.add_edge(START, "researcher")           # Entry point to researcher
+    researcher_builder.add_edge("compress_research", END)      # Exit point after compression
 
-# Compile researcher subgraph for parallel execution by supervisor
-researcher_subgraph = researcher_builder.compile()
+    # Compile researcher subgraph for parallel execution by supervisor
+    return researcher_builder.compile()
 
 async def final_report_generation(state: AgentState, config: RunnableConfig):
     """Generate the final comprehensive research report with retry logic for token limits.
@@ -696,10 +735,17 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
     Returns:
         Dictionary containing the final report (or JSON) and cleared state
     """
-    from open_deep_research.prompts import article_enrichment_final_report_prompt
-    from open_deep_research.state import extract_asin_from_url, extract_domain_from_url, AmazonProduct, WebSource
     import json
-    import re
+
+    from open_deep_research.prompts import article_enrichment_final_report_prompt
+    from open_deep_research.url_canonical import (
+        canonicalize_url,
+        dedupe_urls,
+        extract_asin,
+        extract_domain,
+        find_urls,
+        is_amazon_domain,
+    )
 
     # Step 1: Extract research findings and prepare state cleanup
     notes = state.get("notes", [])
@@ -726,14 +772,15 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
         amazon_products = []
         web_sources = []
 
-        # Parse findings to extract URLs
+        # Parse findings to extract URLs, one per source (tracking variants and
+        # alternate Amazon product paths collapse to the same identity key)
         all_content = findings + "\n".join(raw_notes)
-        urls = re.findall(r'https?://[^\s<>"]+|www\.[^\s<>"]+', all_content)
+        urls = [canonicalize_url(url) for url in dedupe_urls(find_urls(all_content))]
 
         for url in urls:
-            domain = extract_domain_from_url(url)
-            if domain and 'amazon' in domain:
-                asin = extract_asin_from_url(url)
+            domain = extract_domain(url)
+            if is_amazon_domain(domain):
+                asin = extract_asin(url)
                 if asin:
                     amazon_products.append({
                         "asin": asin,
@@ -766,8 +813,12 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
             next_subgraph = "web_subgraph"
             confidence_score = 0.70
             justification = f"Found {len(web_sources)} quality web sources"
-        elif article_payload.images_disponibles and (article_payload.specifications_techniques or article_payload.dimensions or article_payload.arcoul):
-            # Check for images + any technical data (specs, dimensions, color)
+        elif (
+            article_payload.images_disponibles
+            and (article_payload.specifications_techniques or article_payload.dimensions or article_payload.arcoul)
+            and await any_available([article_payload.images_url, *article_payload.images_urls])
+        ):
+            # Check for reachable images (not a dead link or empty folder) + any technical data (specs, dimensions, color)
             enrichment_type = "GENERATIF"
             next_subgraph = "generative_subgraph"
             confidence_score = 0.60
@@ -824,7 +875,7 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
                 )
 
                 # Generate the final report
-                final_report = await configurable_model.with_config(writer_model_config).ainvoke([
+                final_report = await get_configurable_model().with_config(writer_model_config).ainvoke([
                     HumanMessage(content=final_report_prompt)
                 ])
 
@@ -875,22 +926,52 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
 
 # Main Deep Researcher Graph Construction
 # Creates the complete deep research workflow from user input to final report
-deep_researcher_builder = StateGraph(
-    AgentState, 
-    input=AgentInputState, 
-    config_schema=Configuration
-)
+@lru_cache(maxsize=1)
+def get_deep_researcher_builder() -> StateGraph:
+    """Build the (uncompiled) deep researcher workflow on first use."""
+    deep_researcher_builder = StateGraph(
+        AgentState, 
+        input=AgentInputState, 
+        config_schema=Configuration
+    )
+
+    # Add main workflow nodes for the complete research process
+    deep_researcher_builder.add_node("clarify_with_user", ends_run(clarify_with_user))  # User clarification phase
+    deep_researcher_builder.add_node("write_research_brief", ends_run(write_research_brief))  # Research planning phase
+    deep_researcher_builder.add_node("research_supervisor", ends_run(research_supervisor))  # Research execution phase
+    deep_researcher_builder.add_node("final_report_generation", ends_run(final_report_generation, terminal=True))  # Report generation phase
+
+    # Define main workflow edges for sequential execution
+    deep_researcher_builder.add_edge(START, "clarify_with_user")                       # Entry point
+    deep_researcher_builder.add_edge("research_supervisor", "final_report_generation") # Research to report
+    deep_researcher_builder.add_edge("final_report_generation", END)                   # Final exit point
+
+    return deep_researcher_builder
+
+
+@lru_cache(maxsize=1)
+def build_deep_researcher():
+    """Compile the complete deep researcher workflow on first use (cached)."""
+    return get_deep_researcher_builder().compile()
+
+
+def make_deep_researcher(config: Optional[RunnableConfig] = None):
+    """Graph factory referenced by langgraph.json: the graph is compiled once, on first request."""
+    return build_deep_researcher()
+
 
-# Add main workflow nodes for the complete research process
-deep_researcher_builder.add_node("clarify_with_user", clarify_with_user)           # User clarification phase
-deep_researcher_builder.add_node("write_research_brief", write_research_brief)     # Research planning phase
-deep_researcher_builder.add_node("research_supervisor", supervisor_subgraph)       # Research execution phase
-deep_researcher_builder.add_node("final_report_generation", final_report_generation)  # Report generation phase
+# Compiled graphs stay importable by name (`from ... import deep_researcher`),
+# but are only built on first access
+_LAZY_ATTRIBUTES = {
+    "deep_researcher": build_deep_researcher,
+    "deep_researcher_builder": get_deep_researcher_builder,
+    "supervisor_subgraph": build_supervisor_subgraph,
+    "researcher_subgraph": build_researcher_subgraph,
+    "configurable_model": get_configurable_model,
+}
 
-# Define main workflow edges for sequential execution
-deep_researcher_builder.add_edge(START, "clarify_with_user")                       # Entry point
-deep_researcher_builder.add_edge("research_supervisor", "final_report_generation") # Research to report
-deep_researcher_builder.add_edge("final_report_generation", END)                   # Final exit point
 
-# Compile the complete deep researcher workflow
-deep_researcher = deep_researcher_builder.compile()
\ No newline at end of file
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
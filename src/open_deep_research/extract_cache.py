@@ -0,0 +1,190 @@
+"""Extracted page content cache for Article Enrichment.
+
+Datasheets and manufacturer pages are shared by many articles of the same
+brand. ``ExtractCache`` keeps the full content returned by Tavily Extract per
+URL and extract depth, so ``tavily_extract_content`` only pays for pages it has
+not seen recently.
+
+Entries are fresh for a TTL. Once stale, an entry whose origin sent an ``ETag``
+or ``Last-Modified`` header is revalidated with a conditional HEAD request
+(free) instead of a new extraction: an unchanged page is served from the cache
+and its TTL restarts.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from open_deep_research.url_canonical import canonicalize_url
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+# Defaults used when tavily_extract_content is invoked without explicit values
+DEFAULT_EXTRACT_CACHE_TTL = 24 * 3600.0
+DEFAULT_EXTRACT_CACHE_MAX_ENTRIES = 512
+DEFAULT_REVALIDATION_TIMEOUT = 5.0
+
+
+@dataclass
+class CachedExtract:
+    """Full extracted content of a URL and the validators its origin sent."""
+
+    url: str
+    content: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age_seconds(self) -> float:
+        """Seconds since the content was extracted or last revalidated."""
+        return time.time() - self.fetched_at
+
+    @property
+    def revalidatable(self) -> bool:
+        """Whether the origin sent a validator usable in a conditional request."""
+        return bool(self.etag or self.last_modified)
+
+
+class ExtractCache:
+    """In-memory LRU cache of extracted page content keyed on (canonical URL, extract depth)."""
+
+    def __init__(self, max_entries: int = DEFAULT_EXTRACT_CACHE_MAX_ENTRIES):
+        """Create an empty cache holding at most ``max_entries`` pages."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple[str, str], CachedExtract] = OrderedDict()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, url: str, extract_depth: str) -> Optional[CachedExtract]:
+        """Get the cached entry of a URL, fresh or not."""
+        key = (canonicalize_url(url), extract_depth)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(
+        self,
+        url: str,
+        extract_depth: str,
+        content: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> CachedExtract:
+        """Store the full content of a URL, evicting the least recently used entries."""
+        entry = CachedExtract(url=url, content=content, fetched_at=time.time(), etag=etag, last_modified=last_modified)
+        key = (canonicalize_url(url), extract_depth)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache hit, revalidation and miss counts."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+        }
+
+
+_EXTRACT_CACHE = ExtractCache()
+
+
+def get_extract_cache() -> ExtractCache:
+    """Get the process-wide extract cache."""
+    return _EXTRACT_CACHE
+
+
+# =============================================================================
+# VALIDATORS (conditional HEAD requests to the origin)
+# =============================================================================
+
+def _validators(response: httpx.Response) -> Tuple[Optional[str], Optional[str]]:
+    return response.headers.get("etag"), response.headers.get("last-modified")
+
+
+async def fetch_validators(
+    urls: Iterable[str],
+    timeout: float = DEFAULT_REVALIDATION_TIMEOUT
+) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """Get the ETag and Last-Modified headers of several URLs with concurrent HEAD requests.
+
+    Args:
+        urls: URLs to query
+        timeout: Timeout in seconds for each request
+
+    Returns:
+        Mapping of URL to (etag, last_modified); URLs that failed are left out
+    """
+    urls = list(urls)
+    if not urls:
+        return {}
+
+    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        responses = await asyncio.gather(*(client.head(url) for url in urls), return_exceptions=True)
+
+    return {
+        url: _validators(response)
+        for url, response in zip(urls, responses)
+        if isinstance(response, httpx.Response) and response.status_code < 400
+    }
+
+
+async def revalidate(
+    entries: List[CachedExtract],
+    timeout: float = DEFAULT_REVALIDATION_TIMEOUT
+) -> List[bool]:
+    """Check whether stale entries are still current with conditional HEAD requests.
+
+    A page is unchanged when the origin answers 304, or when it ignores the
+    conditional headers but returns the same ETag / Last-Modified. Unchanged
+    entries get a new freshness window.
+
+    Args:
+        entries: Stale entries with validators
+        timeout: Timeout in seconds for each request
+
+    Returns:
+        One flag per entry, True if the cached content can be reused
+    """
+    if not entries:
+        return []
+
+    async def check(client: httpx.AsyncClient, entry: CachedExtract) -> bool:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        response = await client.head(entry.url, headers=headers)
+        if response.status_code == 304:
+            return True
+        if response.status_code >= 400:
+            return False
+        etag, last_modified = _validators(response)
+        return bool((entry.etag and etag == entry.etag) or (entry.last_modified and last_modified == entry.last_modified))
+
+    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        results = await asyncio.gather(*(check(client, entry) for entry in entries), return_exceptions=True)
+
+    unchanged = []
+    for entry, result in zip(entries, results):
+        is_unchanged = result is True
+        if is_unchanged:
+            entry.fetched_at = time.time()
+        unchanged.append(is_unchanged)
+    return unchanged
@@ -0,0 +1,485 @@
+"""Per-node span instrumentation for the Deep Research agent.
+
+``RunInstrumentation`` is a LangChain callback handler that turns graph execution
+into OpenTelemetry-style spans. Every graph node, tool call and chat model call
+becomes a span that records wall time, queue wait, input/output tokens, retries
+and estimated cost. Spans are aggregated per run, per stage (node, tool, or the
+model calls made inside a tool such as ``tavily_search`` summarization) and per
+research unit dispatched by the supervisor.
+
+Usage:
+
+    instrumentation = RunInstrumentation()
+    await deep_researcher.ainvoke(inputs, {"callbacks": [instrumentation]})
+    print(instrumentation.to_prometheus())
+    instrumentation.write_json("spans.json")
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from open_deep_research.metrics import MetricsRegistry
+
+##########################
+# Cost Estimation
+##########################
+
+# USD per 1M tokens as (input, output).
+# NOTE: This may be out of date or not applicable to your models. Please update this as needed.
+MODEL_PRICING_PER_MILLION_TOKENS = {
+    "openai:gpt-4.1-mini": (0.40, 1.60),
+    "openai:gpt-4.1-nano": (0.10, 0.40),
+    "openai:gpt-4.1": (2.00, 8.00),
+    "openai:gpt-4o-mini": (0.15, 0.60),
+    "openai:gpt-4o": (2.50, 10.00),
+    "openai:gpt-5-mini": (0.25, 2.00),
+    "openai:gpt-5-nano": (0.05, 0.40),
+    "openai:gpt-5": (1.25, 10.00),
+    "openai:o4-mini": (1.10, 4.40),
+    "openai:o3": (2.00, 8.00),
+    "anthropic:claude-opus-4": (15.00, 75.00),
+    "anthropic:claude-sonnet-4": (3.00, 15.00),
+    "anthropic:claude-3-7-sonnet": (3.00, 15.00),
+    "anthropic:claude-3-5-haiku": (0.80, 4.00),
+    "google:gemini-1.5-pro": (1.25, 5.00),
+    "google:gemini-1.5-flash": (0.075, 0.30),
+}
+
+# Tavily bills 1 credit per basic search and 2 per advanced search.
+TAVILY_CREDIT_USD = float(os.getenv("TAVILY_CREDIT_USD", "0.008"))
+
+# Estimated credits per query for search tools, keyed by tool name.
+TOOL_CREDITS_PER_QUERY = {
+    "tavily_search": 1,
+    "tavily_search_amazon": 2,
+    "tavily_search_web": 2,
+}
+
+# Credits per query by Tavily search depth, used when a tool call sets ``search_depth``.
+TAVILY_CREDITS_PER_DEPTH = {
+    "basic": 1,
+    "advanced": 2,
+}
+
+
+def estimate_search_credits(tool_name: str, inputs: Optional[Dict[str, Any]]) -> int:
+    """Estimate the Tavily credits of a search tool call from its inputs.
+
+    Args:
+        tool_name: Name of the tool
+        inputs: Tool call arguments (``queries`` and optionally ``search_depth``)
+
+    Returns:
+        Estimated credits, 0 for tools that are not search tools
+    """
+    credits_per_query = TOOL_CREDITS_PER_QUERY.get(tool_name)
+    if not credits_per_query:
+        return 0
+    inputs = inputs or {}
+    credits_per_query = TAVILY_CREDITS_PER_DEPTH.get(inputs.get("search_depth"), credits_per_query)
+    return len(inputs.get("queries") or []) * credits_per_query
+
+
+def estimate_llm_cost(model_key: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    """Estimate the USD cost of a model call from the pricing table.
+
+    Args:
+        model_key: Model identifier in ``provider:model`` form
+        input_tokens: Prompt tokens consumed
+        output_tokens: Completion tokens generated
+
+    Returns:
+        Estimated cost in USD, 0.0 when the model is not in the pricing table
+    """
+    if not model_key:
+        return 0.0
+    for priced_model, (input_price, output_price) in MODEL_PRICING_PER_MILLION_TOKENS.items():
+        if priced_model in model_key:
+            return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    return 0.0
+
+
+##########################
+# Span Model
+##########################
+
+@dataclass
+class Span:
+    """A single timed unit of work, shaped after the OpenTelemetry span model."""
+
+    span_id: str
+    trace_id: str
+    parent_span_id: Optional[str]
+    name: str
+    kind: str  # "node", "tool" or "llm"
+    start_time: float
+    queue_wait: float = 0.0
+    end_time: Optional[float] = None
+    stage: str = ""
+    research_unit: Optional[str] = None
+    model: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retries: int = 0
+    cost_usd: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Wall time of the span in seconds (0.0 while still open)."""
+        return (self.end_time - self.start_time) if self.end_time else 0.0
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Render the span in OTLP/JSON form."""
+        attributes = {
+            "odr.span.kind": self.kind,
+            "odr.stage": self.stage,
+            "odr.queue_wait_s": self.queue_wait,
+            "odr.retries": self.retries,
+            "odr.cost_usd": self.cost_usd,
+            "gen_ai.usage.input_tokens": self.input_tokens,
+            "gen_ai.usage.output_tokens": self.output_tokens,
+        }
+        if self.model:
+            attributes["gen_ai.request.model"] = self.model
+        if self.research_unit:
+            attributes["odr.research_unit"] = self.research_unit
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": int(self.start_time * 1e9),
+            "endTimeUnixNano": int((self.end_time or self.start_time) * 1e9),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _span_id(run_id: UUID) -> str:
+    return run_id.hex[:16]
+
+
+@dataclass
+class _RunRecord:
+    parent: Optional[UUID]
+    start_time: float
+    root: UUID
+    span: Optional[Span] = None
+    research_unit: Optional[str] = None
+    children_started: List[float] = field(default_factory=list)
+
+
+##########################
+# Callback Handler
+##########################
+
+class RunInstrumentation(BaseCallbackHandler):
+    """Collect per-node, per-tool and per-model spans from LangChain callbacks.
+
+    The handler can be shared across concurrent runs: spans are grouped by the
+    root run they belong to.
+    """
+
+    # Record timings on the event loop instead of a thread pool hop.
+    run_inline = True
+
+    def __init__(self):
+        """Start with no spans and no runs in flight."""
+        self.spans: List[Span] = []
+        self._runs: Dict[UUID, _RunRecord] = {}
+        # Latest end time of a finished child, per parent span, to measure scheduling gaps
+        self._last_child_end: Dict[Optional[str], float] = {}
+
+    # ----- run tree bookkeeping -----
+
+    def _register(self, run_id: UUID, parent_run_id: Optional[UUID], metadata: Optional[Dict[str, Any]]) -> _RunRecord:
+        parent = self._runs.get(parent_run_id) if parent_run_id else None
+        record = _RunRecord(
+            parent=parent_run_id,
+            start_time=time.time(),
+            root=parent.root if parent else run_id,
+            research_unit=(metadata or {}).get("research_unit") or (parent.research_unit if parent else None),
+        )
+        self._runs[run_id] = record
+        return record
+
+    def _enclosing_span(self, run_id: Optional[UUID]) -> Optional[Span]:
+        while run_id is not None:
+            record = self._runs.get(run_id)
+            if record is None:
+                return None
+            if record.span is not None:
+                return record.span
+            run_id = record.parent
+        return None
+
+    def _open_span(self, run_id: UUID, record: _RunRecord, name: str, kind: str, stage: str) -> Span:
+        parent_span = self._enclosing_span(record.parent)
+        span = Span(
+            span_id=_span_id(run_id),
+            trace_id=record.root.hex,
+            parent_span_id=parent_span.span_id if parent_span else None,
+            name=name,
+            kind=kind,
+            start_time=record.start_time,
+            queue_wait=self._queue_wait(record.start_time, parent_span) if kind == "node" else 0.0,
+            stage=stage,
+            research_unit=record.research_unit,
+        )
+        record.span = span
+        self.spans.append(span)
+        return span
+
+    def _queue_wait(self, start_time: float, parent_span: Optional[Span]) -> float:
+        """Time a node waited since its parent started or its previous sibling finished."""
+        if parent_span is None:
+            return 0.0
+        ready_at = max(parent_span.start_time, self._last_child_end.get(parent_span.span_id, 0.0))
+        return max(start_time - ready_at, 0.0)
+
+    def _close(self, run_id: UUID, error: Optional[BaseException] = None):
+        record = self._runs.get(run_id)
+        if record is None:
+            return
+        if record.span is not None:
+            record.span.end_time = time.time()
+            if error is not None:
+                record.span.error = f"{type(error).__name__}: {error}"
+            if record.span.kind == "node":
+                parent_id = record.span.parent_span_id
+                self._last_child_end[parent_id] = max(self._last_child_end.get(parent_id, 0.0), record.span.end_time)
+        # Keep the tree until the root finishes so late children can still resolve parents
+        if run_id == record.root:
+            self._runs = {key: value for key, value in self._runs.items() if value.root != run_id}
+            trace_span_ids = {span.span_id for span in self.spans if span.trace_id == run_id.hex}
+            for span_id in trace_span_ids & self._last_child_end.keys():
+                del self._last_child_end[span_id]
+
+    # ----- chains (graph nodes) -----
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        """Open a node span when a LangGraph node starts."""
+        record = self._register(run_id, parent_run_id, metadata)
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        node = (metadata or {}).get("langgraph_node")
+        if node and name == node:
+            self._open_span(run_id, record, node, "node", node)
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        """Close the span of a finished chain."""
+        self._close(run_id)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        """Close the span of a failed chain and record the error."""
+        self._close(run_id, error)
+
+    # ----- tools -----
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, tags=None, metadata=None, inputs=None, **kwargs):
+        """Open a tool span and estimate search credits from the queries."""
+        record = self._register(run_id, parent_run_id, metadata)
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        span = self._open_span(run_id, record, name, "tool", f"tool:{name}")
+        span.cost_usd += estimate_search_credits(name, inputs) * TAVILY_CREDIT_USD
+
+    def on_tool_end(self, output, *, run_id, parent_run_id=None, **kwargs):
+        """Close the span of a finished tool call."""
+        self._close(run_id)
+
+    def on_tool_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        """Close the span of a failed tool call and record the error."""
+        self._close(run_id, error)
+
+    # ----- chat models -----
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        """Open a model span attributed to the enclosing tool or node."""
+        record = self._register(run_id, parent_run_id, metadata)
+        metadata = metadata or {}
+        enclosing = self._enclosing_span(parent_run_id)
+        stage = enclosing.stage if enclosing else metadata.get("langgraph_node", "llm")
+        provider = metadata.get("ls_provider")
+        model_name = metadata.get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model")
+        span = self._open_span(run_id, record, f"llm:{model_name or 'unknown'}", "llm", f"{stage}/llm")
+        span.model = f"{provider}:{model_name}" if provider and model_name else model_name
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        """Record token usage and estimated cost of a finished model call."""
+        record = self._runs.get(run_id)
+        if record is not None and record.span is not None:
+            input_tokens, output_tokens = _token_usage(response)
+            record.span.input_tokens += input_tokens
+            record.span.output_tokens += output_tokens
+            record.span.cost_usd += estimate_llm_cost(record.span.model, input_tokens, output_tokens)
+        self._close(run_id)
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        """Close the span of a failed model call and record the error."""
+        self._close(run_id, error)
+
+    def on_retry(self, retry_state, *, run_id, parent_run_id=None, **kwargs):
+        """Count a retry against the enclosing span."""
+        span = self._enclosing_span(run_id)
+        if span is not None:
+            span.retries += 1
+
+    # ----- aggregation -----
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate spans per run, per stage and per research unit.
+
+        Returns:
+            Dictionary with ``runs``, ``stages`` and ``research_units`` breakdowns.
+            Node wall time is inclusive of the work nested inside the node, while
+            tokens and cost are only counted on the span that incurred them.
+        """
+        runs: Dict[str, Dict[str, float]] = {}
+        stages: Dict[str, Dict[str, float]] = {}
+        units: Dict[str, Dict[str, float]] = {}
+
+        for span in self.spans:
+            buckets = [
+                runs.setdefault(span.trace_id, _empty_totals()),
+                stages.setdefault(span.stage, _empty_totals()),
+            ]
+            if span.research_unit:
+                buckets.append(units.setdefault(span.research_unit, _empty_totals()))
+            for bucket in buckets:
+                bucket["spans"] += 1
+                bucket["input_tokens"] += span.input_tokens
+                bucket["output_tokens"] += span.output_tokens
+                bucket["retries"] += span.retries
+                bucket["cost_usd"] += span.cost_usd
+                bucket["errors"] += 1 if span.error else 0
+            stage_bucket = stages[span.stage]
+            stage_bucket["wall_s"] += span.duration
+            stage_bucket["queue_wait_s"] += span.queue_wait
+
+        for trace_id, bucket in runs.items():
+            trace_spans = [span for span in self.spans if span.trace_id == trace_id]
+            bucket["wall_s"] = (
+                max((span.end_time or span.start_time) for span in trace_spans)
+                - min(span.start_time for span in trace_spans)
+            )
+        for unit, bucket in units.items():
+            unit_spans = [span for span in self.spans if span.research_unit == unit]
+            bucket["wall_s"] = (
+                max((span.end_time or span.start_time) for span in unit_spans)
+                - min(span.start_time for span in unit_spans)
+            )
+
+        return {"runs": runs, "stages": stages, "research_units": units}
+
+    def reset(self):
+        """Drop all recorded spans."""
+        self.spans.clear()
+        self._runs.clear()
+        self._last_child_end.clear()
+
+    # ----- exporters -----
+
+    def to_otlp_json(self, service_name: str = "open_deep_research") -> Dict[str, Any]:
+        """Export spans as an OTLP/JSON ``ExportTraceServiceRequest`` payload."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": service_name}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "open_deep_research.instrumentation"},
+                    "spans": [span.to_otlp() for span in self.spans],
+                }],
+            }]
+        }
+
+    def write_json(self, path: str):
+        """Write the OTLP spans and the aggregated summary to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "otlp": self.to_otlp_json()}, f, indent=2)
+
+    def to_prometheus(self, prefix: str = "odr") -> str:
+        """Render per-stage aggregates in the Prometheus text exposition format."""
+        stages = self.summary()["stages"]
+        metrics = [
+            ("stage_wall_seconds_total", "Wall time spent per stage", "wall_s"),
+            ("stage_queue_wait_seconds_total", "Dispatch-to-start wait per stage", "queue_wait_s"),
+            ("stage_spans_total", "Spans recorded per stage", "spans"),
+            ("stage_input_tokens_total", "Model input tokens per stage", "input_tokens"),
+            ("stage_output_tokens_total", "Model output tokens per stage", "output_tokens"),
+            ("stage_retries_total", "Retries per stage", "retries"),
+            ("stage_errors_total", "Failed spans per stage", "errors"),
+            ("stage_estimated_cost_usd_total", "Estimated cost per stage in USD", "cost_usd"),
+        ]
+        registry = MetricsRegistry()
+        for metric, help_text, key in metrics:
+            counter = registry.counter(f"{prefix}_{metric}", help_text, ("stage",))
+            for stage, totals in stages.items():
+                counter.inc(totals[key], stage=stage)
+        return registry.render()
+
+    def export_to_opentelemetry(self, tracer_name: str = "open_deep_research"):
+        """Replay recorded spans through the globally configured OpenTelemetry tracer.
+
+        Requires the optional ``opentelemetry-api`` package.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetry export requires opentelemetry-api. Install with: pip install opentelemetry-sdk"
+            ) from e
+
+        tracer = trace.get_tracer(tracer_name)
+        otel_spans = {}
+        for span in sorted(self.spans, key=lambda s: s.start_time):
+            parent = otel_spans.get(span.parent_span_id)
+            context = trace.set_span_in_context(parent) if parent is not None else None
+            otel_span = tracer.start_span(span.name, context=context, start_time=int(span.start_time * 1e9))
+            for attribute in span.to_otlp()["attributes"]:
+                otel_span.set_attribute(attribute["key"], next(iter(attribute["value"].values())))
+            otel_span.end(end_time=int((span.end_time or span.start_time) * 1e9))
+            otel_spans[span.span_id] = otel_span
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {
+        "spans": 0, "wall_s": 0.0, "queue_wait_s": 0.0, "input_tokens": 0,
+        "output_tokens": 0, "retries": 0, "errors": 0, "cost_usd": 0.0,
+    }
+
+
+def _token_usage(response) -> tuple[int, int]:
+    """Extract ``(input_tokens, output_tokens)`` from an ``LLMResult``."""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+    if not (input_tokens or output_tokens):
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        input_tokens = token_usage.get("prompt_tokens", 0)
+        output_tokens = token_usage.get("completion_tokens", 0)
+    return input_tokens, output_tokens
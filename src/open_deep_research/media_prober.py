@@ -0,0 +1,412 @@
+"""Media and datasheet availability probing for Article Enrichment.
+
+GENERATIF routing needs product images and technical data. Feeds often carry
+``images_url`` / ``fiche_technique_url`` values that are dead links or empty
+Supabase storage folders, which only shows up once a generative run fails.
+``MediaProber`` checks those URLs before routing:
+
+- files: HEAD request (ranged GET when HEAD is not allowed)
+- Supabase public storage folders (``.../storage/v1/object/public/<bucket>/<prefix>/``):
+  storage list request, empty folders count as missing
+
+Checks run concurrently on one pooled HTTP client per event loop with short
+timeouts, concurrent checks of the same URL share one request, and results are
+cached per URL (per bucket + prefix for folders). Inconclusive checks
+(timeouts, server errors, folders that cannot be listed) are not held against
+the article.
+"""
+
+import asyncio
+import os
+import re
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+import httpx
+
+from open_deep_research.configuration_enrichment import EnrichmentConfiguration
+from open_deep_research.state_enrichment import ArticlePayload
+
+# =============================================================================
+# PROBE RESULTS
+# =============================================================================
+
+ProbeStatus = Literal["ok", "empty", "dead", "unknown"]
+
+# Defaults used when a prober is created without explicit limits
+DEFAULT_PROBE_TIMEOUT = 3.0
+DEFAULT_PROBE_CONCURRENCY = 100
+DEFAULT_PROBE_CACHE_TTL = 6 * 3600.0
+DEFAULT_PROBE_CACHE_MAX_ENTRIES = 100_000
+
+# HTTP statuses that mean the resource does not exist
+_DEAD_STATUSES = {404, 410}
+
+# Placeholder object Supabase creates in folders made from the dashboard
+_SUPABASE_PLACEHOLDER = ".emptyFolderPlaceholder"
+
+_SUPABASE_PUBLIC_OBJECT = re.compile(r"^(https?://[^/]+)/storage/v1/object/public/([^/]+)/?(.*)$")
+
+
+@dataclass
+class ProbeResult:
+    """Availability of one media or datasheet URL."""
+
+    url: str
+    status: ProbeStatus
+    http_status: Optional[int] = None
+    detail: Optional[str] = None
+    checked_at: float = field(default_factory=time.time)
+
+    @property
+    def available(self) -> bool:
+        """Whether the URL may be used (inconclusive checks give the benefit of the doubt)."""
+        return self.status in ("ok", "unknown")
+
+
+def supabase_folder(url: str) -> Optional[Tuple[str, str, str]]:
+    """Split a Supabase public storage folder URL.
+
+    Example:
+        https://x.supabase.co/storage/v1/object/public/img/MCC/A1/ → ("https://x.supabase.co", "img", "MCC/A1")
+
+    Args:
+        url: URL to inspect
+
+    Returns:
+        Tuple of (origin, bucket, prefix), or None if the URL is not a storage folder
+    """
+    match = _SUPABASE_PUBLIC_OBJECT.match(url)
+    if not match or (match.group(3) and not url.endswith("/")):
+        return None
+    origin, bucket, prefix = match.groups()
+    return origin, bucket, prefix.rstrip("/")
+
+
+# =============================================================================
+# PROBER
+# =============================================================================
+
+class _LoopState:
+    """HTTP client, concurrency limit and in-flight checks of one event loop."""
+
+    def __init__(self, client: httpx.AsyncClient, max_concurrency: int):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight: Dict[str, asyncio.Task] = {}
+
+
+class MediaProber:
+    """Check media and datasheet URLs concurrently, with a per-URL result cache."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_PROBE_TIMEOUT,
+        max_concurrency: int = DEFAULT_PROBE_CONCURRENCY,
+        cache_ttl_seconds: float = DEFAULT_PROBE_CACHE_TTL,
+        max_cache_entries: int = DEFAULT_PROBE_CACHE_MAX_ENTRIES,
+        supabase_key: Optional[str] = None
+    ):
+        """Create a prober with an empty result cache.
+
+        Args:
+            timeout: Timeout in seconds for each check
+            max_concurrency: Maximum number of checks in flight per event loop
+            cache_ttl_seconds: Seconds a conclusive result is reused
+            max_cache_entries: Results kept in the cache (least recently used are evicted)
+            supabase_key: Supabase API key used to list storage folders (default: SUPABASE_KEY)
+        """
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cache_entries = max_cache_entries
+        self.supabase_key = supabase_key if supabase_key is not None else os.environ.get("SUPABASE_KEY")
+
+        self._cache: OrderedDict[str, ProbeResult] = OrderedDict()
+        self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = weakref.WeakKeyDictionary()
+        self.requests = 0
+        self.cache_hits = 0
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None or state.client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+            )
+            state = _LoopState(client, self.max_concurrency)
+            self._loops[loop] = state
+        return state
+
+    # -------------------------------------------------------------------------
+    # Cache
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """Cache key of a URL: the bucket + prefix for storage folders, the URL otherwise."""
+        folder = supabase_folder(url)
+        if folder:
+            origin, bucket, prefix = folder
+            return f"folder:{origin}/{bucket}/{prefix}"
+        return url
+
+    def _cached(self, key: str) -> Optional[ProbeResult]:
+        result = self._cache.get(key)
+        if result is None:
+            return None
+        if time.time() - result.checked_at > self.cache_ttl_seconds:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _store(self, key: str, result: ProbeResult):
+        # Inconclusive results are retried on the next check
+        if result.status == "unknown":
+            return
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cache_entries:
+            self._cache.popitem(last=False)
+
+    # -------------------------------------------------------------------------
+    # Checks
+    # -------------------------------------------------------------------------
+
+    async def probe(self, url: str) -> ProbeResult:
+        """Check one URL, reusing a cached or in-flight check of the same resource.
+
+        Args:
+            url: Media, datasheet or storage folder URL
+
+        Returns:
+            ProbeResult for the URL
+        """
+        key = self.cache_key(url)
+        cached = self._cached(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached if cached.url == url else replace(cached, url=url)
+
+        state = self._state()
+        task = state.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._check(state, url))
+            state.in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: state.in_flight.pop(key, None))
+        # Shielded: a caller being cancelled must not cancel a check other callers wait for
+        result = await asyncio.shield(task)
+        self._store(key, result)
+        return result if result.url == url else replace(result, url=url)
+
+    async def probe_many(self, urls: Iterable[str]) -> Dict[str, ProbeResult]:
+        """Check several URLs concurrently.
+
+        Args:
+            urls: URLs to check (duplicates are checked once)
+
+        Returns:
+            Mapping of URL to ProbeResult
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        results = await asyncio.gather(*(self.probe(url) for url in urls))
+        return dict(zip(urls, results))
+
+    async def _check(self, state: _LoopState, url: str) -> ProbeResult:
+        async with state.semaphore:
+            self.requests += 1
+            try:
+                folder = supabase_folder(url)
+                if folder:
+                    return await self._list_folder(state.client, url, *folder)
+                return await self._head(state.client, url)
+            except httpx.TimeoutException:
+                return ProbeResult(url, "unknown", detail="timeout")
+            except (httpx.UnsupportedProtocol, httpx.InvalidURL) as e:
+                return ProbeResult(url, "dead", detail=type(e).__name__)
+            except httpx.HTTPError as e:
+                # Connection failures (DNS, refused, reset) are often transient: not cached, retried later
+                return ProbeResult(url, "unknown", detail=type(e).__name__)
+
+    async def _head(self, client: httpx.AsyncClient, url: str) -> ProbeResult:
+        response = await client.head(url)
+        if response.status_code in (403, 405, 501):
+            # Some hosts and CDNs refuse HEAD: fetch the first byte instead
+            async with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as response:
+                pass
+
+        status = response.status_code
+        if status in _DEAD_STATUSES:
+            return ProbeResult(url, "dead", http_status=status)
+        if status >= 400:
+            return ProbeResult(url, "unknown", http_status=status)
+        if response.headers.get("content-length") == "0":
+            return ProbeResult(url, "empty", http_status=status)
+        return ProbeResult(url, "ok", http_status=status, detail=response.headers.get("content-type"))
+
+    async def _list_folder(self, client: httpx.AsyncClient, url: str, origin: str, bucket: str, prefix: str) -> ProbeResult:
+        if not self.supabase_key:
+            return ProbeResult(url, "unknown", detail="SUPABASE_KEY not set, folder not listed")
+
+        response = await client.post(
+            f"{origin}/storage/v1/object/list/{bucket}",
+            json={"prefix": prefix, "limit": 10, "offset": 0},
+            headers={"apikey": self.supabase_key, "Authorization": f"Bearer {self.supabase_key}"},
+        )
+        if response.status_code in _DEAD_STATUSES:
+            return ProbeResult(url, "dead", http_status=response.status_code)
+        if response.status_code >= 400:
+            return ProbeResult(url, "unknown", http_status=response.status_code)
+
+        objects = [entry for entry in response.json() if entry.get("name") != _SUPABASE_PLACEHOLDER]
+        return ProbeResult(
+            url,
+            "ok" if objects else "empty",
+            http_status=response.status_code,
+            detail=f"{len(objects)} object(s)"
+        )
+
+    async def aclose(self):
+        """Close the HTTP client of the current event loop."""
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of HTTP checks, cache hits and cached results."""
+        return {"requests": self.requests, "cache_hits": self.cache_hits, "cached": len(self._cache)}
+
+
+_MEDIA_PROBERS: Dict[Tuple[float, int, float], MediaProber] = {}
+
+
+def get_media_prober(config: EnrichmentConfiguration) -> MediaProber:
+    """Get the shared MediaProber for the configured timeout, concurrency and TTL."""
+    settings = (config.media_probe_timeout, config.media_probe_max_concurrency, config.media_probe_cache_ttl_hours)
+    prober = _MEDIA_PROBERS.get(settings)
+    if prober is None:
+        prober = MediaProber(
+            timeout=config.media_probe_timeout,
+            max_concurrency=config.media_probe_max_concurrency,
+            cache_ttl_seconds=config.media_probe_cache_ttl_hours * 3600,
+        )
+        _MEDIA_PROBERS[settings] = prober
+    return prober
+
+
+# =============================================================================
+# ARTICLE HELPERS (used by deep_researcher and the batch runner)
+# =============================================================================
+
+@dataclass
+class MediaAvailability:
+    """Usable media and technical documents of an article."""
+
+    images: List[str] = field(default_factory=list)
+    datasheet_url: Optional[str] = None
+    documents: List[str] = field(default_factory=list)
+    unavailable: Dict[str, ProbeStatus] = field(default_factory=dict)
+
+
+def article_media_urls(article: ArticlePayload) -> List[str]:
+    """Image, datasheet and technical document URLs of an article."""
+    urls = list(article.images_urls or [])
+    if article.fiche_technique_url:
+        urls.append(article.fiche_technique_url)
+    urls.extend(article.documents_techniques or [])
+    return urls
+
+
+async def check_article_media(article: ArticlePayload, config: EnrichmentConfiguration) -> MediaAvailability:
+    """Keep the media and documents of an article that are reachable.
+
+    Without probing (``media_probe_enabled`` False) every declared URL is kept.
+
+    Args:
+        article: Article being routed
+        config: Enrichment configuration (probe settings)
+
+    Returns:
+        MediaAvailability with the usable URLs and the status of the others
+    """
+    images = list(article.images_urls or []) if article.images_disponibles else []
+    documents = list(article.documents_techniques or [])
+    if not config.media_probe_enabled:
+        return MediaAvailability(images=images, datasheet_url=article.fiche_technique_url, documents=documents)
+
+    results = await get_media_prober(config).probe_many(article_media_urls(article))
+
+    def usable(url: str) -> bool:
+        return results[url].available if url in results else True
+
+    datasheet = article.fiche_technique_url
+    return MediaAvailability(
+        images=[url for url in images if usable(url)],
+        datasheet_url=datasheet if datasheet and usable(datasheet) else None,
+        documents=[url for url in documents if usable(url)],
+        unavailable={url: result.status for url, result in results.items() if not result.available},
+    )
+
+
+async def any_available(urls: Iterable[Optional[str]], config: Optional[EnrichmentConfiguration] = None) -> bool:
+    """Check whether at least one of several URLs is usable.
+
+    Args:
+        urls: Candidate URLs (empty values are ignored)
+        config: Enrichment configuration (probe settings, default: EnrichmentConfiguration())
+
+    Returns:
+        True if a URL is reachable, or if probing is disabled and a URL is declared
+    """
+    urls = [url for url in urls if url]
+    config = config or EnrichmentConfiguration()
+    if not urls or not config.media_probe_enabled:
+        return bool(urls)
+    results = await get_media_prober(config).probe_many(urls)
+    return any(result.available for result in results.values())
+
+
+async def prefetch_media(
+    articles: Iterable[ArticlePayload],
+    config: EnrichmentConfiguration,
+    chunk_size: int = 2000
+) -> Dict[str, int]:
+    """Check the media of many articles up front so their routing hits the probe cache.
+
+    Args:
+        articles: Articles of a batch
+        config: Enrichment configuration (probe settings)
+        chunk_size: URLs probed per round
+
+    Returns:
+        Counts of checked URLs per status
+    """
+    counts: Dict[str, int] = {}
+    if not config.media_probe_enabled:
+        return counts
+
+    prober = get_media_prober(config)
+
+    async def probe_chunk(urls: List[str]):
+        for result in (await prober.probe_many(urls)).values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+
+    # URLs are probed in chunks so a large batch does not create all its tasks at once
+    chunk: List[str] = []
+    for article in articles:
+        chunk.extend(article_media_urls(article))
+        if len(chunk) >= chunk_size:
+            await probe_chunk(chunk)
+            chunk = []
+    if chunk:
+        await probe_chunk(chunk)
+    return counts
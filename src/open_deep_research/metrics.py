@@ -0,0 +1,324 @@
+"""In-process metrics for Article Enrichment, in the Prometheus text format.
+
+Logs tell what happened to one article; these counters and histograms tell
+how the whole process is doing, so credit burn rate, latency regressions and
+routing drift can be graphed and alerted on:
+
+- Tavily requests, credits and latency by tool and search depth, and results per query
+- Enrichment graph node latency
+- Routing decisions and confidence scores by enrichment type, credits per article
+
+Metrics live in a process-wide registry. They are exposed:
+- over HTTP at ``/metrics`` under ``langgraph dev`` (see ``metrics_app``)
+- as a textfile (node_exporter textfile collector format) written by the batch
+  runner and the webhook workers (``--metrics-file``)
+"""
+
+import functools
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# =============================================================================
+# METRIC TYPES
+# =============================================================================
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9, 1.0)
+RESULTS_BUCKETS = (0, 1, 2, 5, 10, 20)
+CREDITS_BUCKETS = (0, 1, 2, 4, 8, 12, 16, 24, 32)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return f"{value:g}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        """Create an empty counter; ``labelnames`` fixes the label order of its series."""
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        """Add ``amount`` to the series of the given labels."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Return the current value of a series (0 if never incremented)."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def samples(self) -> List[str]:
+        """Exposition lines of every series."""
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+    def reset(self):
+        """Drop every series."""
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative histogram with labels (bucket counts, sum and count per series)."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        """Create an empty histogram with the given upper bucket bounds (``+Inf`` is added)."""
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts..., sum, count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any):
+        """Record one observation in the series of the given labels."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: Any) -> float:
+        """Return the number of observations of a series."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        return series[-1] if series else 0.0
+
+    def samples(self) -> List[str]:
+        """Exposition lines of every series (``_bucket``, ``_sum``, ``_count``)."""
+        with self._lock:
+            snapshot = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in snapshot:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_number(series[-1])}")
+        return lines
+
+    def reset(self):
+        """Drop every series."""
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """Set of metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        """Create a registry with no metrics."""
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help_text}")
+            lines.append(f"# TYPE {name} {metric.metric_type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Write the exposition to a file atomically (for the node_exporter textfile collector).
+
+        Args:
+            path: Destination file, replaced in one rename so scrapers never read a partial file
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".prom")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def reset(self):
+        """Drop every series of every metric (metrics stay registered)."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+REGISTRY = MetricsRegistry()
+
+
+# =============================================================================
+# ENRICHMENT METRICS
+# =============================================================================
+
+TAVILY_REQUESTS = REGISTRY.counter(
+    "enrichment_tavily_requests_total", "Tavily requests sent, by tool, search depth and outcome",
+    ("tool", "depth", "outcome"),
+)
+TAVILY_CREDITS = REGISTRY.counter(
+    "enrichment_tavily_credits_total", "Estimated Tavily credits spent, by tool and search depth",
+    ("tool", "depth"),
+)
+TAVILY_LATENCY = REGISTRY.histogram(
+    "enrichment_tavily_request_seconds", "Tavily request latency, by tool and search depth",
+    ("tool", "depth"),
+)
+TAVILY_RESULTS = REGISTRY.histogram(
+    "enrichment_tavily_results_per_query", "Results returned per Tavily query (URLs per extract request)",
+    ("tool",), RESULTS_BUCKETS,
+)
+NODE_LATENCY = REGISTRY.histogram(
+    "enrichment_node_seconds", "Enrichment graph node latency, by node and outcome",
+    ("node", "outcome"),
+)
+ROUTING_DECISIONS = REGISTRY.counter(
+    "enrichment_routing_decisions_total", "Routing decisions, by enrichment type",
+    ("enrichment_type",),
+)
+ROUTING_CONFIDENCE = REGISTRY.histogram(
+    "enrichment_routing_confidence", "Confidence score of routing decisions, by enrichment type",
+    ("enrichment_type",), CONFIDENCE_BUCKETS,
+)
+ARTICLE_CREDITS = REGISTRY.histogram(
+    "enrichment_article_search_credits", "Tavily credits spent by the search phases per article, by enrichment type",
+    ("enrichment_type",), CREDITS_BUCKETS,
+)
+
+
+def observe_tavily_request(
+    tool: str,
+    depth: str,
+    credits: int,
+    seconds: float,
+    results: Optional[int] = None,
+    error: bool = False
+):
+    """Record one Tavily request actually sent (shared or cached results are not requests).
+
+    Args:
+        tool: Tool that sent the request
+        depth: Search or extract depth
+        credits: Estimated credits billed for the request
+        seconds: Request latency
+        results: Results returned (None for failed requests)
+        error: Whether the request failed or timed out
+    """
+    TAVILY_REQUESTS.inc(tool=tool, depth=depth, outcome="error" if error else "ok")
+    TAVILY_CREDITS.inc(credits, tool=tool, depth=depth)
+    TAVILY_LATENCY.observe(seconds, tool=tool, depth=depth)
+    if results is not None:
+        TAVILY_RESULTS.observe(results, tool=tool)
+
+
+def observe_routing_decision(decision):
+    """Record a routing decision: type, confidence and the credits its search phases spent."""
+    ROUTING_DECISIONS.inc(enrichment_type=decision.enrichment_type)
+    ROUTING_CONFIDENCE.observe(decision.confidence_score, enrichment_type=decision.enrichment_type)
+    ARTICLE_CREDITS.observe(decision.search_credits or 0, enrichment_type=decision.enrichment_type)
+
+
+def observe_node_latency(node: str, seconds: float, error: bool = False):
+    """Record the latency of one graph node run."""
+    NODE_LATENCY.observe(seconds, node=node, outcome="error" if error else "ok")
+
+
+def timed_node(name: str, node: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap an async graph node so each run is recorded in ``enrichment_node_seconds``.
+
+    Args:
+        name: Node name used as label
+        node: Async node function ``(state, config)``
+
+    Returns:
+        Wrapped node with the same signature and annotations (LangGraph routing hints are kept)
+    """
+    @functools.wraps(node)
+    async def wrapper(state, config):
+        start = time.perf_counter()
+        try:
+            result = await node(state, config)
+        except BaseException:
+            observe_node_latency(name, time.perf_counter() - start, error=True)
+            raise
+        observe_node_latency(name, time.perf_counter() - start)
+        return result
+
+    return wrapper
+
+
+def render_metrics() -> str:
+    """Render the process-wide registry in the Prometheus text exposition format."""
+    return REGISTRY.render()
+
+
+def write_metrics_file(path: Optional[str]):
+    """Write the process-wide registry to a textfile; no-op without a path."""
+    if path:
+        REGISTRY.write_textfile(path)
@@ -0,0 +1,21 @@
+"""HTTP exposition of the enrichment metrics for LangGraph Server.
+
+Mounted as a custom route through ``langgraph.json`` (``http.app``), so that
+``langgraph dev`` and deployed servers serve ``GET /metrics`` next to the
+LangGraph API. Requires Starlette, which LangGraph Server ships with.
+"""
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from open_deep_research.metrics import render_metrics
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    """Serve the process-wide registry in the Prometheus text exposition format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+app = Starlette(routes=[Route("/metrics", metrics)])
@@ -0,0 +1,393 @@
+"""Batch-level search query planner for Article Enrichment.
+
+Sibling articles of a catalog (same brand and model in another color or pack
+size, or the same supplier reference) generate near-identical Tavily queries.
+``BatchQueryPlanner`` normalizes the queries of every pending article of a
+batch, executes each unique query once and hands the same results to every
+article that asked for it.
+
+Planning happens before the batch starts: queries that only differ by a color
+or pack-size token are merged into one variant-free query when at least two
+siblings produce them and the merged query still names the product (a model
+code such as "x13" or "gv9580-c0", or the supplier reference), and the expected demand of each query is recorded so its
+results can be released as soon as the last article that needs them has read
+them. Demand is planned at each tool's first-pass search depth: the advanced
+re-runs of adaptive depth are shared between siblings but never consume the
+demand of the first pass. Queries that were not planned (warm starts,
+standalone runs) are still shared on exact normalized match.
+
+Usage:
+
+    planner = BatchQueryPlanner()
+    planner.add_queries("tavily_search_web", ["Acme Kettle AK-17 Red specifications"], search_depth="basic")
+    planner.finalize()
+    with use_query_planner(planner):
+        ...  # the enrichment search tools now go through the planner
+    print(planner.snapshot())
+"""
+
+import asyncio
+import re
+import unicodedata
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from open_deep_research.instrumentation import (
+    TOOL_CREDITS_PER_QUERY,
+    estimate_search_credits,
+)
+
+# =============================================================================
+# QUERY NORMALIZATION
+# =============================================================================
+
+_NON_WORD = re.compile(r"[^\w.+/-]+")
+_EDGE_PUNCTUATION = re.compile(r"^[.+/-]+|[.+/-]+$")
+
+# Color words in the five search languages (French "or" is left out: it is also a conjunction)
+_COLOR_WORDS = frozenset("""
+    noir noire blanc blanche rouge bleu bleue vert verte jaune gris grise rose violet violette marron beige argent dore doree
+    black white red blue green yellow grey gray pink purple silver gold brown navy
+    nero nera bianco bianca rosso rossa blu verde giallo gialla grigio grigia argento oro
+    negro negra blanco blanca rojo roja azul amarillo amarilla plata
+    schwarz weiss weiß rot blau grun grün gelb grau silber
+""".split())
+
+# Pack sizes are only recognized next to a pack or quantity word: a bare "x5" or "2x" is kept
+# since it is as likely to be a model code (BMW X5, ThinkPad X1) as a multiplier
+_PACK_WORDS = r"(?:lot|pack|set|paquet|confezione|packung)"
+_QUANTITY_WORDS = r"(?:pcs|pieces|pièces|pezzi|piezas|stück|stk|unites|unités)"
+_PACK_PATTERNS = [
+    re.compile(rf"\b{_PACK_WORDS}\s+(?:(?:de|of|di|da|von)\s+)?(?:x\s?)?\d+(?:\s?x)?\b"),
+    re.compile(rf"\b\d+\s?x\s+{_PACK_WORDS}\b"),
+    re.compile(rf"\b(?:x\s?)?\d+\s?(?:x\s?)?{_QUANTITY_WORDS}\b"),
+]
+
+# Tokens mixing letters and digits identify a model, unless they are a measure ("1.7l", "500ml")
+_HAS_LETTER = re.compile(r"[^\W\d_]")
+_HAS_DIGIT = re.compile(r"\d")
+_MEASURE = re.compile(r"^\d+(?:[.,]\d+)?(?:mm|cm|m|ml|cl|l|g|kg|w|kw|v|mah|wh|go|gb|to|tb|mo|mb|hz|ghz)$")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for exact-match deduplication.
+
+    Example:
+        "  Calor  GV9580-C0, Fiche technique " → "calor gv9580-c0 fiche technique"
+
+    Args:
+        query: Raw search query
+
+    Returns:
+        Case-folded query with punctuation and whitespace collapsed
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    tokens = (_EDGE_PUNCTUATION.sub("", token) for token in _NON_WORD.split(query))
+    return " ".join(token for token in tokens if token)
+
+
+def variant_free_query(normalized_query: str) -> str:
+    """Strip color and pack-size tokens from a normalized query.
+
+    Example:
+        "acme kettle ak-17 red lot de 2 amazon" → "acme kettle ak-17 amazon"
+
+    Args:
+        normalized_query: Output of normalize_query()
+
+    Returns:
+        Query shared by every color / pack-size variant of the product
+    """
+    query = normalized_query
+    for pattern in _PACK_PATTERNS:
+        query = pattern.sub(" ", query)
+    return " ".join(token for token in query.split() if token not in _COLOR_WORDS)
+
+
+def model_tokens(normalized_query: str) -> set:
+    """Get the tokens of a normalized query that look like a model code.
+
+    Example:
+        "lenovo thinkpad x1 carbon 14 pouces 1.2kg" → {"x1"}
+
+    Args:
+        normalized_query: Output of normalize_query()
+
+    Returns:
+        Tokens mixing letters and digits, measures excluded
+    """
+    return {
+        token for token in normalized_query.split()
+        if _HAS_LETTER.search(token) and _HAS_DIGIT.search(token) and not _MEASURE.match(token)
+    }
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    # Domain lists are sets: the yield priors reorder them per article
+    return repr(sorted(
+        (name, sorted(value) if isinstance(value, (list, tuple, set, frozenset)) else value)
+        for name, value in params.items()
+    ))
+
+
+# =============================================================================
+# PLANNER
+# =============================================================================
+
+@dataclass
+class QueryUsage:
+    """Queries requested by one article and how many were served from shared results."""
+
+    requested: int = 0
+    shared: int = 0
+    credits_saved: int = 0
+
+
+# Planner and per-article usage of the current batch, inherited by the tasks of each graph run
+_ACTIVE_QUERY_PLANNER: ContextVar[Optional["BatchQueryPlanner"]] = ContextVar("active_query_planner", default=None)
+_QUERY_USAGE: ContextVar[Optional[QueryUsage]] = ContextVar("query_usage", default=None)
+
+
+class BatchQueryPlanner:
+    """Execute each unique search query of a batch once and share its results.
+
+    Results are keyed on (tool, canonical query, search parameters). Concurrent
+    requests for a query that is already in flight wait for the same request.
+    Failed requests are not cached, so a later article retries them.
+    """
+
+    def __init__(self, merge_variants: bool = True, max_cached_queries: int = 10000):
+        """Create an empty planner.
+
+        Args:
+            merge_variants: Merge queries of color / pack-size siblings into one variant-free query
+            max_cached_queries: Results kept for queries whose remaining demand is unknown
+        """
+        self.merge_variants = merge_variants
+        self.max_cached_queries = max_cached_queries
+
+        self._planned: Counter = Counter()
+        self._planned_depths: Dict[str, str] = {}
+        self._references: Dict[Tuple[str, str], set] = defaultdict(set)
+        self._aliases: Dict[Tuple[str, str], str] = {}
+        self._demand: Counter = Counter()
+        self._consumed_keys: Dict[Tuple[str, str], set] = defaultdict(set)
+        self._results: OrderedDict[Tuple[str, str, str], Any] = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+
+        self.variant_groups = 0
+        self.requested: Counter = Counter()
+        self.executed: Counter = Counter()
+        self.credits_saved = 0
+
+    # -------------------------------------------------------------------------
+    # Planning
+    # -------------------------------------------------------------------------
+
+    def add_queries(
+        self,
+        tool_name: str,
+        queries: Iterable[str],
+        search_depth: Optional[str] = None,
+        reference: Optional[str] = None
+    ):
+        """Declare queries that an article of the batch is expected to run with a search tool.
+
+        Args:
+            tool_name: Search tool that will run the queries
+            queries: Queries of one article
+            search_depth: Depth of the planned pass; requests at another depth (adaptive
+                re-runs) do not consume the demand. None: every request consumes it
+            reference: Model or supplier reference of the article; a query naming it is
+                only merged with its variants if the merged query still names it
+        """
+        if search_depth is not None:
+            self._planned_depths[tool_name] = search_depth
+        reference_tokens = set(normalize_query(reference or "").split())
+        for query in queries:
+            normalized = normalize_query(query)
+            if normalized:
+                self._planned[(tool_name, normalized)] += 1
+                self._references[(tool_name, normalized)] |= reference_tokens
+
+    def finalize(self) -> Dict[str, Any]:
+        """Merge variant queries and compute the expected demand of each unique query.
+
+        Returns:
+            Plan summary (planned queries, unique queries, projected credits saved
+            at each tool's default search depth)
+        """
+        self._aliases.clear()
+        self._demand.clear()
+        self._consumed_keys.clear()
+
+        if self.merge_variants:
+            groups = defaultdict(set)
+            for tool_name, normalized in self._planned:
+                canonical = variant_free_query(normalized)
+                if self._names_product(normalized, canonical, self._references[(tool_name, normalized)]):
+                    groups[(tool_name, canonical)].add(normalized)
+            for (tool_name, canonical), members in groups.items():
+                if canonical and len(members) > 1:
+                    self.variant_groups += 1
+                    for normalized in members:
+                        self._aliases[(tool_name, normalized)] = canonical
+
+        for (tool_name, normalized), count in self._planned.items():
+            self._demand[(tool_name, self._aliases.get((tool_name, normalized), normalized))] += count
+
+        planned = sum(self._planned.values())
+        return {
+            "planned_queries": planned,
+            "unique_queries": len(self._demand),
+            "variant_groups": self.variant_groups,
+            "projected_credits_saved": sum(
+                (count - 1) * TOOL_CREDITS_PER_QUERY.get(tool_name, 1)
+                for (tool_name, _), count in self._demand.items()
+            ),
+        }
+
+    @staticmethod
+    def _names_product(normalized: str, canonical: str, reference_tokens: set) -> bool:
+        # Merging is only safe if the variant-free query still identifies the model:
+        # without a model code or reference, "fiat 500 rosso" would become "fiat 500"
+        query_tokens = set(normalized.split())
+        anchors = model_tokens(normalized) | (reference_tokens & query_tokens)
+        return bool(anchors) and anchors <= set(canonical.split())
+
+    # -------------------------------------------------------------------------
+    # Execution
+    # -------------------------------------------------------------------------
+
+    def canonical_query(self, tool_name: str, query: str) -> str:
+        """Get the query actually sent to the search API for a requested query."""
+        normalized = normalize_query(query)
+        return self._aliases.get((tool_name, normalized), normalized)
+
+    async def search(
+        self,
+        tool_name: str,
+        query: str,
+        params: Dict[str, Any],
+        execute: Callable[[str], Awaitable[Any]]
+    ) -> Any:
+        """Run a search query, or reuse the results of an identical query of the batch.
+
+        Args:
+            tool_name: Search tool issuing the query (used for credit accounting)
+            query: Query requested by the article
+            params: Search parameters that change the results (depth, domains, ...)
+            execute: Coroutine factory sending a query to the search API
+
+        Returns:
+            Raw search API response
+        """
+        canonical = self.canonical_query(tool_name, query)
+        # Variant-merged queries are sent in their variant-free form, others as requested
+        sent_query = canonical if (tool_name, normalize_query(query)) in self._aliases else query
+        key = (tool_name, canonical, _params_key(params))
+
+        self.requested[tool_name] += 1
+        shared = key in self._results or key in self._in_flight
+        if shared:
+            self._record_shared(estimate_search_credits(tool_name, {"queries": [query], **params}))
+
+        if key in self._results:
+            self._results.move_to_end(key)
+            result = self._results[key]
+        else:
+            task = self._in_flight.get(key)
+            if task is None:
+                self.executed[tool_name] += 1
+                task = asyncio.ensure_future(execute(sent_query))
+                self._in_flight[key] = task
+                task.add_done_callback(lambda done, key=key: self._store(key, done))
+            # Shielded: a caller timing out or being cancelled must not cancel the shared request
+            result = await asyncio.shield(task)
+
+        self._consume(tool_name, canonical, key, params)
+        return result
+
+    def _record_shared(self, credits: int):
+        self.credits_saved += credits
+        usage = _QUERY_USAGE.get()
+        if usage is not None:
+            usage.shared += 1
+            usage.credits_saved += credits
+
+    def _store(self, key: Tuple[str, str, str], task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._results[key] = task.result()
+        while len(self._results) > self.max_cached_queries:
+            self._results.popitem(last=False)
+
+    def _consume(self, tool_name: str, canonical: str, key: Tuple[str, str, str], params: Dict[str, Any]):
+        usage = _QUERY_USAGE.get()
+        if usage is not None:
+            usage.requested += 1
+
+        demand_key = (tool_name, canonical)
+        if demand_key not in self._demand:
+            return
+        planned_depth = self._planned_depths.get(tool_name)
+        if planned_depth is not None and params.get("search_depth", "basic") != planned_depth:
+            # Escalation pass of adaptive depth: the planned pass still has consumers
+            return
+        self._demand[demand_key] -= 1
+        self._consumed_keys[demand_key].add(key)
+        if self._demand[demand_key] <= 0:
+            # Last planned consumer served: release the results of every parameter variant it used
+            del self._demand[demand_key]
+            for consumed_key in self._consumed_keys.pop(demand_key):
+                self._results.pop(consumed_key, None)
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the queries requested, executed and shared so far, and the credits saved."""
+        requested = sum(self.requested.values())
+        executed = sum(self.executed.values())
+        return {
+            "queries_requested": requested,
+            "queries_executed": executed,
+            "queries_shared": requested - executed,
+            "variant_groups": self.variant_groups,
+            "credits_saved": self.credits_saved,
+        }
+
+
+# =============================================================================
+# CONTEXT
+# =============================================================================
+
+def get_active_query_planner() -> Optional[BatchQueryPlanner]:
+    """Get the planner of the batch the current task belongs to, if any."""
+    return _ACTIVE_QUERY_PLANNER.get()
+
+
+@contextmanager
+def use_query_planner(planner: Optional[BatchQueryPlanner]) -> Iterator[Optional[BatchQueryPlanner]]:
+    """Route the enrichment search tools through ``planner`` for tasks created in this context."""
+    token = _ACTIVE_QUERY_PLANNER.set(planner)
+    try:
+        yield planner
+    finally:
+        _ACTIVE_QUERY_PLANNER.reset(token)
+
+
+@contextmanager
+def track_query_usage() -> Iterator[QueryUsage]:
+    """Count the queries of one article run (and those served from shared results)."""
+    usage = QueryUsage()
+    token = _QUERY_USAGE.set(usage)
+    try:
+        yield usage
+    finally:
+        _QUERY_USAGE.reset(token)
@@ -0,0 +1,257 @@
+"""Local product resolution index for Article Enrichment.
+
+Supplier feeds keep re-sending the same products. This module keeps a SQLite
+index mapping an article's EAN and brand + supplier reference to the routing
+decision (Amazon products or web sources) previously resolved for it, so that
+``deep_researcher`` can skip the Tavily search cascade on repeat articles.
+
+A lookup returns one of:
+- ``hit``: fresh, confident entry matched on a strong key → reuse the decision, no search
+- ``partial``: stale or weaker entry → warm start (known ASINs searched first, or
+  the Amazon phase skipped when the product was previously resolved on the web)
+- ``miss``: nothing usable
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cache
+from typing import Iterator, List, Literal, Optional
+
+from open_deep_research.configuration_enrichment import EnrichmentConfiguration
+from open_deep_research.state_enrichment import ArticlePayload, RoutingDecision
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+_NON_DIGITS = re.compile(r"\D")
+_NON_ALNUM = re.compile(r"[^0-9a-z]")
+
+
+def ean_key(ean: Optional[str]) -> Optional[str]:
+    """Normalize an EAN/UPC/GTIN into a GTIN-14 index key.
+
+    Example:
+        "0 194252 721124" → ean:00194252721124
+
+    Args:
+        ean: Raw barcode as found in the feed
+
+    Returns:
+        Index key, or None if the value has no usable digits
+    """
+    digits = _NON_DIGITS.sub("", ean or "")
+    if len(digits) < 8 or len(digits) > 14:
+        return None
+    return f"ean:{digits.zfill(14)}"
+
+
+def brand_reference_key(brand: Optional[str], reference: Optional[str]) -> Optional[str]:
+    """Build the brand + supplier reference index key.
+
+    Example:
+        ("Calor", "GV9580-C0") → ref:calor|gv9580c0
+
+    Args:
+        brand: Product brand
+        reference: Supplier reference
+
+    Returns:
+        Index key, or None if either part is missing
+    """
+    brand = _NON_ALNUM.sub("", (brand or "").lower())
+    reference = _NON_ALNUM.sub("", (reference or "").lower())
+    if not brand or not reference:
+        return None
+    return f"ref:{brand}|{reference}"
+
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+@dataclass
+class ResolutionLookup:
+    """Result of a resolution index lookup."""
+
+    status: Literal["hit", "partial", "miss"]
+    decision: Optional[RoutingDecision] = None
+    matched_key: Optional[str] = None
+    age_hours: float = 0.0
+
+    def known_asins(self) -> List[str]:
+        """ASINs previously resolved for the article (warm start for the Amazon phase)."""
+        if not self.decision or not self.decision.amazon_data:
+            return []
+        return list(dict.fromkeys(product.asin for product in self.decision.amazon_data))
+
+
+class ResolutionIndex:
+    """SQLite-backed map of article keys to previously resolved routing decisions.
+
+    Connections are opened per call so the index can be used from worker threads.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the index database at ``path``."""
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resolutions (
+                    key TEXT PRIMARY KEY,
+                    enrichment_type TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    decision_json TEXT NOT NULL,
+                    resolved_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:  # commits on success, rolls back on error
+                yield connection
+        finally:
+            connection.close()
+
+    def lookup(self, article: ArticlePayload, config: EnrichmentConfiguration) -> ResolutionLookup:
+        """Look up an article by EAN first, then by brand + supplier reference.
+
+        Args:
+            article: Article to resolve
+            config: Enrichment configuration (TTLs and confidence thresholds)
+
+        Returns:
+            ResolutionLookup describing the hit, partial hit or miss
+        """
+        article_ean_key = ean_key(article.ean)
+        keys = [key for key in (article_ean_key, brand_reference_key(article.marque, article.reference_fournisseur)) if key]
+        if not keys:
+            return ResolutionLookup(status="miss")
+
+        with self._connect() as connection:
+            for key in keys:
+                row = connection.execute(
+                    "SELECT enrichment_type, confidence, decision_json, resolved_at FROM resolutions WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row:
+                    break
+            else:
+                return ResolutionLookup(status="miss")
+
+        enrichment_type, confidence, decision_json, resolved_at = row
+        decision = RoutingDecision.model_validate_json(decision_json)
+        age_hours = (time.time() - resolved_at) / 3600
+
+        ttl_hours = (
+            config.resolution_index_referentiel_ttl_hours
+            if enrichment_type == "REFERENTIEL"
+            else config.resolution_index_web_ttl_hours
+        )
+        min_confidence = (
+            config.scoring_thresholds.referentiel_min
+            if enrichment_type == "REFERENTIEL"
+            else config.scoring_thresholds.web_min
+        )
+        # A brand + reference match is only authoritative when the article has no EAN to contradict it
+        strong_key = key == article_ean_key or article_ean_key is None
+
+        status = "hit" if (age_hours <= ttl_hours and confidence >= min_confidence and strong_key) else "partial"
+        return ResolutionLookup(status=status, decision=decision, matched_key=key, age_hours=age_hours)
+
+    def store(self, article: ArticlePayload, decision: RoutingDecision):
+        """Record a search-based routing decision under every key of the article.
+
+        Only REFERENTIEL and WEB decisions are indexed: GENERATIF and EN_ATTENTE
+        depend on the article's own data rather than on what exists online.
+
+        Args:
+            article: Resolved article
+            decision: Routing decision produced by the search phases
+        """
+        if decision.enrichment_type not in ("REFERENTIEL", "WEB"):
+            return
+        keys = [key for key in (ean_key(article.ean), brand_reference_key(article.marque, article.reference_fournisseur)) if key]
+        if not keys:
+            return
+
+        decision_json = decision.model_dump_json()
+        now = time.time()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO resolutions VALUES (?, ?, ?, ?, ?)",
+                [(key, decision.enrichment_type, decision.confidence_score, decision_json, now) for key in keys],
+            )
+
+    def purge_expired(self, max_age_hours: float) -> int:
+        """Delete entries older than ``max_age_hours``.
+
+        Returns:
+            Number of deleted entries
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "DELETE FROM resolutions WHERE resolved_at < ?",
+                (time.time() - max_age_hours * 3600,),
+            )
+            return cursor.rowcount
+
+
+@cache
+def get_resolution_index(path: str) -> ResolutionIndex:
+    """Get the shared ResolutionIndex for a database path."""
+    return ResolutionIndex(path)
+
+
+# =============================================================================
+# ASYNC HELPERS (used by deep_researcher)
+# =============================================================================
+
+async def lookup_resolution(article: ArticlePayload, config: EnrichmentConfiguration) -> ResolutionLookup:
+    """Look up an article without blocking the event loop. Misses when the index is disabled."""
+    if not config.resolution_index_enabled:
+        return ResolutionLookup(status="miss")
+    index = get_resolution_index(config.resolution_index_path)
+    return await asyncio.to_thread(index.lookup, article, config)
+
+
+async def record_resolution(article: ArticlePayload, decision: RoutingDecision, config: EnrichmentConfiguration):
+    """Store a routing decision without blocking the event loop. No-op when the index is disabled."""
+    if not config.resolution_index_enabled:
+        return
+    index = get_resolution_index(config.resolution_index_path)
+    await asyncio.to_thread(index.store, article, decision)
+
+
+def decision_from_index(lookup: ResolutionLookup) -> RoutingDecision:
+    """Re-issue an indexed routing decision for the current run.
+
+    Args:
+        lookup: Index hit
+
+    Returns:
+        Copy of the indexed decision with a search summary describing the cache hit
+    """
+    decision = lookup.decision
+    return decision.model_copy(update={
+        "search_credits": 0,
+        "justification": f"{decision.justification} (index local, résolu il y a {lookup.age_hours:.1f}h)",
+        "search_summary": {
+            **(decision.search_summary or {}),
+            "phase": "Index",
+            "queries_count": 0,
+            "index_key": lookup.matched_key,
+            "index_age_hours": round(lookup.age_hours, 1),
+        },
+    })
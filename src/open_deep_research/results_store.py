@@ -0,0 +1,240 @@
+"""Enrichment results store for incremental re-runs.
+
+Suppliers re-send whole catalogs in which most articles did not change. This
+module keeps, per article ident, a fingerprint of the fields that drive the
+search (EAN, brand, label, supplier reference, family) and the last
+EnrichmentReport, so that a re-run only enriches articles that are new, whose
+fingerprint changed, or whose result is older than the maximum age configured
+for its enrichment type.
+
+A lookup returns one of:
+- ``fresh``: same fingerprint, result within its max age → skip, reuse the stored report
+- ``changed``: a search field changed since the stored result → re-run
+- ``stale``: same fingerprint but the result is too old → re-run
+- ``new``: no stored result for the ident → run
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cache
+from typing import Iterable, Iterator, Literal, Optional, Set
+
+from open_deep_research.configuration_enrichment import EnrichmentConfiguration
+from open_deep_research.state_enrichment import ArticlePayload, EnrichmentReport
+
+# =============================================================================
+# FINGERPRINT
+# =============================================================================
+
+_WHITESPACE = re.compile(r"\s+")
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _normalize(value: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", (value or "").strip()).casefold()
+
+
+def article_fingerprint(article: ArticlePayload) -> str:
+    """Hash the article fields that influence the search queries.
+
+    Case and whitespace changes, and formatting of the EAN, do not change the
+    fingerprint: they do not change what the search finds.
+
+    Args:
+        article: Article to fingerprint
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    fields = (
+        _NON_DIGITS.sub("", article.ean or ""),
+        _normalize(article.marque),
+        _normalize(article.libelle),
+        _normalize(article.reference_fournisseur),
+        _normalize(article.famille_produit),
+    )
+    return hashlib.sha256("\x1f".join(fields).encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+@dataclass
+class StoredResult:
+    """Result of an enrichment results store lookup."""
+
+    status: Literal["fresh", "changed", "stale", "new"]
+    report: Optional[EnrichmentReport] = None
+    age_hours: float = 0.0
+
+    @property
+    def needs_enrichment(self) -> bool:
+        """Whether the article must go through the enrichment graph again."""
+        return self.status != "fresh"
+
+
+class EnrichmentResultsStore:
+    """SQLite-backed map of article idents to their search fingerprint and last report.
+
+    Connections are opened per call so the store can be used from worker threads.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the results database at ``path``."""
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS enrichment_results (
+                    ident TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    enrichment_type TEXT NOT NULL,
+                    report_json TEXT NOT NULL,
+                    enriched_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:  # commits on success, rolls back on error
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _classify(
+        article: ArticlePayload,
+        row: Optional[tuple],
+        config: EnrichmentConfiguration,
+        now: float
+    ) -> StoredResult:
+        if row is None:
+            return StoredResult(status="new")
+        fingerprint, enrichment_type, report_json, enriched_at = row
+        age_hours = (now - enriched_at) / 3600
+        if fingerprint != article_fingerprint(article):
+            return StoredResult(status="changed", age_hours=age_hours)
+        max_age_hours = config.result_max_age_hours.get(enrichment_type)
+        if max_age_hours is None or age_hours > max_age_hours:
+            return StoredResult(status="stale", age_hours=age_hours)
+        return StoredResult(
+            status="fresh",
+            report=EnrichmentReport.model_validate_json(report_json),
+            age_hours=age_hours,
+        )
+
+    def lookup(self, article: ArticlePayload, config: EnrichmentConfiguration) -> StoredResult:
+        """Check whether an article needs to be enriched again.
+
+        Args:
+            article: Incoming article
+            config: Enrichment configuration (max age per enrichment type)
+
+        Returns:
+            StoredResult with the previous report when it is still fresh
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT fingerprint, enrichment_type, report_json, enriched_at FROM enrichment_results WHERE ident = ?",
+                (article.article_id,),
+            ).fetchone()
+        return self._classify(article, row, config, time.time())
+
+    def fresh_idents(self, articles: Iterable[ArticlePayload], config: EnrichmentConfiguration) -> Set[str]:
+        """Get the idents of the articles whose stored result is still fresh.
+
+        Uses a single connection for the whole iterable (catalog pre-scan).
+
+        Args:
+            articles: Incoming articles
+            config: Enrichment configuration (max age per enrichment type)
+
+        Returns:
+            Idents that can be skipped
+        """
+        fresh = set()
+        now = time.time()
+        with self._connect() as connection:
+            for article in articles:
+                row = connection.execute(
+                    "SELECT fingerprint, enrichment_type, report_json, enriched_at FROM enrichment_results WHERE ident = ?",
+                    (article.article_id,),
+                ).fetchone()
+                if row is not None and self._classify(article, row, config, now).status == "fresh":
+                    fresh.add(article.article_id)
+        return fresh
+
+    def store(self, article: ArticlePayload, report: EnrichmentReport):
+        """Record the report of an article under its ident and current fingerprint.
+
+        Args:
+            article: Enriched article
+            report: Report produced for it
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO enrichment_results VALUES (?, ?, ?, ?, ?)",
+                (
+                    article.article_id,
+                    article_fingerprint(article),
+                    report.enrichment_type,
+                    report.model_dump_json(),
+                    time.time(),
+                ),
+            )
+
+    def forget(self, ident: str):
+        """Drop the stored result of an ident, forcing its next enrichment."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM enrichment_results WHERE ident = ?", (ident,))
+
+    def purge_expired(self, max_age_hours: float) -> int:
+        """Delete results older than ``max_age_hours``.
+
+        Returns:
+            Number of deleted results
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "DELETE FROM enrichment_results WHERE enriched_at < ?",
+                (time.time() - max_age_hours * 3600,),
+            )
+            return cursor.rowcount
+
+
+@cache
+def get_results_store(path: str) -> EnrichmentResultsStore:
+    """Get the shared EnrichmentResultsStore for a database path."""
+    return EnrichmentResultsStore(path)
+
+
+# =============================================================================
+# ASYNC HELPERS (used by the batch runner and webhook workers)
+# =============================================================================
+
+async def lookup_result(article: ArticlePayload, config: EnrichmentConfiguration) -> StoredResult:
+    """Look up an article without blocking the event loop. Always ``new`` when incremental mode is disabled."""
+    if not config.incremental_enabled:
+        return StoredResult(status="new")
+    store = get_results_store(config.results_store_path)
+    return await asyncio.to_thread(store.lookup, article, config)
+
+
+async def record_result(article: ArticlePayload, report: EnrichmentReport, config: EnrichmentConfiguration):
+    """Store an article's report without blocking the event loop. No-op when incremental mode is disabled."""
+    if not config.incremental_enabled:
+        return
+    store = get_results_store(config.results_store_path)
+    await asyncio.to_thread(store.store, article, report)
@@ -1,15 +1,15 @@
 """Graph state definitions and data structures for the Deep Research agent."""
 
 import operator
-import re
 from typing import Annotated, Optional, Dict, Any, List
-from urllib.parse import urlparse
 
 from langchain_core.messages import MessageLikeRepresentation
 from langgraph.graph import MessagesState
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
+from open_deep_research.url_canonical import extract_asin, extract_domain
+
 
 ###################
 # Structured Outputs for Article Enrichment
@@ -222,62 +222,15 @@ def extract_asin_from_url(url: str) -> Optional[str]:
     """
     Extract ASIN (10-character code) from Amazon URL.
 
-    Args:
-        url: Amazon product URL
-
-    Returns:
-        ASIN if found, None otherwise
-
-    Examples:
-        - https://www.amazon.fr/dp/B0XXXXXXXX → B0XXXXXXXX
-        - https://www.amazon.it/product/B0YYYYYYYY → B0YYYYYYYY
+    See ``open_deep_research.url_canonical.extract_asin``.
     """
-    if not url or "amazon" not in url.lower():
-        return None
-
-    # Pattern 1: /dp/{ASIN}
-    match = re.search(r'/dp/([A-Z0-9]{10})', url)
-    if match:
-        return match.group(1)
-
-    # Pattern 2: /product/{ASIN}
-    match = re.search(r'/product/([A-Z0-9]{10})', url)
-    if match:
-        return match.group(1)
-
-    # Pattern 3: /gp/product/{ASIN}
-    match = re.search(r'/gp/product/([A-Z0-9]{10})', url)
-    if match:
-        return match.group(1)
-
-    return None
+    return extract_asin(url)
 
 
 def extract_domain_from_url(url: str) -> Optional[str]:
     """
-    Extract domain from URL.
-
-    Args:
-        url: Full URL
-
-    Returns:
-        Domain name (e.g., 'amazon.fr')
+    Extract domain from URL (e.g., 'amazon.fr').
 
-    Examples:
-        - https://www.amazon.fr/dp/B123 → amazon.fr
-        - https://example.com/page → example.com
+    See ``open_deep_research.url_canonical.extract_domain``.
     """
-    if not url:
-        return None
-
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc
-
-        # Remove 'www.' prefix
-        if domain.startswith('www.'):
-            domain = domain[4:]
-
-        return domain
-    except Exception:
-        return None
+    return extract_domain(url)
@@ -4,12 +4,13 @@ This module defines all state classes and structured outputs used in the
 cascade enrichment workflow.
 """
 
-from typing import Annotated, List, Literal, Optional, Dict, Any
-from typing_extensions import TypedDict
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from langgraph.graph import MessagesState
 import datetime
 
+from open_deep_research.url_canonical import extract_asin, extract_domain
+
 
 # =============================================================================
 # STRUCTURED OUTPUTS (for .with_structured_output())
@@ -73,6 +74,7 @@ class AmazonProduct(BaseModel):
     domain: str = Field(description="Amazon domain (e.g., amazon.fr, amazon.com)")
     url: str = Field(description="Full product URL")
     title: Optional[str] = Field(default=None, description="Product title on Amazon")
+    content_snippet: Optional[str] = Field(default=None, description="Content snippet from search")
     price: Optional[str] = Field(default=None, description="Product price")
     rating: Optional[float] = Field(default=None, description="Product rating")
     reviews_count: Optional[int] = Field(default=None, description="Number of reviews")
@@ -110,6 +112,49 @@ class TechnicalDocument(BaseModel):
     language: Optional[str] = Field(default=None, description="Document language")
 
 
+class SearchHit(BaseModel):
+    """Single result returned by a Tavily search query."""
+
+    query: str = Field(description="Query that produced this result")
+    url: str = Field(description="Result URL")
+    title: Optional[str] = Field(default=None, description="Result title")
+    content: str = Field(default="", description="Content snippet returned by Tavily")
+    score: float = Field(default=0.0, description="Tavily relevance score (0.0-1.0)")
+    domain: Optional[str] = Field(default=None, description="Domain name")
+    asin: Optional[str] = Field(default=None, description="ASIN when the URL is an Amazon product page")
+
+
+class QueryFailure(BaseModel):
+    """Search query or URL that could not be processed."""
+
+    query: str = Field(description="Failed query or URL")
+    error: str = Field(description="Error message")
+
+
+class SearchPayload(BaseModel):
+    """Structured output of the enrichment search tools."""
+
+    hits: List[SearchHit] = Field(default_factory=list, description="Results in query order")
+    failures: List[QueryFailure] = Field(default_factory=list, description="Queries that failed")
+    error: Optional[str] = Field(default=None, description="Tool-level error (missing client or API key)")
+
+
+class ExtractedPage(BaseModel):
+    """Content extracted from a single URL."""
+
+    url: str = Field(description="Extracted URL")
+    content: str = Field(description="Raw content extracted from the page")
+    from_cache: bool = Field(default=False, description="Served from the extract cache without a Tavily call")
+
+
+class ExtractPayload(BaseModel):
+    """Structured output of the enrichment extraction tool."""
+
+    pages: List[ExtractedPage] = Field(default_factory=list, description="Extracted pages in URL order")
+    failures: List[QueryFailure] = Field(default_factory=list, description="URLs that failed")
+    error: Optional[str] = Field(default=None, description="Tool-level error (missing client or API key)")
+
+
 class RoutingDecision(BaseModel):
     """Routing decision made by deep_researcher."""
 
@@ -153,6 +198,12 @@ class RoutingDecision(BaseModel):
         description="Summary of search performed (languages, domains, results count)"
     )
 
+    search_credits: int = Field(
+        default=0,
+        ge=0,
+        description="Tavily credits spent by the search phases that led to this decision"
+    )
+
 
 class MatchingDetails(BaseModel):
     """Detailed matching information for scoring."""
@@ -524,53 +575,17 @@ def create_initial_enrichment_state(article_payload: ArticlePayload) -> Enrichme
 
 def extract_asin_from_url(url: str) -> Optional[str]:
     """
-    Extract ASIN from an Amazon URL.
-
-    Examples:
-        https://www.amazon.fr/dp/B08X123456 → B08X123456
-        https://www.amazon.com/Product/dp/B123456789/ref=... → B123456789
+    Extract ASIN (10-character code) from Amazon URL.
 
-    Args:
-        url: Amazon product URL
-
-    Returns:
-        ASIN string (10 characters) or None if not found
+    See ``open_deep_research.url_canonical.extract_asin``.
     """
-    import re
-
-    # Pattern to match ASIN in Amazon URLs
-    # ASIN is always 10 characters, usually after /dp/ or /product/
-    patterns = [
-        r'/dp/([A-Z0-9]{10})',
-        r'/product/([A-Z0-9]{10})',
-        r'/gp/product/([A-Z0-9]{10})'
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-
-    return None
+    return extract_asin(url)
 
 
 def extract_domain_from_url(url: str) -> Optional[str]:
     """
-    Extract domain from URL.
-
-    Example:
-        https://www.amazon.fr/dp/B08X123456 → amazon.fr
-
-    Args:
-        url: Full URL
+    Extract domain from URL (e.g., 'amazon.fr').
 
-    Returns:
-        Domain string or None
+    See ``open_deep_research.url_canonical.extract_domain``.
     """
-    import re
-
-    match = re.search(r'https?://(?:www\.)?([^/]+)', url)
-    if match:
-        return match.group(1)
-
-    return None
+    return extract_domain(url)
@@ -0,0 +1,233 @@
+"""URL canonicalization and identity extraction for Article Enrichment.
+
+The same page comes back under many spellings: tracking parameters
+(``utm_*``, ``ref=``, ``tag=``...), ``www.`` or not, fragments, trailing
+slashes, and for Amazon every product has several paths
+(``/dp/X``, ``/gp/product/X``, ``/Some-Title/dp/X/ref=sr_1_1``...).
+
+This module is the single place where URLs are normalized:
+- ``canonicalize_url``: fetchable URL without tracking noise
+  (Amazon product pages are rewritten to ``https://<host>/dp/<ASIN>``)
+- ``url_key``: identity key used for deduplication
+  (``amazon.fr/dp/B08X123456``, ``example.com/page?id=3``)
+- ``extract_asin`` / ``extract_domain``: identity fields of a URL
+- ``dedupe_urls`` / ``find_urls``: helpers built on the above
+
+Patterns are compiled once and results are memoized, since the same URLs are
+seen again and again across search passes, notes and articles.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# =============================================================================
+# PATTERNS
+# =============================================================================
+
+# ASIN is always 10 characters, found after one of the known product path segments
+_ASIN_PATTERN = re.compile(
+    r"/(?:dp|gp/product|gp/aw/d|product|exec/obidos/asin|o/asin)/([A-Z0-9]{10})(?=[/?#&]|$)",
+    re.IGNORECASE,
+)
+_URL_IN_TEXT_PATTERN = re.compile(r'https?://[^\s<>"\'`]+|www\.[^\s<>"\'`]+')
+_TRAILING_PUNCTUATION = ".,;:!?)]}>*'\""
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# Query parameters that never change the content of a page
+_TRACKING_PARAMS = frozenset({
+    "ref", "ref_", "tag", "psc", "th", "qid", "sr", "keywords", "crid", "sprefix",
+    "linkcode", "linkid", "creative", "creativeasin", "ascsubtag", "smid", "spla",
+    "content-id", "pd_rd_i", "pd_rd_r", "pd_rd_w", "pd_rd_wg", "pf_rd_i", "pf_rd_m",
+    "pf_rd_p", "pf_rd_r", "pf_rd_s", "pf_rd_t", "dib", "dib_tag",
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "twclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "srsltid", "spm",
+})
+_TRACKING_PREFIXES = ("utm_", "pd_rd_", "pf_rd_")
+
+# Memoization size: large enough for the URLs of a whole batch of articles
+_CACHE_SIZE = 16384
+
+
+# =============================================================================
+# IDENTITY EXTRACTION
+# =============================================================================
+
+def _with_scheme(url: str) -> str:
+    """Add the https scheme to scheme-less URLs found in text (``www.example.com``)."""
+    return url if "://" in url else f"https://{url}"
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def extract_domain(url: str) -> Optional[str]:
+    """Extract the domain of a URL, lowercased, without ``www.`` or port.
+
+    Examples:
+        https://www.Amazon.fr/dp/B08X123456 → amazon.fr
+        http://example.com:8080/page → example.com
+
+    Args:
+        url: Full URL
+
+    Returns:
+        Domain string or None
+    """
+    if not url:
+        return None
+    try:
+        host = urlsplit(_with_scheme(url.strip())).hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_amazon_domain(domain: Optional[str]) -> bool:
+    """Whether a domain is an Amazon storefront (amazon.fr, amazon.co.uk, smile.amazon.com...)."""
+    return bool(domain) and (domain.startswith("amazon.") or ".amazon." in domain)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def extract_asin(url: str) -> Optional[str]:
+    """Extract the ASIN of an Amazon product URL.
+
+    Examples:
+        https://www.amazon.fr/dp/B08X123456 → B08X123456
+        https://www.amazon.com/Product/dp/B123456789/ref=... → B123456789
+        https://www.amazon.it/gp/product/B0YYYYYYYY?psc=1 → B0YYYYYYYY
+
+    Args:
+        url: Amazon product URL
+
+    Returns:
+        ASIN string (10 characters, uppercase) or None if not found
+    """
+    if not url or not is_amazon_domain(extract_domain(url)):
+        return None
+    match = _ASIN_PATTERN.search(url)
+    return match.group(1).upper() if match else None
+
+
+# =============================================================================
+# CANONICALIZATION
+# =============================================================================
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PREFIXES)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL while keeping it fetchable.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, and sorts the remaining query parameters. Amazon product pages
+    are rewritten to ``https://<host>/dp/<ASIN>``.
+
+    Examples:
+        https://www.amazon.fr/Calor-GV9580/dp/B08X123456/ref=sr_1_1?tag=x → https://www.amazon.fr/dp/B08X123456
+        HTTPS://Example.com:443/page?utm_source=a&b=2&a=1#specs → https://example.com/page?a=1&b=2
+
+    Args:
+        url: URL as returned by a search engine or found in text
+
+    Returns:
+        Canonical URL (the input stripped of whitespace if it cannot be parsed)
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(_with_scheme(url))
+        host = parts.hostname or ""
+        port = parts.port
+    except ValueError:
+        return url
+    if not host:
+        return url
+
+    scheme = parts.scheme.lower()
+    if port is not None and str(port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    asin = extract_asin(url)
+    if asin:
+        return f"https://{host}/dp/{asin}"
+
+    query = urlencode(sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def url_key(url: str) -> str:
+    """Get the identity key of a URL: two URLs with the same key are the same source.
+
+    The key ignores the scheme, ``www.`` and trailing slashes on top of
+    ``canonicalize_url``; Amazon products are keyed on storefront and ASIN.
+
+    Examples:
+        https://www.amazon.fr/gp/product/B08X123456 → amazon.fr/dp/B08X123456
+        http://www.example.com/page/?utm_medium=x → example.com/page
+
+    Args:
+        url: Any URL
+
+    Returns:
+        Identity key string
+    """
+    canonical = canonicalize_url(url)
+    parts = urlsplit(canonical)
+    domain = extract_domain(canonical)
+    if not domain:
+        return canonical
+    if parts.port is not None:
+        domain = f"{domain}:{parts.port}"
+    key = f"{domain}{parts.path.rstrip('/')}"
+    return f"{key}?{parts.query}" if parts.query else key
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def dedupe_urls(urls: Iterable[str]) -> List[str]:
+    """Remove duplicate URLs by identity key, keeping the first spelling of each source.
+
+    Args:
+        urls: URLs in priority order
+
+    Returns:
+        Deduplicated URLs (original spelling, input order)
+    """
+    seen = set()
+    unique = []
+    for url in urls:
+        if not url:
+            continue
+        key = url_key(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+def find_urls(text: str) -> List[str]:
+    """Find the URLs in free text (notes, reports), without trailing punctuation.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        URLs in order of appearance, duplicates included
+    """
+    urls = []
+    for match in _URL_IN_TEXT_PATTERN.finditer(text or ""):
+        url = match.group(0).rstrip(_TRAILING_PUNCTUATION)
+        if url:
+            urls.append(url)
+    return urls
@@ -7,8 +7,6 @@ import warnings
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Any, Dict, List, Literal, Optional
 
-import aiohttp
-from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import (
     AIMessage,
@@ -24,10 +22,7 @@ from langchain_core.tools import (
     ToolException,
     tool,
 )
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.config import get_store
-from mcp import McpError
-from tavily import AsyncTavilyClient
 
 from open_deep_research.configuration import Configuration, SearchAPI
 from open_deep_research.prompts import summarize_webpage_prompt
@@ -82,6 +77,9 @@ async def tavily_search(
     max_char_to_include = configurable.max_content_length
     
     # Initialize summarization model with retry logic
+    # Provider integrations, MCP and HTTP clients are imported on first use to keep cold start fast
+    from langchain.chat_models import init_chat_model
+
     model_api_key = get_api_key_for_model(configurable.summarization_model, config)
     summarization_model = init_chat_model(
         model=configurable.summarization_model,
@@ -155,6 +153,8 @@ async def tavily_search_async(
         List of search result dictionaries from Tavily API
     """
     # Initialize the Tavily client with API key from config
+    from tavily import AsyncTavilyClient
+
     tavily_client = AsyncTavilyClient(api_key=get_tavily_api_key(config))
     
     # Create search tasks for parallel execution
@@ -260,6 +260,8 @@ async def get_mcp_access_token(
     Returns:
         Token data dictionary if successful, None if failed
     """
+    import aiohttp
+
     try:
         # Prepare OAuth token exchange request data
         form_data = {
@@ -395,6 +397,7 @@ def wrap_mcp_authenticate_tool(tool: StructuredTool) -> StructuredTool:
     
     async def authentication_wrapper(**kwargs):
         """Enhanced coroutine with MCP error handling and user-friendly messages."""
+        from mcp import McpError
         
         def _find_mcp_error_in_exception_chain(exc: BaseException) -> McpError | None:
             """Recursively search for MCP errors in exception chains."""
@@ -497,6 +500,8 @@ async def load_mcp_tools(
     
     # Step 4: Load tools from MCP server
     try:
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+
         client = MultiServerMCPClient(mcp_server_config)
         available_mcp_tools = await client.get_tools()
     except Exception:
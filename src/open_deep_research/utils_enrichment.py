@@ -3,21 +3,206 @@
 This module contains helper functions and Tavily tools for the enrichment workflow.
 """
 
+import asyncio
+import math
 import os
-import re
-from typing import List, Optional, Dict, Any
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple
 from langchain_core.tools import tool
 
+from open_deep_research.extract_cache import (
+    DEFAULT_EXTRACT_CACHE_TTL,
+    fetch_validators,
+    get_extract_cache,
+    revalidate,
+)
+from open_deep_research.instrumentation import TAVILY_CREDITS_PER_DEPTH
+from open_deep_research.metrics import observe_tavily_request
+from open_deep_research.query_planner import get_active_query_planner
+from open_deep_research.state_enrichment import (
+    ExtractedPage,
+    ExtractPayload,
+    QueryFailure,
+    SearchHit,
+    SearchPayload,
+)
+from open_deep_research.url_canonical import canonicalize_url, dedupe_urls, extract_asin, extract_domain, url_key
+
+
+# =============================================================================
+# SHARED ASYNC TAVILY CLIENT
+# =============================================================================
+
+# One client per event loop and API key, shared by every tool call running on the loop
+_TAVILY_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]] = weakref.WeakKeyDictionary()
+
+# Defaults used when a tool is invoked without explicit limits
+DEFAULT_MAX_CONCURRENT_QUERIES = 5
+DEFAULT_QUERY_TIMEOUT = 30.0
+DEFAULT_EXTRACT_MAX_CHARS = 2000
+DEFAULT_EXTRACT_BATCH_SIZE = 20
+
+# Amazon domains searched when tavily_search_amazon is invoked without include_domains
+AMAZON_DOMAINS = ["amazon.fr", "amazon.it", "amazon.com", "amazon.es", "amazon.de", "amazon.co.uk"]
+
+# Tavily Extract accepts at most 20 URLs per request
+MAX_EXTRACT_BATCH_SIZE = 20
+
+
+def get_async_tavily_client():
+    """
+    Get the shared AsyncTavilyClient for the current TAVILY_API_KEY and event loop.
+
+    The client is created once per API key and event loop: since tavily-python
+    0.7.21 it keeps one persistent httpx connection pool, whose connections are
+    bound to the loop that opened them.
+
+    Returns:
+        AsyncTavilyClient instance
+
+    Raises:
+        ImportError: If tavily-python is not installed
+        ValueError: If TAVILY_API_KEY is not set
+    """
+    from tavily import AsyncTavilyClient
+
+    api_key = os.environ.get("TAVILY_API_KEY")
+    if not api_key:
+        raise ValueError("TAVILY_API_KEY environment variable not set")
+
+    clients = _TAVILY_CLIENTS.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(api_key)
+    if client is None:
+        client = AsyncTavilyClient(api_key=api_key)
+        clients[api_key] = client
+    return client
+
+
+async def run_bounded(
+    calls: List[Callable[[], Awaitable[Any]]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENT_QUERIES,
+    timeout: float = DEFAULT_QUERY_TIMEOUT
+) -> List[Any]:
+    """
+    Run Tavily calls concurrently with a concurrency cap and a per-call timeout.
+
+    The timeout starts once a call acquires its slot, so queued calls are not
+    penalized for waiting behind slower ones.
+
+    Args:
+        calls: Zero-argument coroutine factories, one per request
+        max_concurrency: Maximum number of requests in flight
+        timeout: Timeout in seconds for each request
+
+    Returns:
+        Results in the same order as ``calls``; failed calls return their exception
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(call: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(call(), timeout)
+            except asyncio.TimeoutError:
+                return TimeoutError(f"Timed out after {timeout:.0f}s")
+
+    return await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+
+async def _measured(tool_name: str, depth: str, credits: int, request: Awaitable[Any], results_key: str) -> Any:
+    """Await a Tavily request and record it in the enrichment metrics."""
+    start = time.perf_counter()
+    try:
+        response = await request
+    except BaseException:
+        observe_tavily_request(tool_name, depth, credits, time.perf_counter() - start, error=True)
+        raise
+    observe_tavily_request(
+        tool_name, depth, credits, time.perf_counter() - start, results=len(response.get(results_key) or [])
+    )
+    return response
+
+
+@dataclass
+class CreditMeter:
+    """Tavily credits of the search requests sent while the meter is active.
+
+    Requests served from the batch query planner's shared results are never sent,
+    and requests rejected by Tavily are not billed, so neither is counted.
+    """
+
+    credits: int = 0
+
+
+_CREDIT_METER: ContextVar[Optional[CreditMeter]] = ContextVar("tavily_credit_meter", default=None)
+
+
+@contextmanager
+def meter_search_credits(meter: Optional[CreditMeter] = None) -> Iterator[CreditMeter]:
+    """Count the credits of the Tavily searches sent in this context (and the tasks it starts)."""
+    meter = meter or CreditMeter()
+    token = _CREDIT_METER.set(meter)
+    try:
+        yield meter
+    finally:
+        _CREDIT_METER.reset(token)
+
+
+async def _charged(meter: Optional[CreditMeter], credits: int, request: Awaitable[Any]) -> Any:
+    """Await a Tavily request, counting its credits as soon as it is sent."""
+    if meter is not None:
+        meter.credits += credits
+    try:
+        return await request
+    except Exception:
+        # Rejected requests (HTTP errors, invalid key) are not billed. Cancelled or
+        # timed out requests were sent and stay counted
+        if meter is not None:
+            meter.credits -= credits
+        raise
+
+
+def _search(client, tool_name: str, query: str, search_kwargs: Dict[str, Any]) -> Awaitable[Any]:
+    """Send one Tavily search, through the batch query planner when one is active."""
+    depth = search_kwargs.get("search_depth", "basic")
+    credits = TAVILY_CREDITS_PER_DEPTH.get(depth, 1)
+
+    def send(sent_query: str) -> Awaitable[Any]:
+        # Only called for requests actually sent: the credits go to the caller's meter
+        return _charged(
+            _CREDIT_METER.get(), credits,
+            _measured(tool_name, depth, credits, client.search(query=sent_query, **search_kwargs), "results")
+        )
+
+    planner = get_active_query_planner()
+    if planner is None:
+        return send(query)
+    return planner.search(tool_name, query, search_kwargs, send)
+
 
 # =============================================================================
 # TAVILY TOOLS FOR ENRICHMENT
 # =============================================================================
+#
+# The tools return (text, payload): the text rendering is what an LLM sees in
+# the ToolMessage content, the typed payload is attached as the message
+# artifact so graph nodes can consume results without re-parsing the text.
+# Use invoke_enrichment_tool() to get both.
 
-@tool
+@tool(response_format="content_and_artifact")
 async def tavily_search_amazon(
     queries: List[str],
-    max_results: int = 10
-) -> str:
+    max_results: int = 10,
+    search_depth: str = "advanced",
+    include_domains: Optional[List[str]] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENT_QUERIES,
+    timeout: float = DEFAULT_QUERY_TIMEOUT
+) -> Tuple[str, SearchPayload]:
     """
     Search for products on Amazon across multiple countries using Tavily Search.
 
@@ -27,91 +212,49 @@ async def tavily_search_amazon(
     Args:
         queries: List of search queries (can be in multiple languages)
         max_results: Maximum results to return (default: 10)
+        search_depth: "basic" (1 credit) or "advanced" (2 credits, default)
+        include_domains: Amazon domains to search (default: all of the above)
+        max_concurrency: Maximum number of queries in flight (default: 5)
+        timeout: Timeout in seconds for each query (default: 30)
 
     Returns:
         Formatted search results with URLs, titles, and snippets
     """
     try:
-        from tavily import TavilyClient
+        client = get_async_tavily_client()
     except ImportError:
-        return "Error: Tavily client not installed. Install with: pip install tavily-python"
-
-    api_key = os.environ.get("TAVILY_API_KEY")
-    if not api_key:
-        return "Error: TAVILY_API_KEY environment variable not set"
-
-    client = TavilyClient(api_key=api_key)
-
-    # Amazon domains to search
-    amazon_domains = [
-        "amazon.fr",
-        "amazon.it",
-        "amazon.com",
-        "amazon.es",
-        "amazon.de",
-        "amazon.co.uk"
-    ]
-
-    results = []
-    for query in queries:
-        try:
-            # Search with domain restriction to Amazon sites
-            response = client.search(
-                query=query,
-                search_depth="advanced",  # Better accuracy (2 credits)
-                max_results=max_results,
-                include_domains=amazon_domains
-            )
+        return _tool_error("Tavily client not installed. Install with: pip install tavily-python", SearchPayload)
+    except ValueError as e:
+        return _tool_error(str(e), SearchPayload)
+
+    search_kwargs = {
+        "search_depth": search_depth,
+        "max_results": max_results,
+        "include_domains": list(include_domains or AMAZON_DOMAINS)
+    }
 
-            for result in response.get("results", []):
-                url = result.get("url", "")
-                title = result.get("title", "")
-                content = result.get("content", "")
-                score = result.get("score", 0.0)
+    # Run all queries concurrently, restricted to Amazon sites
+    responses = await run_bounded(
+        [
+            lambda query=query: _search(client, "tavily_search_amazon", query, search_kwargs)
+            for query in queries
+        ],
+        max_concurrency=max_concurrency,
+        timeout=timeout
+    )
 
-                # Extract ASIN if this is an Amazon URL
-                asin = extract_asin_from_url(url)
-                domain = extract_domain_from_url(url)
-
-                results.append({
-                    "query": query,
-                    "url": url,
-                    "title": title,
-                    "content": content,
-                    "score": score,
-                    "asin": asin,
-                    "domain": domain
-                })
-
-        except Exception as e:
-            results.append({
-                "query": query,
-                "error": str(e)
-            })
-
-    # Format results
-    formatted = f"Found {len(results)} results across Amazon sites:\n\n"
-    for idx, res in enumerate(results, 1):
-        if "error" in res:
-            formatted += f"{idx}. Query: {res['query']} - ERROR: {res['error']}\n\n"
-        else:
-            formatted += f"{idx}. {res['title']}\n"
-            formatted += f"   URL: {res['url']}\n"
-            if res.get('asin'):
-                formatted += f"   ASIN: {res['asin']}\n"
-            if res.get('domain'):
-                formatted += f"   Domain: {res['domain']}\n"
-            formatted += f"   Score: {res['score']:.2f}\n"
-            formatted += f"   Content: {res['content'][:200]}...\n\n"
-
-    return formatted
+    payload = _build_search_payload(queries, responses, with_asin=True)
+    return format_search_payload(payload, "results across Amazon sites"), payload
 
 
-@tool
+@tool(response_format="content_and_artifact")
 async def tavily_search_web(
     queries: List[str],
-    max_results: int = 10
-) -> str:
+    max_results: int = 10,
+    search_depth: str = "advanced",
+    max_concurrency: int = DEFAULT_MAX_CONCURRENT_QUERIES,
+    timeout: float = DEFAULT_QUERY_TIMEOUT
+) -> Tuple[str, SearchPayload]:
     """
     Search the web for products using Tavily Search (no domain restrictions).
 
@@ -121,187 +264,503 @@ async def tavily_search_web(
     Args:
         queries: List of search queries (can be in multiple languages)
         max_results: Maximum results to return (default: 10)
+        search_depth: "basic" (1 credit) or "advanced" (2 credits, default)
+        max_concurrency: Maximum number of queries in flight (default: 5)
+        timeout: Timeout in seconds for each query (default: 30)
 
     Returns:
         Formatted search results with URLs, titles, snippets, and relevance scores
     """
     try:
-        from tavily import TavilyClient
+        client = get_async_tavily_client()
     except ImportError:
-        return "Error: Tavily client not installed. Install with: pip install tavily-python"
+        return _tool_error("Tavily client not installed. Install with: pip install tavily-python", SearchPayload)
+    except ValueError as e:
+        return _tool_error(str(e), SearchPayload)
 
-    api_key = os.environ.get("TAVILY_API_KEY")
-    if not api_key:
-        return "Error: TAVILY_API_KEY environment variable not set"
+    search_kwargs = {
+        "search_depth": search_depth,
+        "max_results": max_results
+    }
 
-    client = TavilyClient(api_key=api_key)
+    # Run all queries concurrently, without domain restrictions
+    responses = await run_bounded(
+        [
+            lambda query=query: _search(client, "tavily_search_web", query, search_kwargs)
+            for query in queries
+        ],
+        max_concurrency=max_concurrency,
+        timeout=timeout
+    )
 
-    results = []
-    for query in queries:
-        try:
-            # General web search without domain restrictions
-            response = client.search(
-                query=query,
-                search_depth="advanced",  # Better accuracy (2 credits)
-                max_results=max_results
-            )
-
-            for result in response.get("results", []):
-                url = result.get("url", "")
-                title = result.get("title", "")
-                content = result.get("content", "")
-                score = result.get("score", 0.0)
-                domain = extract_domain_from_url(url)
-
-                results.append({
-                    "query": query,
-                    "url": url,
-                    "title": title,
-                    "content": content,
-                    "score": score,
-                    "domain": domain
-                })
-
-        except Exception as e:
-            results.append({
-                "query": query,
-                "error": str(e)
-            })
-
-    # Format results
-    formatted = f"Found {len(results)} web results:\n\n"
-    for idx, res in enumerate(results, 1):
-        if "error" in res:
-            formatted += f"{idx}. Query: {res['query']} - ERROR: {res['error']}\n\n"
-        else:
-            formatted += f"{idx}. {res['title']}\n"
-            formatted += f"   URL: {res['url']}\n"
-            formatted += f"   Domain: {res['domain']}\n"
-            formatted += f"   Score: {res['score']:.2f}\n"
-            formatted += f"   Content: {res['content'][:200]}...\n\n"
-
-    return formatted
+    payload = _build_search_payload(queries, responses, with_asin=False)
+    return format_search_payload(payload, "web results"), payload
 
 
-@tool
+@tool(response_format="content_and_artifact")
 async def tavily_extract_content(
     urls: List[str],
-    extract_depth: str = "advanced"
-) -> str:
+    extract_depth: str = "advanced",
+    max_content_chars: int = DEFAULT_EXTRACT_MAX_CHARS,
+    batch_size: int = DEFAULT_EXTRACT_BATCH_SIZE,
+    cache_ttl_seconds: float = DEFAULT_EXTRACT_CACHE_TTL,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENT_QUERIES,
+    timeout: float = DEFAULT_QUERY_TIMEOUT
+) -> Tuple[str, ExtractPayload]:
     """
     Extract content from web pages or PDFs using Tavily Extract.
 
     Useful for extracting technical datasheets, product specifications, etc.
+    URLs are sent in batches (Tavily bills extraction per 5 URLs) and the full
+    content is kept in the shared extract cache, so datasheets reused by several
+    articles of the same brand are only extracted once per TTL.
 
     Args:
         urls: List of URLs to extract content from
         extract_depth: "basic" or "advanced" (default: "advanced")
+        max_content_chars: Content characters returned per page, 0 for no limit (default: 2000)
+        batch_size: URLs per Tavily Extract request, at most 20 (default: 20)
+        cache_ttl_seconds: Cache freshness in seconds, 0 to bypass the cache (default: 24h)
+        max_concurrency: Maximum number of extraction requests in flight (default: 5)
+        timeout: Timeout in seconds for each extraction request (default: 30)
 
     Returns:
         Extracted content from the URLs
     """
+    urls = dedupe_urls(urls)
+    cache = get_extract_cache()
+    use_cache = cache_ttl_seconds > 0
+
+    # Fresh entries are served directly; stale ones with validators are revalidated
+    contents: Dict[str, str] = {}
+    cached_urls = set()
+    stale_entries = []
+    for url in urls:
+        entry = cache.get(url, extract_depth) if use_cache else None
+        if entry is None:
+            continue
+        if entry.age_seconds() <= cache_ttl_seconds:
+            contents[url] = entry.content
+            cache.hits += 1
+        elif entry.revalidatable:
+            stale_entries.append((url, entry))
+
+    unchanged = await revalidate([entry for _, entry in stale_entries])
+    for (url, entry), is_unchanged in zip(stale_entries, unchanged):
+        if is_unchanged:
+            contents[url] = entry.content
+            cache.revalidated += 1
+    cached_urls.update(contents)
+
+    payload = ExtractPayload()
+    missing = [url for url in urls if url not in contents]
+    if missing:
+        if use_cache:
+            cache.misses += len(missing)
+        try:
+            client = get_async_tavily_client()
+        except ImportError:
+            return _tool_error("Tavily client not installed. Install with: pip install tavily-python", ExtractPayload)
+        except ValueError as e:
+            return _tool_error(str(e), ExtractPayload)
+
+        batch_size = max(1, min(batch_size, MAX_EXTRACT_BATCH_SIZE))
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        # Validators are fetched alongside so the entries can be revalidated once stale
+        validators_task = asyncio.ensure_future(fetch_validators(missing)) if use_cache else None
+        responses = await run_bounded(
+            [
+                lambda batch=batch: _measured(
+                    "tavily_extract_content",
+                    extract_depth,
+                    # Extract bills per 5 URLs
+                    math.ceil(len(batch) / 5) * TAVILY_CREDITS_PER_DEPTH.get(extract_depth, 1),
+                    client.extract(urls=batch, extract_depth=extract_depth),
+                    "results"
+                )
+                for batch in batches
+            ],
+            max_concurrency=max_concurrency,
+            timeout=timeout
+        )
+
+        extracted: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                errors.update((url, str(response)) for url in batch)
+                continue
+            for result in response.get("results", []):
+                extracted[result.get("url")] = result.get("raw_content") or ""
+            for failure in response.get("failed_results", []):
+                errors[failure.get("url")] = failure.get("error") or "Extraction failed"
+
+        validators = await validators_task if validators_task else {}
+        for url in missing:
+            if url in extracted:
+                contents[url] = extracted[url]
+                if use_cache and extracted[url]:
+                    etag, last_modified = validators.get(url, (None, None))
+                    cache.put(url, extract_depth, extracted[url], etag=etag, last_modified=last_modified)
+            else:
+                payload.failures.append(QueryFailure(query=url, error=errors.get(url, "No result returned")))
+
+    for url in urls:
+        if url not in contents:
+            continue
+        content = contents[url]
+        if max_content_chars:
+            content = content[:max_content_chars]
+        payload.pages.append(ExtractedPage(
+            url=url,
+            content=content or "No content extracted",
+            from_cache=url in cached_urls
+        ))
+
+    return format_extract_payload(payload), payload
+
+
+async def invoke_enrichment_tool(enrichment_tool, args: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    Invoke an enrichment tool and return both its text rendering and its payload.
+
+    Invoking a tool with plain arguments only returns the text; invoking it with
+    a tool call returns a ToolMessage carrying the payload as its artifact.
+
+    Args:
+        enrichment_tool: One of the Tavily enrichment tools
+        args: Tool arguments
+
+    Returns:
+        Tuple of (text rendering, SearchPayload or ExtractPayload)
+    """
+    message = await enrichment_tool.ainvoke({
+        "type": "tool_call",
+        "id": f"call_{uuid.uuid4().hex}",
+        "name": enrichment_tool.name,
+        "args": args,
+    })
+    return message.content, message.artifact
+
+
+@dataclass
+class SpeculativeSearch:
+    """Enrichment tool call running in the background, with the credits it has spent so far.
+
+    Awaiting it returns the (text rendering, payload) tuple of invoke_enrichment_tool.
+    """
+
+    task: asyncio.Task
+    meter: CreditMeter = field(default_factory=CreditMeter)
+
+    @property
+    def credits(self) -> int:
+        """Credits of the requests sent so far (final once the task is done or cancelled)."""
+        return self.meter.credits
+
+    def __await__(self) -> Generator[Any, None, Tuple[str, Any]]:
+        """Wait for the search and return its (formatted text, payload) result."""
+        return self.task.__await__()
+
+
+def start_speculative_search(search_tool, args: Dict[str, Any], delay: float = 0.0) -> SpeculativeSearch:
+    """
+    Start an enrichment tool call in the background.
+
+    Args:
+        search_tool: One of the Tavily enrichment tools
+        args: Tool arguments
+        delay: Seconds to wait before sending the requests; cancelling the task
+            during that window spends no credits
+
+    Returns:
+        SpeculativeSearch to await, pass to run_search_phase or cancel
+    """
+    meter = CreditMeter()
+
+    async def run() -> Tuple[str, Any]:
+        if delay > 0:
+            await asyncio.sleep(delay)
+        with meter_search_credits(meter):
+            return await invoke_enrichment_tool(search_tool, args)
+
+    return SpeculativeSearch(asyncio.create_task(run()), meter)
+
+
+async def cancel_speculative_search(search: SpeculativeSearch) -> bool:
+    """
+    Cancel a speculative search and wait for it to unwind.
+
+    Requests already sent stay counted in ``search.credits``.
+
+    Returns:
+        True if the task was still running when cancelled, False if it had already finished
+    """
+    if search.task.done():
+        return False
+    search.task.cancel()
     try:
-        from tavily import TavilyClient
-    except ImportError:
-        return "Error: Tavily client not installed. Install with: pip install tavily-python"
+        await search.task
+    except (asyncio.CancelledError, Exception):
+        pass
+    return True
+
+
+async def run_search_phase(
+    search_tool,
+    args: Dict[str, Any],
+    search_depth: str,
+    is_conclusive: Callable[[SearchPayload], bool],
+    first_pass: Optional[SpeculativeSearch] = None,
+    useful_urls: Optional[Callable[[SearchPayload], Iterable[str]]] = None
+) -> Tuple[str, SearchPayload, int]:
+    """
+    Run the queries of a search phase at the configured Tavily depth.
 
-    api_key = os.environ.get("TAVILY_API_KEY")
-    if not api_key:
-        return "Error: TAVILY_API_KEY environment variable not set"
+    In "adaptive" mode the queries run at basic depth first. When the basic
+    results are not conclusive for the phase, only the weak queries (see
+    weak_queries) are re-run at advanced depth, and the results of both passes
+    are merged. An inconclusive phase where every query is weak still costs
+    1 + 2 credits per query, more than a single advanced pass.
 
-    client = TavilyClient(api_key=api_key)
+    Args:
+        search_tool: tavily_search_amazon or tavily_search_web
+        args: Tool arguments (without search_depth)
+        search_depth: "basic", "advanced" or "adaptive"
+        is_conclusive: Whether results meet the phase's confidence threshold
+        first_pass: Already started first pass (speculative search) to use instead of searching
+        useful_urls: URLs of the results the phase keeps as candidates, used to find weak queries
 
-    results = []
-    for url in urls:
-        try:
-            response = client.extract(
-                urls=[url],
-                extract_depth=extract_depth
+    Returns:
+        Tuple of (text rendering, payload, Tavily credits actually spent: shared and
+        rejected requests are not counted)
+    """
+    if first_pass is None:
+        with meter_search_credits() as meter:
+            text, payload = await invoke_enrichment_tool(
+                search_tool, {**args, "search_depth": first_pass_search_depth(search_depth)}
             )
+        credits = meter.credits
+    else:
+        text, payload = await first_pass
+        credits = first_pass.credits
 
-            for result in response.get("results", []):
-                raw_content = result.get("raw_content", "")
-                results.append({
-                    "url": url,
-                    "content": raw_content[:2000] if raw_content else "No content extracted"
-                })
-
-        except Exception as e:
-            results.append({
-                "url": url,
-                "error": str(e)
-            })
-
-    # Format results
-    formatted = f"Extracted content from {len(results)} URLs:\n\n"
-    for idx, res in enumerate(results, 1):
-        if "error" in res:
-            formatted += f"{idx}. URL: {res['url']} - ERROR: {res['error']}\n\n"
-        else:
-            formatted += f"{idx}. URL: {res['url']}\n"
-            formatted += f"   Content preview: {res['content'][:500]}...\n\n"
-
-    return formatted
+    if search_depth != "adaptive" or payload.error or not args["queries"] or is_conclusive(payload):
+        return text, payload, credits
+
+    escalated = weak_queries(payload, args["queries"], useful_urls)
+    if not escalated:
+        return text, payload, credits
+
+    with meter_search_credits() as meter:
+        _, advanced_payload = await invoke_enrichment_tool(
+            search_tool, {**args, "queries": escalated, "search_depth": "advanced"}
+        )
+    merged = merge_search_payloads(advanced_payload, payload)
+    return format_search_payload(merged, _PHASE_RESULTS_LABELS.get(search_tool.name, "results")), merged, credits + meter.credits
+
+
+# Result labels of the text rendering of each search tool
+_PHASE_RESULTS_LABELS = {
+    "tavily_search_amazon": "results across Amazon sites",
+    "tavily_search_web": "web results",
+}
+
+
+def weak_queries(
+    payload: SearchPayload,
+    queries: List[str],
+    useful_urls: Optional[Callable[[SearchPayload], Iterable[str]]] = None
+) -> List[str]:
+    """
+    Get the queries of a basic pass worth re-running at advanced depth.
+
+    A query is weak when it failed, returned nothing, or (with ``useful_urls``)
+    none of its results is kept as a candidate by the phase. Queries that did
+    produce candidates are not re-run.
+
+    Args:
+        payload: Results of the basic pass
+        queries: Queries of the pass
+        useful_urls: URLs of the results the phase keeps as candidates
+
+    Returns:
+        Weak queries, in input order
+    """
+    useful = {url_key(url) for url in useful_urls(payload) if url} if useful_urls else None
+    hits_by_query: Dict[str, List[SearchHit]] = {}
+    for hit in payload.hits:
+        hits_by_query.setdefault(hit.query, []).append(hit)
+
+    weak = []
+    for query in queries:
+        hits = hits_by_query.get(query, [])
+        if not hits or (useful is not None and not any(hit.url and url_key(hit.url) in useful for hit in hits)):
+            weak.append(query)
+    return weak
+
+
+def first_pass_search_depth(search_depth: str) -> str:
+    """Get the Tavily depth of the first pass of a phase ("basic" in adaptive mode)."""
+    return "basic" if search_depth == "adaptive" else search_depth
 
 
 # =============================================================================
-# HELPER FUNCTIONS
+# PAYLOAD BUILDING AND TEXT RENDERING
 # =============================================================================
 
-def extract_asin_from_url(url: str) -> Optional[str]:
+def _tool_error(message: str, payload_type):
+    """Return the (text, payload) pair of a tool that could not run."""
+    return f"Error: {message}", payload_type(error=message)
+
+
+def _build_search_payload(queries: List[str], responses: List[Any], with_asin: bool) -> SearchPayload:
+    """Map raw Tavily search responses (in query order) to a SearchPayload."""
+    payload = SearchPayload()
+    for query, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            payload.failures.append(QueryFailure(query=query, error=str(response)))
+            continue
+
+        for result in response.get("results", []):
+            url = canonicalize_url(result["url"]) if result.get("url") else ""
+            payload.hits.append(SearchHit(
+                query=query,
+                url=url,
+                title=result.get("title"),
+                content=result.get("content") or "",
+                score=result.get("score") or 0.0,
+                domain=extract_domain_from_url(url),
+                # Extract ASIN if this is an Amazon URL
+                asin=extract_asin_from_url(url) if with_asin else None
+            ))
+    return payload
+
+
+def dedupe_search_hits(hits: List[SearchHit]) -> List[SearchHit]:
     """
-    Extract ASIN from an Amazon URL.
+    Keep the first hit of each source, comparing URLs by identity key.
 
-    Examples:
-        https://www.amazon.fr/dp/B08X123456 → B08X123456
-        https://www.amazon.com/Product/dp/B123456789/ref=... → B123456789
+    ``/dp/X?ref=a`` and ``/gp/product/X`` on the same Amazon storefront are the
+    same product, and a page found by several queries is a single source.
 
     Args:
-        url: Amazon product URL
+        hits: Search hits in priority order
 
     Returns:
-        ASIN string (10 characters) or None if not found
+        Deduplicated hits (input order)
     """
-    if not url:
-        return None
+    seen = set()
+    unique = []
+    for hit in hits:
+        key = url_key(hit.url) if hit.url else None
+        if key is None or key not in seen:
+            seen.add(key)
+            unique.append(hit)
+    return unique
 
-    # Pattern to match ASIN in Amazon URLs
-    # ASIN is always 10 characters, usually after /dp/ or /product/
-    patterns = [
-        r'/dp/([A-Z0-9]{10})',
-        r'/product/([A-Z0-9]{10})',
-        r'/gp/product/([A-Z0-9]{10})'
-    ]
 
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-
-    return None
+def merge_search_payloads(*payloads: SearchPayload) -> SearchPayload:
+    """
+    Merge the results of several passes over the same queries.
 
+    Hits are deduplicated by URL identity key, keeping the first occurrence (pass
+    earlier in ``payloads`` wins). A query only counts as failed if it failed in
+    every pass.
 
-def extract_domain_from_url(url: str) -> Optional[str]:
+    Returns:
+        Merged SearchPayload
+    """
+    merged = SearchPayload()
+    all_hits = [hit for payload in payloads for hit in payload.hits]
+    succeeded = {hit.query for hit in all_hits}
+    merged.hits = dedupe_search_hits(all_hits)
+    failed = {}
+    for payload in payloads:
+        for failure in payload.failures:
+            if failure.query not in succeeded:
+                failed.setdefault(failure.query, failure)
+    merged.failures = list(failed.values())
+    if not merged.hits and all(payload.error for payload in payloads):
+        merged.error = payloads[0].error
+    return merged
+
+
+def format_search_payload(payload: SearchPayload, label: str) -> str:
     """
-    Extract domain from URL.
+    Render a SearchPayload as text for LLM consumption.
 
-    Example:
-        https://www.amazon.fr/dp/B08X123456 → amazon.fr
+    Args:
+        payload: Structured search results
+        label: Description of the results used in the header line
+
+    Returns:
+        Numbered list of results followed by failed queries
+    """
+    if payload.error:
+        return f"Error: {payload.error}"
+
+    lines = [f"Found {len(payload.hits)} {label}:", ""]
+    for idx, hit in enumerate(payload.hits, 1):
+        lines.append(f"{idx}. {hit.title}")
+        lines.append(f"   URL: {hit.url}")
+        if hit.asin:
+            lines.append(f"   ASIN: {hit.asin}")
+        if hit.domain:
+            lines.append(f"   Domain: {hit.domain}")
+        lines.append(f"   Score: {hit.score:.2f}")
+        lines.append(f"   Content: {hit.content[:200]}...")
+        lines.append("")
+    for failure in payload.failures:
+        lines.append(f"Query: {failure.query} - ERROR: {failure.error}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def format_extract_payload(payload: ExtractPayload) -> str:
+    """
+    Render an ExtractPayload as text for LLM consumption.
 
     Args:
-        url: Full URL
+        payload: Structured extraction results
 
     Returns:
-        Domain string or None
+        Numbered list of content previews followed by failed URLs
+    """
+    if payload.error:
+        return f"Error: {payload.error}"
+
+    lines = [f"Extracted content from {len(payload.pages)} URLs:", ""]
+    for idx, page in enumerate(payload.pages, 1):
+        lines.append(f"{idx}. URL: {page.url}")
+        lines.append(f"   Content preview: {page.content[:500]}...")
+        lines.append("")
+    for failure in payload.failures:
+        lines.append(f"URL: {failure.query} - ERROR: {failure.error}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+def extract_asin_from_url(url: str) -> Optional[str]:
+    """
+    Extract ASIN (10-character code) from Amazon URL.
+
+    See ``open_deep_research.url_canonical.extract_asin``.
     """
-    if not url:
-        return None
+    return extract_asin(url)
+
 
-    match = re.search(r'https?://(?:www\.)?([^/]+)', url)
-    if match:
-        return match.group(1)
+def extract_domain_from_url(url: str) -> Optional[str]:
+    """
+    Extract domain from URL (e.g., 'amazon.fr').
 
-    return None
+    See ``open_deep_research.url_canonical.extract_domain``.
+    """
+    return extract_domain(url)
 
 
 def format_article_for_search(article: Dict[str, Any]) -> Dict[str, List[str]]:
@@ -363,6 +822,47 @@ def format_article_for_search(article: Dict[str, Any]) -> Dict[str, List[str]]:
     return queries
 
 
+# Languages searched in each phase, in default priority order, with the number
+# of queries taken from each (None = all)
+AMAZON_QUERY_SLOTS: Dict[str, Optional[int]] = {"universal": None, "english": 2, "french": 1}
+WEB_QUERY_SLOTS: Dict[str, Optional[int]] = {"english": 2, "french": 1, "italian": 1}
+
+
+def select_phase_queries(
+    queries: Dict[str, List[str]],
+    max_amazon_searches: int,
+    max_web_searches: int,
+    priority_amazon_queries: Optional[List[str]] = None,
+    amazon_languages: Optional[List[str]] = None,
+    web_languages: Optional[List[str]] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Pick the Amazon and web phase queries from the language-specific queries.
+
+    Args:
+        queries: Output of format_article_for_search()
+        max_amazon_searches: Maximum number of Amazon queries
+        max_web_searches: Maximum number of web queries
+        priority_amazon_queries: Queries searched first on Amazon (e.g. known ASINs)
+        amazon_languages: Languages of AMAZON_QUERY_SLOTS to use, best first (default: all, in slot order)
+        web_languages: Languages of WEB_QUERY_SLOTS to use, best first (default: all, in slot order)
+
+    Returns:
+        Tuple of (Amazon queries, web queries)
+    """
+    def take(slots: Dict[str, Optional[int]], languages: Optional[List[str]]) -> List[str]:
+        selected = []
+        for language in (languages if languages is not None else slots):
+            selected.extend((queries.get(language) or [])[:slots.get(language)])
+        return selected
+
+    amazon_queries = list(priority_amazon_queries or [])
+    amazon_queries.extend(take(AMAZON_QUERY_SLOTS, amazon_languages))
+    web_queries = take(WEB_QUERY_SLOTS, web_languages)
+
+    return amazon_queries[:max_amazon_searches], web_queries[:max_web_searches]
+
+
 def get_today_str() -> str:
     """Get today's date as a string."""
     from datetime import datetime
@@ -8,6 +8,11 @@ from open_deep_research.utils_logging.logger_config import (
     get_tavily_logger,
 )
 
+from open_deep_research.utils_logging.structured import (
+    log_event,
+    stop_log_pipeline,
+)
+
 from open_deep_research.utils_logging.log_helpers import (
     log_separator,
     log_node_entry,
@@ -31,6 +36,9 @@ __all__ = [
     "get_deep_researcher_logger",
     "get_subgraph_logger",
     "get_tavily_logger",
+    # Structured events
+    "log_event",
+    "stop_log_pipeline",
     # Log helpers
     "log_separator",
     "log_node_entry",
@@ -2,16 +2,19 @@
 
 import logging
 import os
-import sys
 from typing import Optional
 
-# Détection de l'environnement
-IS_LOCAL_DEV = "langgraph dev" in ' '.join(sys.argv) or os.getenv("LANGGRAPH_ENV") == "local"
+from open_deep_research.utils_logging.structured import IS_LOCAL_DEV, get_queue_handler
+
 
 def setup_logger(name: str = "enrichment", level: Optional[str] = None) -> logging.Logger:
     """
     Configure un logger pour l'application d'enrichissement.
 
+    Les records passent par la file partagée du pipeline asynchrone
+    (voir ``structured``) : l'écriture sur la console se fait dans un thread
+    dédié, hors de la boucle asyncio.
+
     Args:
         name: Nom du logger
         level: Niveau de log (DEBUG, INFO, WARNING, ERROR)
@@ -30,28 +33,7 @@ def setup_logger(name: str = "enrichment", level: Optional[str] = None) -> loggi
 
     # Éviter les doublons de handlers
     if not logger.handlers:
-        # Handler console avec format clair et encodage UTF-8
-        handler = logging.StreamHandler()
-
-        # Forcer l'encodage UTF-8
-        if hasattr(handler.stream, 'reconfigure'):
-            handler.stream.reconfigure(encoding='utf-8')
-
-        # Format différent pour local vs production
-        if IS_LOCAL_DEV:
-            # Format simple et lisible pour développement local
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%H:%M:%S'
-            )
-        else:
-            # Format pour production (sera capturé par LangGraph Platform)
-            formatter = logging.Formatter(
-                '%(levelname)s - %(name)s - %(message)s'
-            )
-
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        logger.addHandler(get_queue_handler())
 
     # Réduire le bruit des loggers tiers en local
     if IS_LOCAL_DEV:
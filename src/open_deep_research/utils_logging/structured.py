@@ -0,0 +1,256 @@
+"""Pipeline de logs asynchrone et structuré pour Article Enrichment.
+
+Les loggers configurés par ``setup_logger`` n'écrivent plus directement sur la
+console : chaque record est déposé dans une file en mémoire (``QueueHandler``)
+et un thread unique (``QueueListener``) le formate et l'écrit. Le thread
+appelant (la boucle asyncio des graphs) ne paie que l'ajout dans la file.
+
+- Formatage paresseux : le message (``%``-args) et les champs ne sont mis en
+  forme que dans le thread d'écriture, à partir d'une copie prise à l'émission
+- Événements structurés : ``log_event`` émet un événement par ligne, avec son
+  nom et ses champs, plutôt que des bannières multi-lignes
+- Sortie ``LOG_FORMAT=json`` (une ligne JSON par événement) ou ``text``
+  (``message | clé=valeur ...``) ; par défaut JSON hors terminal
+- Échantillonnage des événements DEBUG à fort volume (``LOG_DEBUG_SAMPLE_RATE``)
+"""
+
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+# Détection de l'environnement
+IS_LOCAL_DEV = "langgraph dev" in ' '.join(sys.argv) or os.getenv("LANGGRAPH_ENV") == "local"
+
+# Longueur maximale d'une valeur de champ en sortie texte
+_TEXT_VALUE_MAX_CHARS = 120
+
+
+# =============================================================================
+# FORMATTERS
+# =============================================================================
+
+def _event_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return getattr(record, "fields", None) or {}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate un record en une ligne JSON : horodatage, niveau, logger, événement, message et champs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Sérialise le record (le message est rendu ici, dans le thread d'écriture)."""
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        event = getattr(record, "event", None)
+        if event:
+            entry["event"] = event
+        entry["message"] = record.getMessage()
+        entry.update(_event_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Formate un record en texte lisible, suivi des champs de l'événement en ``clé=valeur``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Rend le message puis ajoute les champs (valeurs tronquées)."""
+        line = super().format(record)
+        fields = _event_fields(record)
+        if not fields:
+            return line
+        rendered = " ".join(f"{key}={self._render(value)}" for key, value in fields.items())
+        return f"{line} | {rendered}"
+
+    @staticmethod
+    def _render(value: Any) -> str:
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(item) for item in value)
+        text = str(value)
+        if len(text) > _TEXT_VALUE_MAX_CHARS:
+            text = text[:_TEXT_VALUE_MAX_CHARS] + "…"
+        return text
+
+
+def build_formatter(log_format: Optional[str] = None) -> logging.Formatter:
+    """Crée le formatter de sortie.
+
+    Args:
+        log_format: "json" ou "text" (défaut : ``LOG_FORMAT``, sinon texte dans un terminal ou en dev local, JSON ailleurs)
+
+    Returns:
+        Formatter configuré
+    """
+    log_format = (log_format or os.getenv("LOG_FORMAT") or "").lower()
+    if not log_format:
+        log_format = "text" if IS_LOCAL_DEV or sys.stderr.isatty() else "json"
+    if log_format == "json":
+        return JsonFormatter()
+    if IS_LOCAL_DEV:
+        # Format simple et lisible pour développement local
+        return KeyValueFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+    return KeyValueFormatter('%(levelname)s - %(name)s - %(message)s')
+
+
+# =============================================================================
+# SAMPLING
+# =============================================================================
+
+class DebugSamplingFilter(logging.Filter):
+    """Ne garde qu'une fraction des records DEBUG, par nom d'événement.
+
+    Le premier record de chaque événement est toujours gardé, puis un sur
+    ``1 / rate``. Les records gardés portent le champ ``sample_rate`` pour que
+    les comptages puissent être extrapolés. Les niveaux INFO et plus ne sont
+    jamais échantillonnés.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        """Crée le filtre pour une fraction ``rate`` des records DEBUG (bornée à [0, 1])."""
+        super().__init__()
+        self.rate = min(max(rate, 0.0), 1.0)
+        self._every = round(1 / self.rate) if self.rate > 0 else 0
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Décide si le record est transmis à la file."""
+        if record.levelno > logging.DEBUG or self._every == 1:
+            return True
+        if self._every == 0:
+            return False
+        key = getattr(record, "event", None) or f"{record.name}:{record.msg}"
+        with self._lock:
+            count = self._counts[key]
+            self._counts[key] = count + 1
+        if count % self._every:
+            return False
+        fields = getattr(record, "fields", None)
+        if fields is not None:
+            fields["sample_rate"] = self.rate
+        return True
+
+
+# =============================================================================
+# QUEUE PIPELINE
+# =============================================================================
+
+def _snapshot(value: Any) -> Any:
+    """Fige le contenu des conteneurs mutables (copie superficielle) au moment de l'émission."""
+    if isinstance(value, (list, dict, set)):
+        return copy.copy(value)
+    return value
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui dépose le record sans le formater : le formatage se fait dans le thread d'écriture.
+
+    ``QueueHandler.prepare`` formate le message avant de l'ajouter à la file
+    (pour pouvoir le transmettre à un autre processus). La file étant en
+    mémoire, ce travail est laissé au ``QueueListener`` ; seuls les ``args`` du
+    message et les champs de l'événement sont copiés à l'ajout, pour qu'un objet
+    modifié par l'appelant après le log ne change pas la ligne écrite.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Retourne une copie du record dont les args et les champs sont figés, sans la formater."""
+        record = copy.copy(record)
+        if isinstance(record.args, dict):
+            record.args = {key: _snapshot(value) for key, value in record.args.items()}
+        elif record.args:
+            record.args = tuple(_snapshot(value) for value in record.args)
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = {key: _snapshot(value) for key, value in fields.items()}
+        return record
+
+
+_pipeline_lock = threading.Lock()
+_queue_handler: Optional[LazyQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stream_handler() -> logging.StreamHandler:
+    handler = logging.StreamHandler()
+    # Forcer l'encodage UTF-8
+    if hasattr(handler.stream, 'reconfigure'):
+        handler.stream.reconfigure(encoding='utf-8')
+    handler.setFormatter(build_formatter())
+    return handler
+
+
+def get_queue_handler() -> LazyQueueHandler:
+    """Obtient le handler partagé par tous les loggers d'enrichissement.
+
+    Le premier appel crée la file et démarre le thread d'écriture, arrêté
+    (après vidage de la file) à la sortie du processus.
+
+    Returns:
+        QueueHandler à attacher aux loggers
+    """
+    global _queue_handler, _listener
+    with _pipeline_lock:
+        if _queue_handler is None:
+            log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+            _queue_handler = LazyQueueHandler(log_queue)
+            _queue_handler.addFilter(DebugSamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))))
+            _listener = logging.handlers.QueueListener(log_queue, _stream_handler(), respect_handler_level=True)
+            _listener.start()
+            atexit.register(stop_log_pipeline)
+        return _queue_handler
+
+
+def stop_log_pipeline():
+    """Vide la file de logs et arrête le thread d'écriture (idempotent, appelé à la sortie du processus)."""
+    global _listener
+    with _pipeline_lock:
+        if _listener is not None:
+            _listener.stop()
+        _listener = None
+
+
+# =============================================================================
+# STRUCTURED EVENTS
+# =============================================================================
+
+def log_event(
+    logger: logging.Logger,
+    event: str,
+    message: str,
+    *args: Any,
+    level: int = logging.INFO,
+    **fields: Any
+):
+    """Émet un événement structuré : une seule ligne, un nom d'événement et des champs.
+
+    Rien n'est calculé si le niveau est désactivé, et le message n'est formaté
+    (``message % args``) que dans le thread d'écriture. Les champs à ``None``
+    sont omis.
+
+    Example:
+        log_event(logger, "node_exit", "✅ [NODE_EXIT] %s", "deep_researcher", node="deep_researcher", next="web_subgraph")
+
+    Args:
+        logger: Logger cible
+        event: Nom stable de l'événement (``node_entry``, ``search_phase``...)
+        message: Message lisible, avec des ``%`` placeholders
+        *args: Arguments du message
+        level: Niveau de log
+        **fields: Champs de l'événement
+    """
+    if not logger.isEnabledFor(level):
+        return
+    fields = {key: value for key, value in fields.items() if value is not None}
+    logger.log(level, message, *args, extra={"event": event, "fields": fields}, stacklevel=2)
@@ -0,0 +1,580 @@
+"""Webhook ingestion queue in front of the enrichment graph.
+
+Optimia_v2 pushes article webhooks in bursts and retries them on timeouts.
+Instead of starting a graph run per webhook, payloads are written to a durable
+SQLite queue and enriched by a bounded pool of workers:
+
+- Idempotence: a webhook whose ident and payload hash match a pending, running
+  or recently enriched job is acknowledged without being queued again
+- Coalescing: a new payload for an ident that is still waiting replaces the
+  queued payload, keeping its place in the queue
+- Backpressure: above ``max_depth`` pending jobs, webhooks are rejected with a
+  retry delay derived from the current throughput (HTTP 429 + Retry-After)
+- Metrics: queue depth, oldest pending age, wait and processing latency
+  percentiles, throughput and enqueue outcome counters
+
+Jobs left running by a crashed worker are queued again on the next start.
+Articles unchanged since a still-fresh result are answered with the stored
+report instead of a new graph run (see ``results_store``).
+
+Usage:
+    python -m open_deep_research.webhook_queue enqueue webhooks.jsonl --db queue.sqlite
+    python -m open_deep_research.webhook_queue work --db queue.sqlite --output reports.jsonl --concurrency 4
+    python -m open_deep_research.webhook_queue metrics --db queue.sqlite
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional
+
+from open_deep_research.batch_enrichment import (
+    TavilyCreditCounter,
+    build_enrichment_report,
+    iter_input_rows,
+    row_to_article,
+)
+from open_deep_research.configuration_enrichment import EnrichmentConfiguration
+from open_deep_research.metrics import write_metrics_file
+from open_deep_research.results_store import lookup_result, record_result
+from open_deep_research.state_enrichment import (
+    EnrichmentReport,
+    create_initial_enrichment_state,
+)
+from open_deep_research.utils_logging import setup_logger
+
+logger = setup_logger("webhook_queue")
+
+
+# =============================================================================
+# QUEUE
+# =============================================================================
+
+EnqueueStatus = Literal["accepted", "coalesced", "duplicate", "rejected", "invalid"]
+
+# Retry delay suggested to rejected senders while no throughput is known yet
+DEFAULT_RETRY_AFTER_SECONDS = 30
+
+
+@dataclass
+class EnqueueResult:
+    """Outcome of a webhook submission."""
+
+    status: EnqueueStatus
+    ident: Optional[str] = None
+    job_id: Optional[int] = None
+    queue_depth: int = 0
+    retry_after_seconds: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def http_status(self) -> int:
+        """HTTP status to answer the webhook with."""
+        return {"accepted": 202, "coalesced": 202, "duplicate": 200, "rejected": 429, "invalid": 400}[self.status]
+
+
+@dataclass
+class QueueJob:
+    """Job claimed by a worker."""
+
+    id: int
+    ident: str
+    payload: Dict[str, Any]
+    attempts: int
+    enqueued_at: float
+
+
+def payload_hash(payload: Dict[str, Any]) -> str:
+    """Hash a webhook payload independently of its key order."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(fraction * len(values)))], 3)
+
+
+class WebhookQueue:
+    """Durable SQLite queue of article webhooks, deduplicated by ident + payload hash.
+
+    Connections are opened per call so the queue can be shared by an HTTP
+    front end (threads or processes) and the workers.
+    """
+
+    def __init__(self, path: str, max_depth: int = 10000, dedupe_window_hours: float = 24.0):
+        """Open (or create) the queue database.
+
+        Args:
+            path: SQLite file of the queue
+            max_depth: Pending jobs above which new webhooks are rejected
+            dedupe_window_hours: Hours an enriched payload is recognized as a duplicate
+        """
+        self.path = path
+        self.max_depth = max_depth
+        self.dedupe_window_hours = dedupe_window_hours
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS webhook_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ident TEXT NOT NULL,
+                    payload_hash TEXT NOT NULL,
+                    payload_json TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    coalesced INTEGER NOT NULL DEFAULT 0,
+                    enqueued_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    enrichment_type TEXT,
+                    error TEXT
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS webhook_jobs_one_pending
+                    ON webhook_jobs (ident) WHERE status = 'pending';
+                CREATE INDEX IF NOT EXISTS webhook_jobs_ident ON webhook_jobs (ident, payload_hash);
+                CREATE INDEX IF NOT EXISTS webhook_jobs_status ON webhook_jobs (status, enqueued_at);
+                CREATE TABLE IF NOT EXISTS webhook_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # isolation_level=None: transactions are opened explicitly (BEGIN IMMEDIATE)
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    # -------------------------------------------------------------------------
+    # Producer side
+    # -------------------------------------------------------------------------
+
+    def enqueue(self, payload: Dict[str, Any]) -> EnqueueResult:
+        """Queue a webhook payload.
+
+        Args:
+            payload: Article payload (enrichment or Optimia_v2 field names)
+
+        Returns:
+            EnqueueResult; ``http_status`` gives the answer for the sender
+        """
+        try:
+            ident = row_to_article(payload).article_id
+        except Exception as e:
+            self._count("invalid")
+            return EnqueueResult(status="invalid", error=str(e).splitlines()[0])
+
+        digest = payload_hash(payload)
+        now = time.time()
+        with self._transaction() as connection:
+            depth = connection.execute("SELECT COUNT(*) FROM webhook_jobs WHERE status = 'pending'").fetchone()[0]
+
+            # Same payload already queued, in progress or recently enriched: acknowledge only
+            duplicate = connection.execute(
+                """
+                SELECT id FROM webhook_jobs
+                WHERE ident = ? AND payload_hash = ?
+                AND (status IN ('pending', 'running') OR (status = 'done' AND finished_at >= ?))
+                ORDER BY id DESC LIMIT 1
+                """,
+                (ident, digest, now - self.dedupe_window_hours * 3600),
+            ).fetchone()
+            if duplicate:
+                result = EnqueueResult(status="duplicate", ident=ident, job_id=duplicate[0], queue_depth=depth)
+            else:
+                # Newer payload for an ident still waiting: replace it in place
+                pending = connection.execute(
+                    "SELECT id FROM webhook_jobs WHERE ident = ? AND status = 'pending'",
+                    (ident,),
+                ).fetchone()
+                if pending:
+                    connection.execute(
+                        "UPDATE webhook_jobs SET payload_hash = ?, payload_json = ?, coalesced = coalesced + 1 WHERE id = ?",
+                        (digest, json.dumps(payload, ensure_ascii=False, default=str), pending[0]),
+                    )
+                    result = EnqueueResult(status="coalesced", ident=ident, job_id=pending[0], queue_depth=depth)
+                elif depth >= self.max_depth:
+                    result = EnqueueResult(
+                        status="rejected",
+                        ident=ident,
+                        queue_depth=depth,
+                        retry_after_seconds=self._retry_after(connection, depth - self.max_depth + 1, now),
+                    )
+                else:
+                    cursor = connection.execute(
+                        "INSERT INTO webhook_jobs (ident, payload_hash, payload_json, status, enqueued_at) "
+                        "VALUES (?, ?, ?, 'pending', ?)",
+                        (ident, digest, json.dumps(payload, ensure_ascii=False, default=str), now),
+                    )
+                    result = EnqueueResult(status="accepted", ident=ident, job_id=cursor.lastrowid, queue_depth=depth + 1)
+            self._count(result.status, connection)
+        return result
+
+    def _retry_after(self, connection: sqlite3.Connection, excess: int, now: float) -> int:
+        finished = connection.execute(
+            "SELECT COUNT(*) FROM webhook_jobs WHERE status IN ('done', 'failed') AND finished_at >= ?",
+            (now - 300,),
+        ).fetchone()[0]
+        if not finished:
+            return DEFAULT_RETRY_AFTER_SECONDS
+        # Time for the workers to drain the excess at the last 5 minutes' pace
+        return max(1, math.ceil(excess / (finished / 300)))
+
+    def _count(self, name: str, connection: Optional[sqlite3.Connection] = None):
+        statement = (
+            "INSERT INTO webhook_counters VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1"
+        )
+        if connection is not None:
+            connection.execute(statement, (name,))
+            return
+        with self._transaction() as own_connection:
+            own_connection.execute(statement, (name,))
+
+    # -------------------------------------------------------------------------
+    # Worker side
+    # -------------------------------------------------------------------------
+
+    def recover(self) -> int:
+        """Queue again the jobs left running by a worker that stopped.
+
+        Jobs for an ident that has a newer pending job are dropped instead.
+
+        Returns:
+            Number of jobs queued again
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                """
+                UPDATE webhook_jobs SET status = 'superseded', finished_at = ?
+                WHERE status = 'running'
+                AND ident IN (SELECT ident FROM webhook_jobs WHERE status = 'pending')
+                """,
+                (time.time(),),
+            )
+            cursor = connection.execute(
+                "UPDATE webhook_jobs SET status = 'pending', started_at = NULL WHERE status = 'running'"
+            )
+            return cursor.rowcount
+
+    def claim(self) -> Optional[QueueJob]:
+        """Take the oldest pending job whose ident is not already being enriched.
+
+        Returns:
+            The claimed job, or None if no job is ready
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                """
+                SELECT id, ident, payload_json, attempts, enqueued_at FROM webhook_jobs AS job
+                WHERE status = 'pending' AND NOT EXISTS (
+                    SELECT 1 FROM webhook_jobs AS other WHERE other.ident = job.ident AND other.status = 'running'
+                )
+                ORDER BY enqueued_at LIMIT 1
+                """
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, ident, payload_json, attempts, enqueued_at = row
+            connection.execute(
+                "UPDATE webhook_jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (time.time(), job_id),
+            )
+        return QueueJob(id=job_id, ident=ident, payload=json.loads(payload_json), attempts=attempts + 1, enqueued_at=enqueued_at)
+
+    def complete(self, job: QueueJob, enrichment_type: Optional[str]):
+        """Mark a job as enriched."""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE webhook_jobs SET status = 'done', finished_at = ?, enrichment_type = ?, error = NULL WHERE id = ?",
+                (time.time(), enrichment_type, job.id),
+            )
+
+    def fail(self, job: QueueJob, error: str, max_attempts: int):
+        """Queue a failed job again, or mark it as failed once ``max_attempts`` is reached."""
+        with self._transaction() as connection:
+            retry = job.attempts < max_attempts and not connection.execute(
+                "SELECT 1 FROM webhook_jobs WHERE ident = ? AND status = 'pending'",
+                (job.ident,),
+            ).fetchone()
+            connection.execute(
+                "UPDATE webhook_jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                ("pending" if retry else "failed", None if retry else time.time(), error, job.id),
+            )
+
+    def purge(self, max_age_hours: float) -> int:
+        """Delete finished jobs older than ``max_age_hours``.
+
+        Returns:
+            Number of deleted jobs
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                "DELETE FROM webhook_jobs WHERE status IN ('done', 'failed', 'superseded') AND finished_at < ?",
+                (time.time() - max_age_hours * 3600,),
+            )
+            return cursor.rowcount
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+
+    def depth(self) -> int:
+        """Count the pending jobs."""
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM webhook_jobs WHERE status = 'pending'").fetchone()[0]
+
+    def metrics(self, window: int = 1000) -> Dict[str, Any]:
+        """Get queue depth, latency and throughput metrics.
+
+        Args:
+            window: Number of most recently finished jobs used for the latency percentiles
+
+        Returns:
+            Metrics dictionary (latencies in seconds)
+        """
+        now = time.time()
+        with self._connect() as connection:
+            statuses = dict(connection.execute("SELECT status, COUNT(*) FROM webhook_jobs GROUP BY status").fetchall())
+            oldest = connection.execute(
+                "SELECT MIN(enqueued_at) FROM webhook_jobs WHERE status = 'pending'"
+            ).fetchone()[0]
+            recent = connection.execute(
+                """
+                SELECT started_at - enqueued_at, finished_at - started_at FROM webhook_jobs
+                WHERE status = 'done' ORDER BY finished_at DESC LIMIT ?
+                """,
+                (window,),
+            ).fetchall()
+            finished_5min = connection.execute(
+                "SELECT COUNT(*) FROM webhook_jobs WHERE status IN ('done', 'failed') AND finished_at >= ?",
+                (now - 300,),
+            ).fetchone()[0]
+            counters = dict(connection.execute("SELECT name, value FROM webhook_counters").fetchall())
+
+        waits = [wait for wait, _ in recent if wait is not None]
+        durations = [duration for _, duration in recent if duration is not None]
+        return {
+            "queue_depth": statuses.get("pending", 0),
+            "running": statuses.get("running", 0),
+            "done": statuses.get("done", 0),
+            "failed": statuses.get("failed", 0),
+            "oldest_pending_seconds": round(now - oldest, 1) if oldest else 0.0,
+            "wait_p50_seconds": _percentile(waits, 0.5),
+            "wait_p95_seconds": _percentile(waits, 0.95),
+            "processing_p50_seconds": _percentile(durations, 0.5),
+            "processing_p95_seconds": _percentile(durations, 0.95),
+            "throughput_per_min": round(finished_5min / 5, 2),
+            "saturation": round(statuses.get("pending", 0) / self.max_depth, 3) if self.max_depth else 0.0,
+            "webhooks": counters,
+        }
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+class WebhookWorkerPool:
+    """Enrich queued webhooks with a fixed number of concurrent graph runs."""
+
+    def __init__(
+        self,
+        queue: WebhookQueue,
+        graph=None,
+        concurrency: int = 4,
+        config: Optional[Dict[str, Any]] = None,
+        on_report: Optional[Callable[[EnrichmentReport], None]] = None,
+        max_attempts: int = 3,
+        poll_interval: float = 0.5,
+        metrics_every: float = 60.0,
+        metrics_path: Optional[str] = None
+    ):
+        """Create a pool; workers start with ``run()``.
+
+        Args:
+            queue: Queue to consume
+            graph: Compiled enrichment graph (default: article_enrichment_graph)
+            concurrency: Number of articles enriched at the same time
+            config: Extra RunnableConfig passed to every graph run
+            on_report: Called with the EnrichmentReport of each enriched article
+            max_attempts: Runs of a job before it is marked as failed
+            poll_interval: Seconds an idle worker waits before polling the queue again
+            metrics_every: Seconds between two metrics log lines (0 to disable)
+            metrics_path: Prometheus textfile rewritten with each metrics log line (see ``metrics``)
+        """
+        if graph is None:
+            from open_deep_research.article_enrichment_graph import enrichment_graph
+            graph = enrichment_graph
+        self.queue = queue
+        self.graph = graph
+        self.concurrency = max(1, concurrency)
+        self.config = config or {}
+        self.on_report = on_report
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.metrics_every = metrics_every
+        self.metrics_path = metrics_path
+        self.enrichment_config = EnrichmentConfiguration()
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Let the workers finish their current article and exit."""
+        self._stopping.set()
+
+    async def run(self, stop_when_empty: bool = False):
+        """Run the workers until ``stop()`` is called.
+
+        Args:
+            stop_when_empty: Exit once the queue is drained instead of waiting for new webhooks
+        """
+        recovered = await asyncio.to_thread(self.queue.recover)
+        if recovered:
+            logger.info(f"♻️  [QUEUE] {recovered} job(s) interrompu(s) remis en file")
+
+        idle = [False] * self.concurrency
+        reporter = asyncio.create_task(self._report_metrics()) if self.metrics_every else None
+        try:
+            await asyncio.gather(*(self._work(index, idle, stop_when_empty) for index in range(self.concurrency)))
+        finally:
+            if reporter:
+                reporter.cancel()
+        write_metrics_file(self.metrics_path)
+        logger.info(f"✅ [QUEUE] Workers arrêtés | {self.queue.metrics()}")
+
+    async def _work(self, index: int, idle: List[bool], stop_when_empty: bool):
+        while not self._stopping.is_set():
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                idle[index] = True
+                if stop_when_empty and all(idle):
+                    return
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                continue
+            idle[index] = False
+            await self._process(job)
+
+    async def _process(self, job: QueueJob):
+        counter = TavilyCreditCounter()
+        run_config = {**self.config, "callbacks": [*self.config.get("callbacks", []), counter]}
+        start = time.monotonic()
+        try:
+            article = row_to_article(job.payload)
+            stored = await lookup_result(article, self.enrichment_config)
+            if stored.needs_enrichment:
+                final_state = await self.graph.ainvoke(create_initial_enrichment_state(article), run_config)
+                report = build_enrichment_report(article, final_state, time.monotonic() - start, counter.credits)
+                await record_result(article, report, self.enrichment_config)
+            else:
+                report = stored.report
+                logger.info(f"🔁 [QUEUE] {job.ident} inchangé, rapport réutilisé (enrichi il y a {stored.age_hours:.1f}h)")
+            if self.on_report:
+                self.on_report(report)
+            await asyncio.to_thread(self.queue.complete, job, report.enrichment_type)
+        except Exception as e:
+            await asyncio.to_thread(self.queue.fail, job, str(e), self.max_attempts)
+            logger.error(f"❌ [QUEUE] {job.ident} (tentative {job.attempts}/{self.max_attempts}): {e}")
+
+    async def _report_metrics(self):
+        while True:
+            await asyncio.sleep(self.metrics_every)
+            metrics = await asyncio.to_thread(self.queue.metrics)
+            await asyncio.to_thread(write_metrics_file, self.metrics_path)
+            logger.info(
+                f"📊 [QUEUE] profondeur={metrics['queue_depth']} en cours={metrics['running']} | "
+                f"attente p95={metrics['wait_p95_seconds']}s | traitement p95={metrics['processing_p95_seconds']}s | "
+                f"{metrics['throughput_per_min']} articles/min"
+            )
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def _write_json(data: Dict[str, Any]):
+    # Command results go to stdout as JSON; logs stay on stderr
+    sys.stdout.write(json.dumps(data, indent=2) + "\n")
+
+
+def main(argv=None) -> int:
+    """Enqueue webhooks, run workers or print queue metrics from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["enqueue", "work", "metrics"])
+    parser.add_argument("input", nargs="?", help="JSONL or CSV file of webhook payloads (enqueue)")
+    parser.add_argument("--db", default=os.getenv("ENRICHMENT_QUEUE_PATH", "webhook_queue.sqlite"), help="SQLite queue file")
+    parser.add_argument("--max-depth", type=int, default=10000, help="Pending jobs above which webhooks are rejected")
+    parser.add_argument("--output", help="JSONL file to append EnrichmentReports to (work)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Articles enriched concurrently (work)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Runs of a job before it is marked as failed (work)")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty (work)")
+    parser.add_argument("--metrics-file", help="Prometheus textfile to write the enrichment metrics to (work)")
+    args = parser.parse_args(argv)
+
+    queue = WebhookQueue(args.db, max_depth=args.max_depth)
+
+    if args.command == "enqueue":
+        if not args.input:
+            parser.error("enqueue requires an input file")
+        outcomes: Dict[str, int] = {}
+        for row in iter_input_rows(args.input):
+            status = queue.enqueue(row).status
+            outcomes[status] = outcomes.get(status, 0) + 1
+        _write_json(outcomes)
+        return 0
+
+    if args.command == "metrics":
+        _write_json(queue.metrics())
+        return 0
+
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+
+    def write_report(report: EnrichmentReport):
+        if output:
+            output.write(report.model_dump_json() + "\n")
+            output.flush()
+
+    pool = WebhookWorkerPool(
+        queue, concurrency=args.concurrency, on_report=write_report, max_attempts=args.max_attempts,
+        metrics_path=args.metrics_file,
+    )
+    try:
+        asyncio.run(pool.run(stop_when_empty=args.drain))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output:
+            output.close()
+    _write_json(queue.metrics())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,493 @@
+"""Learned search yield priors for Article Enrichment.
+
+Some query languages and Amazon domains almost never produce a confident match
+for a given product family or brand (Italian queries for a German brand,
+amazon.co.uk for a French-only supplier). This module keeps a SQLite store of
+how often each query language and Amazon domain contributed to a confident
+routing decision, per (family, brand), and uses it to plan the next searches:
+
+- query languages tried often enough are ordered by expected yield before the
+  per-phase query limits are applied, so the best languages get the credits;
+  the others keep their default position until they have been observed
+- languages and domains whose expected yield is below a floor are pruned, and so
+  are languages pushed past the query limits by the new order
+- an exploration rate keeps a share of pruned items in the plan, so the
+  estimates keep learning
+
+Expected yields are smoothed hit rates: the (family, brand) rate is shrunk
+towards the mean of the family-wide and brand-wide rates, which are shrunk
+towards the global rate of the item. New brands therefore inherit what is
+known about their family and about the item in general.
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from open_deep_research.configuration_enrichment import EnrichmentConfiguration
+from open_deep_research.state_enrichment import (
+    ArticlePayload,
+    RoutingDecision,
+    SearchPayload,
+)
+from open_deep_research.utils_enrichment import (
+    AMAZON_DOMAINS,
+    AMAZON_QUERY_SLOTS,
+    WEB_QUERY_SLOTS,
+    select_phase_queries,
+)
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+# Statistic kinds tracked per (family, brand)
+AMAZON_LANGUAGE = "amazon_language"
+WEB_LANGUAGE = "web_language"
+AMAZON_DOMAIN = "amazon_domain"
+
+# Wildcard used for the family-wide, brand-wide and global aggregates
+ANY = "*"
+
+
+def _segment(value: Optional[str]) -> str:
+    value = " ".join((value or "").casefold().split())
+    return value or "?"
+
+
+# =============================================================================
+# SEARCH PLAN
+# =============================================================================
+
+@dataclass
+class SearchPlan:
+    """Queries and Amazon domains chosen for an article, with what is needed to learn from the outcome."""
+
+    article_id: str
+    family: str
+    brand: str
+    amazon_queries: List[str]
+    web_queries: List[str]
+    amazon_domains: List[str]
+    query_languages: Dict[str, str] = field(default_factory=dict)
+    pruned: List[str] = field(default_factory=list)
+    explored: List[str] = field(default_factory=list)
+
+    def languages(self, queries: Iterable[str]) -> Dict[str, List[str]]:
+        """Group queries by the language they were built in (queries of unknown language are left out)."""
+        grouped: Dict[str, List[str]] = {}
+        for query in queries:
+            language = self.query_languages.get(query)
+            if language:
+                grouped.setdefault(language, []).append(query)
+        return grouped
+
+
+def _query_languages(
+    queries: Dict[str, List[str]],
+    amazon_languages: Iterable[str] = AMAZON_QUERY_SLOTS,
+    web_languages: Iterable[str] = WEB_QUERY_SLOTS
+) -> Dict[str, str]:
+    # A query built identically in several languages ("<brand> <model> amazon") is
+    # credited to the first language whose slots select it, as select_phase_queries does
+    languages = {}
+    for slots, phase_languages in ((AMAZON_QUERY_SLOTS, amazon_languages), (WEB_QUERY_SLOTS, web_languages)):
+        for language in phase_languages:
+            for query in (queries.get(language) or [])[:slots.get(language)]:
+                languages.setdefault(query, language)
+    return languages
+
+
+def default_search_plan(
+    article: ArticlePayload,
+    queries: Dict[str, List[str]],
+    config: EnrichmentConfiguration,
+    priority_amazon_queries: Optional[List[str]] = None
+) -> SearchPlan:
+    """Plan the searches of an article without priors (default language order, every domain)."""
+    amazon_queries, web_queries = select_phase_queries(
+        queries,
+        config.max_amazon_searches,
+        config.max_web_searches,
+        priority_amazon_queries=priority_amazon_queries
+    )
+    return SearchPlan(
+        article_id=article.article_id,
+        family=_segment(article.famille_produit),
+        brand=_segment(article.marque),
+        amazon_queries=amazon_queries,
+        web_queries=web_queries,
+        amazon_domains=list(config.amazon_domains.domains or AMAZON_DOMAINS),
+        query_languages=_query_languages(queries),
+    )
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class YieldPriors:
+    """SQLite-backed hit counts of query languages and Amazon domains per (family, brand).
+
+    Each outcome is counted under (family, brand) and under the family-wide,
+    brand-wide and global aggregates, so a lookup is four point reads.
+    Connections are opened per call so the store can be used from worker threads.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the statistics database at ``path``."""
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS yield_stats (
+                    kind TEXT NOT NULL,
+                    family TEXT NOT NULL,
+                    brand TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    hits INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (kind, family, brand, value)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:  # commits on success, rolls back on error
+                yield connection
+        finally:
+            connection.close()
+
+    # -------------------------------------------------------------------------
+    # Estimates
+    # -------------------------------------------------------------------------
+
+    def expected_yields(
+        self,
+        kind: str,
+        family: str,
+        brand: str,
+        values: List[str],
+        config: EnrichmentConfiguration
+    ) -> Dict[str, Tuple[float, int]]:
+        """Estimate the probability that each item contributes to a confident decision.
+
+        Args:
+            kind: Statistic kind (AMAZON_LANGUAGE, WEB_LANGUAGE or AMAZON_DOMAIN)
+            family: Normalized product family
+            brand: Normalized brand
+            values: Languages or domains to estimate
+            config: Enrichment configuration (prior strength)
+
+        Returns:
+            Mapping of item to (expected yield, global number of attempts)
+        """
+        counts: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+        if values:
+            with self._connect() as connection:
+                rows = connection.execute(
+                    f"""
+                    SELECT family, brand, value, attempts, hits FROM yield_stats
+                    WHERE kind = ? AND family IN (?, ?) AND brand IN (?, ?)
+                    AND value IN ({", ".join("?" * len(values))})
+                    """,
+                    (kind, family, ANY, brand, ANY, *values),
+                ).fetchall()
+            counts = {(row_family, row_brand, value): (attempts, hits) for row_family, row_brand, value, attempts, hits in rows}
+
+        strength = config.yield_priors_strength
+
+        def shrink(key: Tuple[str, str, str], prior: float) -> float:
+            attempts, hits = counts.get(key, (0, 0))
+            return (hits + strength * prior) / (attempts + strength)
+
+        estimates = {}
+        for value in values:
+            # Global rate with a uniform Beta(1, 1) prior
+            global_attempts, global_hits = counts.get((ANY, ANY, value), (0, 0))
+            global_rate = (global_hits + 1) / (global_attempts + 2)
+            parent = (shrink((family, ANY, value), global_rate) + shrink((ANY, brand, value), global_rate)) / 2
+            estimates[value] = (shrink((family, brand, value), parent), global_attempts)
+        return estimates
+
+    def rank(
+        self,
+        kind: str,
+        plan: SearchPlan,
+        values: List[str],
+        config: EnrichmentConfiguration
+    ) -> List[str]:
+        """Order items by expected yield and drop the low-yield ones.
+
+        Only items tried ``yield_priors_min_observations`` times overall are
+        reordered, among the positions they hold in the default order; the others
+        keep their default position, so a cold store leaves the default order
+        unchanged and a couple of misses cannot push an item out. An observed item
+        whose expected yield is below ``yield_priors_min_yield`` is pruned, unless
+        it is picked for exploration. The first item is always kept.
+
+        Args:
+            kind: Statistic kind
+            plan: Search plan being built (pruned and explored items are recorded on it)
+            values: Candidate languages or domains, in default order
+            config: Enrichment configuration
+
+        Returns:
+            Kept items, best first
+        """
+        estimates = self.expected_yields(kind, plan.family, plan.brand, values, config)
+
+        def observed(value: str) -> bool:
+            return estimates[value][1] >= config.yield_priors_min_observations
+
+        by_yield = iter(sorted(filter(observed, values), key=lambda value: -estimates[value][0]))
+        ordered = [next(by_yield) if observed(value) else value for value in values]
+
+        kept = []
+        for position, value in enumerate(ordered):
+            expected, attempts = estimates[value]
+            low_yield = observed(value) and expected < config.yield_priors_min_yield
+            if position == 0 or not low_yield:
+                kept.append(value)
+            elif _explore(plan.article_id, kind, value, config.yield_priors_exploration_rate):
+                kept.append(value)
+                plan.explored.append(f"{kind}:{value}")
+            else:
+                plan.pruned.append(f"{kind}:{value}")
+        return kept
+
+    def keep_displaced(
+        self,
+        kind: str,
+        plan: SearchPlan,
+        ranked: List[str],
+        default_languages: Iterable[str],
+        selected_languages: Iterable[str],
+        config: EnrichmentConfiguration
+    ) -> List[str]:
+        """Apply exploration to languages pushed past the query limits by the ranking.
+
+        A language selected in the default plan whose queries no longer fit under
+        ``max_amazon_searches`` / ``max_web_searches`` is pruned like a low-yield
+        one: it is recorded in ``plan.pruned``, or moved right after the first
+        language when it is picked for exploration.
+
+        Args:
+            kind: Statistic kind (AMAZON_LANGUAGE or WEB_LANGUAGE)
+            plan: Search plan being built (pruned and explored items are recorded on it)
+            ranked: Output of rank(), best first
+            default_languages: Languages that had queries in the default plan
+            selected_languages: Languages that have queries in the ranked plan
+            config: Enrichment configuration
+
+        Returns:
+            Language order to select the queries with
+        """
+        selected = set(selected_languages)
+        displaced = [language for language in ranked if language in set(default_languages) - selected]
+        explored = []
+        for language in displaced:
+            if _explore(plan.article_id, f"{kind}:truncated", language, config.yield_priors_exploration_rate):
+                explored.append(language)
+                plan.explored.append(f"{kind}:{language}")
+            else:
+                plan.pruned.append(f"{kind}:{language}")
+        if not explored:
+            return ranked
+        return ranked[:1] + explored + [language for language in ranked[1:] if language not in explored]
+
+    def plan(
+        self,
+        article: ArticlePayload,
+        queries: Dict[str, List[str]],
+        config: EnrichmentConfiguration,
+        priority_amazon_queries: Optional[List[str]] = None
+    ) -> SearchPlan:
+        """Choose the queries and Amazon domains of an article by expected yield.
+
+        Args:
+            article: Article to enrich
+            queries: Output of format_article_for_search()
+            config: Enrichment configuration (query limits and prior settings)
+            priority_amazon_queries: Queries searched first on Amazon (e.g. known ASINs)
+
+        Returns:
+            SearchPlan to execute and later pass to record()
+        """
+        plan = default_search_plan(article, queries, config, priority_amazon_queries)
+
+        def available(slots: Dict[str, Optional[int]]) -> List[str]:
+            return [language for language in slots if queries.get(language)]
+
+        def select(amazon_languages: List[str], web_languages: List[str]):
+            plan.amazon_queries, plan.web_queries = select_phase_queries(
+                queries,
+                config.max_amazon_searches,
+                config.max_web_searches,
+                priority_amazon_queries=priority_amazon_queries,
+                amazon_languages=amazon_languages,
+                web_languages=web_languages
+            )
+            plan.query_languages = _query_languages(queries, amazon_languages, web_languages)
+            return plan.languages(plan.amazon_queries), plan.languages(plan.web_queries)
+
+        default_amazon, default_web = plan.languages(plan.amazon_queries), plan.languages(plan.web_queries)
+        amazon_languages = self.rank(AMAZON_LANGUAGE, plan, available(AMAZON_QUERY_SLOTS), config)
+        web_languages = self.rank(WEB_LANGUAGE, plan, available(WEB_QUERY_SLOTS), config)
+        ranked_amazon, ranked_web = select(amazon_languages, web_languages)
+
+        # Languages pushed out by the query limits are pruned (or explored) like low-yield ones
+        amazon_order = self.keep_displaced(AMAZON_LANGUAGE, plan, amazon_languages, default_amazon, ranked_amazon, config)
+        web_order = self.keep_displaced(WEB_LANGUAGE, plan, web_languages, default_web, ranked_web, config)
+        if amazon_order != amazon_languages or web_order != web_languages:
+            final_amazon, final_web = select(amazon_order, web_order)
+            for kind, default, final in ((AMAZON_LANGUAGE, default_amazon, final_amazon), (WEB_LANGUAGE, default_web, final_web)):
+                plan.pruned.extend(
+                    f"{kind}:{language}" for language in default
+                    if language not in final and f"{kind}:{language}" not in plan.pruned + plan.explored
+                )
+        plan.amazon_domains = self.rank(AMAZON_DOMAIN, plan, plan.amazon_domains, config)
+        return plan
+
+    # -------------------------------------------------------------------------
+    # Learning
+    # -------------------------------------------------------------------------
+
+    def record(
+        self,
+        plan: SearchPlan,
+        decision: RoutingDecision,
+        config: EnrichmentConfiguration,
+        amazon_payload: Optional[SearchPayload] = None,
+        web_payload: Optional[SearchPayload] = None
+    ):
+        """Count the outcome of the search phases that informed a routing decision.
+
+        A query language scores a hit when one of its queries returned a result
+        kept by a confident decision: an Amazon product matching at least
+        ``referentiel_min`` (or the best product) for REFERENTIEL, a web source
+        for WEB. A domain scores a hit when it hosts one of those products.
+
+        Args:
+            plan: Plan the searches followed
+            decision: Routing decision
+            config: Enrichment configuration (REFERENTIEL threshold)
+            amazon_payload: Amazon phase results, if the phase ran
+            web_payload: Web phase results, if the phase ran and informed the decision
+        """
+        outcomes: List[Tuple[str, str, bool]] = []
+
+        if amazon_payload is not None and plan.amazon_queries:
+            products = (decision.amazon_data or []) if decision.enrichment_type == "REFERENTIEL" else []
+            confident = [
+                product for index, product in enumerate(products)
+                if index == 0 or (product.metadata or {}).get("match_scores", {}).get("total", 0.0)
+                >= config.scoring_thresholds.referentiel_min
+            ]
+            outcomes.extend(_language_outcomes(AMAZON_LANGUAGE, plan, amazon_payload, {p.url for p in confident}))
+            found_domains = {product.domain for product in confident}
+            outcomes.extend((AMAZON_DOMAIN, domain, domain in found_domains) for domain in plan.amazon_domains)
+
+        if web_payload is not None and plan.web_queries:
+            sources = (decision.web_sources or []) if decision.enrichment_type == "WEB" else []
+            outcomes.extend(_language_outcomes(WEB_LANGUAGE, plan, web_payload, {source.url for source in sources}))
+
+        if not outcomes:
+            return
+
+        now = time.time()
+        rows = [
+            (kind, family, brand, value, int(hit), now)
+            for kind, value, hit in outcomes
+            for family, brand in ((plan.family, plan.brand), (plan.family, ANY), (ANY, plan.brand), (ANY, ANY))
+        ]
+        with self._connect() as connection:
+            connection.executemany(
+                """
+                INSERT INTO yield_stats VALUES (?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT (kind, family, brand, value) DO UPDATE SET
+                    attempts = attempts + 1,
+                    hits = hits + excluded.hits,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+
+
+def _explore(article_id: str, kind: str, value: str, rate: float) -> bool:
+    # Seeded per article and item: the batch planner and the graph run make the same choice
+    return random.Random(f"{article_id}|{kind}|{value}").random() < rate
+
+
+def _language_outcomes(
+    kind: str,
+    plan: SearchPlan,
+    payload: SearchPayload,
+    kept_urls: set
+) -> List[Tuple[str, str, bool]]:
+    queries = plan.amazon_queries if kind == AMAZON_LANGUAGE else plan.web_queries
+    productive_queries = {hit.query for hit in payload.hits if hit.url in kept_urls}
+    return [
+        (kind, language, any(query in productive_queries for query in language_queries))
+        for language, language_queries in plan.languages(queries).items()
+    ]
+
+
+@cache
+def get_yield_priors(path: str) -> YieldPriors:
+    """Get the shared YieldPriors store for a database path."""
+    return YieldPriors(path)
+
+
+# =============================================================================
+# ASYNC HELPERS (used by deep_researcher)
+# =============================================================================
+
+def plan_search_sync(
+    article: ArticlePayload,
+    queries: Dict[str, List[str]],
+    config: EnrichmentConfiguration,
+    priority_amazon_queries: Optional[List[str]] = None
+) -> SearchPlan:
+    """Plan the searches of an article, with priors when they are enabled."""
+    if not config.yield_priors_enabled:
+        return default_search_plan(article, queries, config, priority_amazon_queries)
+    return get_yield_priors(config.yield_priors_path).plan(article, queries, config, priority_amazon_queries)
+
+
+async def plan_search(
+    article: ArticlePayload,
+    queries: Dict[str, List[str]],
+    config: EnrichmentConfiguration,
+    priority_amazon_queries: Optional[List[str]] = None
+) -> SearchPlan:
+    """Plan the searches of an article without blocking the event loop."""
+    if not config.yield_priors_enabled:
+        return default_search_plan(article, queries, config, priority_amazon_queries)
+    return await asyncio.to_thread(plan_search_sync, article, queries, config, priority_amazon_queries)
+
+
+async def record_search_yield(
+    plan: SearchPlan,
+    decision: RoutingDecision,
+    config: EnrichmentConfiguration,
+    amazon_payload: Optional[SearchPayload] = None,
+    web_payload: Optional[SearchPayload] = None
+):
+    """Learn from a routing decision without blocking the event loop. No-op when priors are disabled."""
+    if not config.yield_priors_enabled:
+        return
+    priors = get_yield_priors(config.yield_priors_path)
+    await asyncio.to_thread(priors.record, plan, decision, config, amazon_payload, web_payload)
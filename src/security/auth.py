@@ -1,16 +1,202 @@
-import os
 import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+import jwt
 from langgraph_sdk import Auth
 from langgraph_sdk.auth.types import StudioUser
-from supabase import create_client, Client
-from typing import Optional, Any
+
+from open_deep_research.admission import admit_run
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 supabase_url = os.environ.get("SUPABASE_URL")
 supabase_key = os.environ.get("SUPABASE_KEY")
-supabase: Optional[Client] = None
 
-if supabase_url and supabase_key:
-    supabase = create_client(supabase_url, supabase_key)
+
+@lru_cache(maxsize=1)
+def get_supabase() -> Optional["Client"]:
+    """Create the Supabase client on first use: most requests are verified locally and never need it."""
+    if not (supabase_url and supabase_key):
+        return None
+    from supabase import create_client
+
+    return create_client(supabase_url, supabase_key)
+
+# Local JWT verification. Supabase signs access tokens either with the project's
+# JWT secret (HS256) or with asymmetric keys published as a JWKS. Both are
+# verified in-process; `supabase.auth.get_user` is only called for tokens that
+# cannot be verified locally (no secret configured, unknown key id).
+# Note: a token revoked by logout stays valid locally until it expires.
+jwt_secret = os.environ.get("SUPABASE_JWT_SECRET")
+jwks_url = os.environ.get("SUPABASE_JWKS_URL") or (
+    f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json" if supabase_url else None
+)
+jwt_audience = os.environ.get("SUPABASE_JWT_AUDIENCE", "authenticated")
+jwks_refresh_seconds = float(os.environ.get("AUTH_JWKS_REFRESH_SECONDS", "600"))
+cache_ttl_seconds = float(os.environ.get("AUTH_CACHE_TTL_SECONDS", "60"))
+negative_cache_ttl_seconds = float(os.environ.get("AUTH_NEGATIVE_CACHE_TTL_SECONDS", "10"))
+cache_max_entries = int(os.environ.get("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+# Minimum delay between two JWKS fetches triggered by an unknown key id (key rotation)
+JWKS_MIN_REFETCH_SECONDS = 30.0
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class JWKSCache:
+    """Signing keys of the JWKS endpoint, by key id, refreshed in the background.
+
+    Requests never wait for a refresh once keys are loaded: a stale key set
+    schedules a refresh task and keeps serving the current keys. Only the very
+    first load, or an unknown key id (rotation), is awaited.
+    """
+
+    def __init__(self, url: Optional[str], refresh_seconds: float):
+        """Create an empty key set for the JWKS at `url` (None: local verification disabled)."""
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.keys: dict[str, jwt.PyJWK] = {}
+        self.fetched_at = 0.0
+        self.attempted_at = float("-inf")
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _fetch(self):
+        self.attempted_at = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                jwks = response.json()
+        except (httpx.HTTPError, ValueError):
+            return  # Keep serving the previous keys; retried after JWKS_MIN_REFETCH_SECONDS
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            try:
+                key = jwt.PyJWK(jwk)
+            except jwt.PyJWTError:
+                continue  # Unsupported key type or algorithm
+            keys[jwk.get("kid", "")] = key
+        self.keys = keys
+        self.fetched_at = time.monotonic()
+
+    def refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is already running, and return its task."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+        return self._refresh_task
+
+    async def get(self, kid: str) -> Optional[jwt.PyJWK]:
+        """Get the key of a key id, or None when the JWKS does not have it."""
+        if not self.url:
+            return None
+        now = time.monotonic()
+        can_refetch = now - self.attempted_at > JWKS_MIN_REFETCH_SECONDS
+        if kid not in self.keys and can_refetch:
+            await self.refresh()
+        elif now - self.fetched_at > self.refresh_seconds and can_refetch:
+            self.refresh()
+        return self.keys.get(kid)
+
+
+class VerificationCache:
+    """Short-lived results of token verification, keyed by the token's SHA-256.
+
+    Valid tokens map to their identity until `cache_ttl_seconds` or the token's
+    expiry, whichever comes first. Rejected tokens map to their error detail
+    for `negative_cache_ttl_seconds`, so retry storms with a bad token are cheap.
+    """
+
+    def __init__(self, max_entries: int):
+        """Create an empty cache holding at most `max_entries` tokens."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, Optional[str], str]] = OrderedDict()
+
+    def get(self, token_hash: bytes) -> Optional[tuple[Optional[str], str]]:
+        """Get `(identity, detail)` of a cached token; identity is None for rejected tokens."""
+        entry = self._entries.get(token_hash)
+        if entry is None:
+            return None
+        expires_at, identity, detail = entry
+        if expires_at <= time.time():
+            del self._entries[token_hash]
+            return None
+        return identity, detail
+
+    def put(self, token_hash: bytes, identity: Optional[str], detail: str = "", expires_at: Optional[float] = None):
+        """Cache a verification result (identity None for a rejected token)."""
+        ttl = cache_ttl_seconds if identity else negative_cache_ttl_seconds
+        deadline = time.time() + ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self._entries[token_hash] = (deadline, identity, detail)
+        self._entries.move_to_end(token_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+jwks_cache = JWKSCache(jwks_url, jwks_refresh_seconds)
+verification_cache = VerificationCache(cache_max_entries)
+
+
+async def verify_token_locally(token: str) -> Optional[dict[str, Any]]:
+    """Verify a token's signature, expiry and audience in-process.
+
+    Returns the token claims, or None when no local key can verify the token
+    (the caller then falls back to Supabase). Raises `jwt.InvalidTokenError`
+    for tokens that are definitively invalid (bad signature, expired...).
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    if algorithm in SYMMETRIC_ALGORITHMS:
+        if not jwt_secret:
+            return None
+        key: Any = jwt_secret
+    else:
+        jwk = await jwks_cache.get(header.get("kid", ""))
+        if jwk is None:
+            return None
+        # The algorithm comes from the published key, never from the token header
+        key, algorithm = jwk.key, jwk.algorithm_name
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=jwt_audience or None,
+        options={"require": ["exp", "sub"], "verify_aud": bool(jwt_audience)},
+    )
+
+
+async def verify_token_remotely(token: str) -> str:
+    """Verify a token with Supabase (network round trip) and return the user id."""
+    # Ensure Supabase client is initialized
+    supabase = get_supabase()
+    if not supabase:
+        raise Auth.exceptions.HTTPException(
+            status_code=500, detail="Supabase client not initialized"
+        )
+
+    try:
+        # Verify the JWT token with Supabase using asyncio.to_thread to avoid blocking
+        response = await asyncio.to_thread(supabase.auth.get_user, token)
+        user = response.user
+    except Exception as e:
+        # Handle any errors from Supabase
+        raise Auth.exceptions.HTTPException(
+            status_code=401, detail=f"Authentication error: {str(e)}"
+        )
+
+    if not user:
+        raise Auth.exceptions.HTTPException(
+            status_code=401, detail="Invalid token or user not found"
+        )
+    return user.id
+
 
 # The "Auth" object is a container that LangGraph will use to mark our authentication function
 auth = Auth()
@@ -20,8 +206,7 @@ auth = Auth()
 # for every request. This will determine whether the request is allowed or not
 @auth.authenticate
 async def get_current_user(authorization: str | None) -> Auth.types.MinimalUserDict:
-    """Check if the user's JWT token is valid using Supabase."""
-
+    """Check if the user's JWT token is valid, locally when possible, else using Supabase."""
     # Ensure we have authorization header
     if not authorization:
         raise Auth.exceptions.HTTPException(
@@ -37,40 +222,38 @@ async def get_current_user(authorization: str | None) -> Auth.types.MinimalUserD
             status_code=401, detail="Invalid authorization header format"
         )
 
-    # Ensure Supabase client is initialized
-    if not supabase:
-        raise Auth.exceptions.HTTPException(
-            status_code=500, detail="Supabase client not initialized"
-        )
+    # Recently verified (or rejected) tokens are answered from the cache
+    token_hash = hashlib.sha256(token.encode()).digest()
+    cached = verification_cache.get(token_hash)
+    if cached is not None:
+        identity, detail = cached
+        if identity is None:
+            raise Auth.exceptions.HTTPException(status_code=401, detail=detail)
+        return {"identity": identity}
 
     try:
-        # Verify the JWT token with Supabase using asyncio.to_thread to avoid blocking
-        # This will decode and verify the JWT token in a separate thread
-        async def verify_token() -> dict[str, Any]:
-            response = await asyncio.to_thread(supabase.auth.get_user, token)
-            return response
-
-        response = await verify_token()
-        user = response.user
-
-        if not user:
-            raise Auth.exceptions.HTTPException(
-                status_code=401, detail="Invalid token or user not found"
-            )
-
-        # Return user info if valid
-        return {
-            "identity": user.id,
-        }
-    except Exception as e:
-        # Handle any errors from Supabase
-        raise Auth.exceptions.HTTPException(
-            status_code=401, detail=f"Authentication error: {str(e)}"
-        )
+        claims = await verify_token_locally(token)
+    except jwt.InvalidTokenError as e:
+        detail = f"Authentication error: {str(e)}"
+        verification_cache.put(token_hash, None, detail)
+        raise Auth.exceptions.HTTPException(status_code=401, detail=detail)
+
+    if claims is not None:
+        identity = claims["sub"]
+        verification_cache.put(token_hash, identity, expires_at=claims["exp"])
+    else:
+        # No local key for this token: fall back to the Supabase round trip.
+        # Remote failures are not cached, they may be transient.
+        identity = await verify_token_remotely(token)
+        verification_cache.put(token_hash, identity)
+
+    # Return user info if valid
+    return {
+        "identity": identity,
+    }
 
 
 @auth.on.threads.create
-@auth.on.threads.create_run
 async def on_thread_create(
     ctx: Auth.types.AuthContext,
     value: Auth.types.on.threads.create.value,
@@ -81,7 +264,6 @@ async def on_thread_create(
     1. Sets metadata on the thread being created to track ownership
     2. Returns a filter that ensures only the creator can access it
     """
-
     if isinstance(ctx.user, StudioUser):
         return
 
@@ -91,6 +273,36 @@ async def on_thread_create(
     metadata["owner"] = ctx.user.identity
 
 
+@auth.on.threads.create_run
+async def on_run_create(
+    ctx: Auth.types.AuthContext,
+    value: Auth.types.on.threads.create_run.value,
+):
+    """Add owner to runs and apply the owner's admission limits.
+
+    Runs over the owner's rate or concurrency limits are delayed (`after_seconds`)
+    to their fair slot rather than rejected; only runs that would wait too long
+    get a 429 (see `open_deep_research.admission`).
+    The graphs free the run's slot when it ends (`open_deep_research.admission.ends_run`).
+    """
+    if isinstance(ctx.user, StudioUser):
+        return
+
+    metadata = value.setdefault("metadata", {})
+    metadata["owner"] = ctx.user.identity
+
+    run_id = str(value["run_id"]) if value.get("run_id") else None
+    admission = await admit_run(ctx.user.identity, run_id, value.get("after_seconds") or 0)
+    if admission.status == "rejected":
+        raise Auth.exceptions.HTTPException(
+            status_code=429,
+            detail=f"Too many runs queued, retry in {admission.retry_after_seconds}s",
+            headers={"Retry-After": str(admission.retry_after_seconds)},
+        )
+    if admission.status == "delayed":
+        value["after_seconds"] = admission.after_seconds
+
+
 @auth.on.threads.read
 @auth.on.threads.delete
 @auth.on.threads.update
@@ -139,7 +351,6 @@ async def on_assistants_read(
     metadata since the assistant already exists - we just need to
     return a filter to ensure users can only see their own assistants.
     """
-
     if isinstance(ctx.user, StudioUser):
         return
 
@@ -0,0 +1,404 @@
+"""Local fake LLM and Tavily servers used by the performance benchmark.
+
+Both servers speak just enough of the real wire protocols for the graphs to run
+end to end without touching the network:
+
+- ``FakeLLMServer`` implements the OpenAI ``/v1/chat/completions`` endpoint with a
+  scripted tool-calling policy (the supervisor fans out ``ConductResearch`` calls,
+  researchers keep searching until ``max_react_tool_calls`` stops them) and
+  schema-driven JSON answers for structured output calls.
+- ``FakeTavilyServer`` implements ``/search`` and ``/extract`` with deterministic
+  results, including Amazon product URLs when the query is domain-restricted.
+
+Each endpoint samples its latency from a ``LatencyModel`` and fails with a
+configurable error rate so retry paths are exercised as well.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+##########################
+# Latency and Error Models
+##########################
+
+@dataclass
+class LatencyModel:
+    """Latency distribution for a fake endpoint.
+
+    Specs are parsed from strings such as ``const:0.2``, ``uniform:0.1,0.5``,
+    ``normal:0.3,0.05`` or ``lognormal:-1.2,0.5`` (parameters of the underlying
+    normal distribution, in seconds).
+    """
+
+    kind: str = "const"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse a ``kind:p1,p2`` latency spec."""
+        kind, _, raw_params = spec.partition(":")
+        params = tuple(float(p) for p in raw_params.split(",") if p) or (0.0,)
+        if kind not in {"const", "uniform", "normal", "lognormal"}:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return cls(kind=kind, params=params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency value in seconds (never negative)."""
+        if self.kind == "const":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "normal":
+            value = rng.gauss(self.params[0], self.params[1])
+        else:
+            value = rng.lognormvariate(self.params[0], self.params[1])
+        return max(value, 0.0)
+
+
+@dataclass
+class EndpointProfile:
+    """Latency and failure behaviour of a fake endpoint."""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0
+    error_status: int = 500
+
+
+##########################
+# Shared Server Plumbing
+##########################
+
+class _FakeServer:
+    """Run an aiohttp application on a background thread bound to a free port."""
+
+    def __init__(self, profile: EndpointProfile, seed: int = 0):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.stats: Counter = Counter()
+        self.port: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def build_app(self) -> web.Application:
+        raise NotImplementedError
+
+    def reset_stats(self) -> Dict[str, int]:
+        """Return the request counters accumulated so far and reset them."""
+        snapshot = dict(self.stats)
+        self.stats.clear()
+        return snapshot
+
+    async def simulate(self, endpoint: str) -> Optional[web.Response]:
+        """Sleep for a sampled latency and optionally return an error response."""
+        self.stats[f"{endpoint}_requests"] += 1
+        await asyncio.sleep(self.profile.latency.sample(self.rng))
+        if self.rng.random() < self.profile.error_rate:
+            self.stats[f"{endpoint}_errors"] += 1
+            return web.json_response(
+                {"error": {"message": "injected failure", "type": "server_error"}},
+                status=self.profile.error_status,
+            )
+        return None
+
+    def start(self) -> "_FakeServer":
+        """Start serving on a background thread and block until ready."""
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=10)
+        return self
+
+    def stop(self):
+        """Shut the server down and join the background thread."""
+        if self._loop and self._runner:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        self.port = sock.getsockname()[1]
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        self._loop.run_until_complete(web.SockSite(self._runner, sock).start())
+        self._ready.set()
+        self._loop.run_forever()
+
+
+def _stable_token(text: str, length: int = 10) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:length].upper()
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+##########################
+# Fake OpenAI Chat Completions
+##########################
+
+class FakeLLMServer(_FakeServer):
+    """OpenAI-compatible chat completions server with a scripted research policy.
+
+    Args:
+        profile: Latency and error behaviour of the endpoint
+        supervisor_fanout: Number of ``ConductResearch`` calls the supervisor emits
+            on its first turn (capped by ``max_concurrent_research_units``)
+        completion_chars: Length of plain-text completions (compression, reports)
+        seed: Seed for latency and error sampling
+    """
+
+    def __init__(
+        self,
+        profile: EndpointProfile,
+        supervisor_fanout: int = 20,
+        completion_chars: int = 2000,
+        seed: int = 0,
+    ):
+        super().__init__(profile, seed)
+        self.supervisor_fanout = supervisor_fanout
+        self.completion_chars = completion_chars
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_post("/chat/completions", self.chat_completions)
+        return app
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        error = await self.simulate("llm")
+        if error is not None:
+            return error
+
+        messages = body.get("messages", [])
+        prompt_text = json.dumps(messages)
+        content, tool_calls = self._respond(body, messages)
+        self.stats["llm_prompt_tokens"] += _approx_tokens(prompt_text)
+        self.stats["llm_completion_tokens"] += _approx_tokens(content or json.dumps(tool_calls))
+
+        usage = {
+            "prompt_tokens": _approx_tokens(prompt_text),
+            "completion_tokens": _approx_tokens(content or json.dumps(tool_calls)),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        finish_reason = "tool_calls" if tool_calls else "stop"
+
+        if body.get("stream"):
+            return await self._stream(request, body, message, finish_reason, usage)
+
+        return web.json_response({
+            "id": f"chatcmpl-{_stable_token(prompt_text)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    async def _stream(self, request, body, message, finish_reason, usage) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        delta = dict(message)
+        if "tool_calls" in delta:
+            delta["tool_calls"] = [{"index": i, **call} for i, call in enumerate(delta["tool_calls"])]
+        chunks = [
+            {"choices": [{"index": 0, "delta": delta, "finish_reason": None}]},
+            {"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}], "usage": usage},
+        ]
+        for chunk in chunks:
+            chunk.update({"id": "chatcmpl-stream", "object": "chat.completion.chunk",
+                          "created": int(time.time()), "model": body.get("model", "fake")})
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def _respond(self, body: Dict[str, Any], messages: List[Dict[str, Any]]):
+        """Return ``(content, tool_calls)`` for the request."""
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            return json.dumps(_fill_schema(schema, schema)), []
+
+        tool_names = {
+            tool.get("function", {}).get("name")
+            for tool in body.get("tools", [])
+        }
+        # Function-calling based structured output binds a single forced tool.
+        forced = (body.get("tool_choice") or {}) if isinstance(body.get("tool_choice"), dict) else {}
+        if forced.get("function", {}).get("name"):
+            forced_name = forced["function"]["name"]
+            schema = next(
+                tool["function"].get("parameters", {})
+                for tool in body["tools"] if tool["function"]["name"] == forced_name
+            )
+            return "", [_tool_call(forced_name, _fill_schema(schema, schema))]
+
+        completed_rounds = sum(
+            1 for message in messages
+            if message.get("role") == "assistant" and message.get("tool_calls")
+        )
+
+        if "ConductResearch" in tool_names:
+            if completed_rounds == 0:
+                return "", [
+                    _tool_call("ConductResearch", {"research_topic": f"Benchmark research topic {idx}"})
+                    for idx in range(self.supervisor_fanout)
+                ]
+            return "", [_tool_call("ResearchComplete", {})]
+
+        search_tool = next((name for name in ("tavily_search", "web_search") if name in tool_names), None)
+        if search_tool:
+            # Researchers never stop on their own: max_react_tool_calls bounds the loop.
+            return "", [_tool_call(search_tool, {"queries": [
+                f"benchmark query {completed_rounds} a",
+                f"benchmark query {completed_rounds} b",
+            ]})]
+
+        return ("Benchmark completion. " * (self.completion_chars // 22 + 1))[:self.completion_chars], []
+
+
+def _tool_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"call_{_stable_token(name + json.dumps(arguments) + str(random.random()), 16)}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+def _fill_schema(schema: Dict[str, Any], root: Dict[str, Any]) -> Any:
+    """Produce a minimal value that validates against a JSON schema."""
+    if "$ref" in schema:
+        ref_name = schema["$ref"].split("/")[-1]
+        return _fill_schema(root.get("$defs", root.get("definitions", {})).get(ref_name, {}), root)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            return _fill_schema(schema[combinator][0], root)
+    if "enum" in schema:
+        return schema["enum"][0]
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+    if schema_type == "object":
+        return {
+            name: _fill_schema(prop, root)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return []
+    if schema_type == "boolean":
+        return False
+    if schema_type == "integer":
+        return 1
+    if schema_type == "number":
+        return 0.5
+    if schema_type == "null":
+        return None
+    return "Benchmark structured answer."
+
+
+##########################
+# Fake Tavily API
+##########################
+
+class FakeTavilyServer(_FakeServer):
+    """Tavily ``/search`` and ``/extract`` server with deterministic results.
+
+    Args:
+        profile: Latency and error behaviour of the endpoint
+        raw_content_chars: Size of ``raw_content`` returned per result
+        seed: Seed for latency and error sampling
+    """
+
+    def __init__(self, profile: EndpointProfile, raw_content_chars: int = 4000, seed: int = 0):
+        super().__init__(profile, seed)
+        self.raw_content_chars = raw_content_chars
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/search", self.search)
+        app.router.add_post("/extract", self.extract)
+        return app
+
+    def _raw_content(self, seed_text: str) -> str:
+        return (f"Page content for {seed_text}. " * (self.raw_content_chars // 20 + 1))[:self.raw_content_chars]
+
+    async def search(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        error = await self.simulate("search")
+        if error is not None:
+            return error
+
+        query = body.get("query", "")
+        depth = body.get("search_depth", "basic")
+        self.stats["search_credits"] += 2 if depth == "advanced" else 1
+        max_results = int(body.get("max_results", 5))
+        include_domains = body.get("include_domains") or []
+        include_raw = bool(body.get("include_raw_content"))
+
+        results = []
+        for rank in range(max_results):
+            token = _stable_token(f"{query}-{rank}")
+            if include_domains:
+                domain = include_domains[rank % len(include_domains)]
+                url = f"https://www.{domain}/Benchmark-Product/dp/B0{token[:8]}"
+                title = f"{query} - {domain}"
+            else:
+                url = f"https://site{rank}.example.com/products/{token.lower()}"
+                title = f"{query} - result {rank}"
+            result = {
+                "url": url,
+                "title": title,
+                "content": f"Snippet {rank} for {query}",
+                "score": round(0.95 - rank * 0.05, 2),
+            }
+            if include_raw:
+                result["raw_content"] = self._raw_content(query)
+            results.append(result)
+
+        return web.json_response({
+            "query": query,
+            "results": results,
+            "images": [],
+            "response_time": 0.0,
+        })
+
+    async def extract(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        error = await self.simulate("extract")
+        if error is not None:
+            return error
+
+        urls = body.get("urls") or []
+        if isinstance(urls, str):
+            urls = [urls]
+        self.stats["extract_credits"] += (len(urls) + 4) // 5
+        return web.json_response({
+            "results": [{"url": url, "raw_content": self._raw_content(url)} for url in urls],
+            "failed_results": [],
+            "response_time": 0.0,
+        })
@@ -0,0 +1,178 @@
+"""Cold-start import benchmark for the graph modules.
+
+Imports each module in a fresh interpreter with ``python -X importtime`` and
+reports the median import time over several runs, the heaviest top-level
+packages, and whether any module that must load lazily (provider SDKs, MCP,
+Supabase, HTTP clients only used by some tools) was imported eagerly.
+
+Usage (from the repository root):
+
+    python -m tests.import_benchmark --repeat 5 --output imports.json
+
+    # Fail (exit code 1) when an import got more than 20% slower, or pulls in a lazy dependency
+    python -m tests.import_benchmark --baseline imports.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+MODULES = (
+    "open_deep_research.deep_researcher",
+    "open_deep_research.article_enrichment_graph",
+    "open_deep_research.article_enrichment_graph_v2",
+    "open_deep_research.batch_enrichment",
+    "open_deep_research.webhook_queue",
+)
+
+# Top-level packages that must only be imported on first use
+LAZY_PACKAGES = (
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain_google_vertexai",
+    "langchain_aws",
+    "langchain_groq",
+    "langchain_deepseek",
+    "openai",
+    "anthropic",
+    "boto3",
+    "langchain_mcp_adapters",
+    "mcp",
+    "supabase",
+    "aiohttp",
+    "tavily",
+)
+
+
+##########################
+# Measurement
+##########################
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Parse ``-X importtime`` output into ``{module: (self_us, cumulative_us)}``."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure_once(module: str) -> Dict[str, Any]:
+    """Import ``module`` in a fresh interpreter and return its timings and loaded packages."""
+    code = f"import {module}, sys, json; print(json.dumps(sorted(sys.modules)))"
+    env = {**os.environ, "LANGSMITH_TRACING": "false", "LANGCHAIN_TRACING_V2": "false"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    timings = parse_importtime(completed.stderr)
+    loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    packages: Dict[str, int] = defaultdict(int)
+    for name, (self_us, _) in timings.items():
+        packages[name.split(".")[0]] += self_us
+    return {
+        "total_us": timings.get(module, (0, 0))[1],
+        "packages_us": dict(packages),
+        "lazy_violations": sorted({name.split(".")[0] for name in loaded} & set(LAZY_PACKAGES)),
+    }
+
+
+def measure(module: str, repeat: int, top: int) -> Dict[str, Any]:
+    """Median import time of a module over ``repeat`` fresh interpreters."""
+    samples = [measure_once(module) for _ in range(repeat)]
+    packages = defaultdict(list)
+    for sample in samples:
+        for package, self_us in sample["packages_us"].items():
+            packages[package].append(self_us)
+    heaviest = sorted(
+        ((package, statistics.median(values)) for package, values in packages.items()),
+        key=lambda item: -item[1],
+    )[:top]
+    return {
+        "module": module,
+        "repeat": repeat,
+        "median_ms": statistics.median(sample["total_us"] for sample in samples) / 1000,
+        "min_ms": min(sample["total_us"] for sample in samples) / 1000,
+        "heaviest_packages_ms": {package: value / 1000 for package, value in heaviest},
+        "lazy_violations": samples[0]["lazy_violations"],
+    }
+
+
+##########################
+# Reporting
+##########################
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return human-readable import time regressions versus a baseline."""
+    previous = {result["module"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        reference = previous.get(result["module"])
+        if reference and result["median_ms"] > reference["median_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result['module']} {reference['median_ms']:.0f}ms -> {result['median_ms']:.0f}ms"
+            )
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]]):
+    header = f"{'module':<48}{'median ms':>10}{'min ms':>9}  heaviest packages"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        heaviest = ", ".join(f"{package} {ms:.0f}" for package, ms in list(r["heaviest_packages_ms"].items())[:4])
+        print(f"{r['module']:<48}{r['median_ms']:>10.0f}{r['min_ms']:>9.0f}  {heaviest}")
+        if r["lazy_violations"]:
+            print(f"{'':<48}  eagerly imported: {', '.join(r['lazy_violations'])}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(MODULES), help="Comma-separated modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest packages kept per module")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Previous --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = [measure(module, args.repeat, args.top) for module in args.modules.split(",") if module]
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failures = [
+        f"{result['module']} eagerly imports {', '.join(result['lazy_violations'])}"
+        for result in results if result["lazy_violations"]
+    ]
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures += compare_to_baseline(results, json.load(f), args.tolerance)
+    if failures:
+        print("\nImport regressions detected:")
+        for line in failures:
+            print(f"  - {line}")
+        return 1
+    if args.baseline:
+        print("\nNo import regression against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
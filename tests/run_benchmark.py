@@ -0,0 +1,401 @@
+"""End-to-end latency and throughput benchmark for the research graphs.
+
+Drives ``deep_researcher`` and ``enrichment_graph`` against the local fake LLM and
+Tavily servers from ``tests/benchmark_fakes.py`` and sweeps
+``max_concurrent_research_units``, ``max_react_tool_calls`` and the number of
+concurrent graph runs. Every sweep point runs in a fresh process so peak RSS is
+measured per point, and each run uses a ``MemorySaver`` checkpointer so the
+checkpoint footprint is reported too.
+
+Usage (from the repository root):
+
+    python -m tests.run_benchmark --graph deep_researcher \
+        --research-units 1,5,10 --react-calls 2,5 --run-concurrency 1,4 --runs 8 \
+        --llm-latency lognormal:-1.5,0.4 --search-latency const:0.3 --error-rate 0.02 \
+        --output bench.json
+
+    # Fail (exit code 1) when p95 latency or throughput regress by more than 20%
+    python -m tests.run_benchmark --graph enrichment --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+from tests.benchmark_fakes import (
+    EndpointProfile,
+    FakeLLMServer,
+    FakeTavilyServer,
+    LatencyModel,
+)
+
+GRAPHS = ("deep_researcher", "enrichment")
+
+
+##########################
+# Metrics Helpers
+##########################
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (``q`` in [0, 100]) of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def checkpoint_bytes(obj: Any) -> int:
+    """Total size of the serialized payloads held by an in-memory checkpointer."""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(checkpoint_bytes(value) for value in obj.values())
+    if isinstance(obj, (list, tuple, set)):
+        return sum(checkpoint_bytes(value) for value in obj)
+    return 0
+
+
+def saver_bytes(saver) -> int:
+    """Bytes stored by a ``MemorySaver`` across checkpoints, blobs and writes."""
+    return sum(
+        checkpoint_bytes(getattr(saver, attribute, {}))
+        for attribute in ("storage", "blobs", "writes")
+    )
+
+
+##########################
+# Workloads
+##########################
+
+def route_tavily_to(base_url: str):
+    """Point every Tavily client created in this process at the fake server.
+
+    The enrichment tools build their clients with the default API base URL, so
+    the benchmark worker passes ``api_base_url`` to every client it constructs.
+    """
+    import tavily
+
+    def redirected(init):
+        def redirected_init(self, *args, **kwargs):
+            init(self, *args, **{**kwargs, "api_base_url": base_url})
+        return redirected_init
+
+    tavily.TavilyClient.__init__ = redirected(tavily.TavilyClient.__init__)
+    tavily.AsyncTavilyClient.__init__ = redirected(tavily.AsyncTavilyClient.__init__)
+
+
+def _benchmark_article(index: int):
+    from open_deep_research.state_enrichment import ArticlePayload
+
+    return ArticlePayload(
+        article_id=f"BENCH-{index:05d}",
+        libelle=f"Centrale vapeur modele {index % 50}",
+        marque=f"Marque{index % 7}",
+        ean=f"{3000000000000 + index}",
+        reference_fournisseur=f"REF-{index:05d}",
+        famille_produit="ELEC",
+        images_disponibles=bool(index % 2),
+        images_urls=[f"https://images.example.com/{index}.jpg"] if index % 2 else None,
+        fiche_technique_url=f"https://docs.example.com/{index}.pdf" if index % 3 == 0 else None,
+    )
+
+
+def _build_workload(graph_name: str, point: Dict[str, int], callbacks: Optional[list] = None):
+    """Return ``(saver, run_once)`` where ``run_once(index)`` executes a single graph run."""
+    from langgraph.checkpoint.memory import MemorySaver
+
+    saver = MemorySaver()
+    callbacks = callbacks or []
+
+    if graph_name == "deep_researcher":
+        from open_deep_research.deep_researcher import deep_researcher_builder
+
+        graph = deep_researcher_builder.compile(checkpointer=saver)
+
+        async def run_once(index: int):
+            config = {
+                "configurable": {
+                    "thread_id": str(uuid.uuid4()),
+                    "allow_clarification": False,
+                    "search_api": "tavily",
+                    "max_concurrent_research_units": point["research_units"],
+                    "max_react_tool_calls": point["react_calls"],
+                    "max_researcher_iterations": 2,
+                    "summarization_model": "openai:gpt-4.1-mini",
+                    "research_model": "openai:gpt-4.1",
+                    "compression_model": "openai:gpt-4.1",
+                    "final_report_model": "openai:gpt-4.1",
+                },
+                "recursion_limit": 200,
+                "callbacks": callbacks,
+            }
+            await graph.ainvoke(
+                {"messages": [{"role": "user", "content": f"Benchmark research question {index}"}]},
+                config,
+            )
+
+        return saver, run_once
+
+    from open_deep_research.article_enrichment_graph import create_enrichment_graph
+    from open_deep_research.state_enrichment import create_initial_enrichment_state
+
+    graph = create_enrichment_graph(checkpointer=saver)
+
+    async def run_once(index: int):
+        state = create_initial_enrichment_state(_benchmark_article(index))
+        await graph.ainvoke(state, {"configurable": {"thread_id": str(uuid.uuid4())}, "callbacks": callbacks})
+
+    return saver, run_once
+
+
+async def _drive(run_once, runs: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    for index in range(warmup):
+        await run_once(-1 - index)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def timed(index: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await run_once(index)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(index) for index in range(runs)))
+    return {"latencies": latencies, "errors": errors, "wall_seconds": time.perf_counter() - started}
+
+
+def run_point(
+    graph_name: str,
+    point: Dict[str, int],
+    runs: int,
+    warmup: int,
+    env: Dict[str, str],
+    profile: bool = False,
+) -> Dict[str, Any]:
+    """Execute one sweep point. Runs inside a dedicated worker process."""
+    os.environ.update(env)
+    route_tavily_to(env["BENCHMARK_TAVILY_BASE_URL"])
+    instrumentation = None
+    if profile:
+        from open_deep_research.instrumentation import RunInstrumentation
+
+        instrumentation = RunInstrumentation()
+    with contextlib.redirect_stdout(io.StringIO()):
+        saver, run_once = _build_workload(graph_name, point, [instrumentation] if instrumentation else None)
+        baseline_bytes = saver_bytes(saver)
+        outcome = asyncio.run(_drive(run_once, runs, point["run_concurrency"], warmup))
+
+    latencies = outcome["latencies"]
+    wall = outcome["wall_seconds"]
+    profile_summary = {}
+    if instrumentation is not None:
+        profile_summary = {"stages": instrumentation.summary()["stages"]}
+    return {
+        "graph": graph_name,
+        **point,
+        "runs": runs,
+        "succeeded": len(latencies),
+        "failed": len(outcome["errors"]),
+        "sample_errors": outcome["errors"][:3],
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "runs_per_min": (len(latencies) / wall * 60.0) if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "checkpoint_bytes_per_run": (saver_bytes(saver) - baseline_bytes) / max(runs + warmup, 1),
+        **profile_summary,
+    }
+
+
+##########################
+# Sweep Orchestration
+##########################
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _point_key(result: Dict[str, Any]) -> tuple:
+    return (result["graph"], result["research_units"], result["react_calls"], result["run_concurrency"])
+
+
+def sweep_points(args) -> List[Dict[str, int]]:
+    """Build the sweep grid. The enrichment graph only varies run concurrency."""
+    if args.graph == "enrichment":
+        return [
+            {"research_units": 0, "react_calls": 0, "run_concurrency": c}
+            for c in _int_list(args.run_concurrency)
+        ]
+    return [
+        {"research_units": u, "react_calls": r, "run_concurrency": c}
+        for u, r, c in product(
+            _int_list(args.research_units),
+            _int_list(args.react_calls),
+            _int_list(args.run_concurrency),
+        )
+    ]
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return human-readable regressions of p95 latency or throughput versus a baseline."""
+    previous = {_point_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        reference = previous.get(_point_key(result))
+        if not reference:
+            continue
+        if reference["p95_s"] and result["p95_s"] > reference["p95_s"] * (1 + tolerance):
+            regressions.append(
+                f"{_point_key(result)} p95 {reference['p95_s']:.3f}s -> {result['p95_s']:.3f}s"
+            )
+        if reference["runs_per_min"] and result["runs_per_min"] < reference["runs_per_min"] * (1 - tolerance):
+            regressions.append(
+                f"{_point_key(result)} runs/min {reference['runs_per_min']:.1f} -> {result['runs_per_min']:.1f}"
+            )
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]]):
+    header = (
+        f"{'graph':<16}{'units':>6}{'react':>6}{'conc':>6}{'ok/n':>8}"
+        f"{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'runs/min':>10}{'rss MiB':>9}{'ckpt KiB':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['graph']:<16}{r['research_units']:>6}{r['react_calls']:>6}{r['run_concurrency']:>6}"
+            f"{str(r['succeeded']) + '/' + str(r['runs']):>8}"
+            f"{r['p50_s']:>9.3f}{r['p95_s']:>9.3f}{r['p99_s']:>9.3f}{r['runs_per_min']:>10.1f}"
+            f"{r['peak_rss_mb']:>9.1f}{r['checkpoint_bytes_per_run'] / 1024:>10.1f}"
+        )
+
+
+def print_profile(result: Dict[str, Any]):
+    """Print the per-stage breakdown recorded with ``--profile``, slowest stages first."""
+    stages = sorted(result.get("stages", {}).items(), key=lambda item: -item[1]["wall_s"])
+    print(f"  {'stage':<40}{'spans':>7}{'wall s':>9}{'wait s':>9}{'tok in':>9}{'tok out':>9}{'retries':>8}{'cost $':>9}")
+    for stage, totals in stages:
+        print(
+            f"  {stage:<40}{totals['spans']:>7}{totals['wall_s']:>9.2f}{totals['queue_wait_s']:>9.2f}"
+            f"{totals['input_tokens']:>9}{totals['output_tokens']:>9}{totals['retries']:>8}{totals['cost_usd']:>9.4f}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--graph", choices=GRAPHS, default="deep_researcher")
+    parser.add_argument("--research-units", default="1,5", help="max_concurrent_research_units values")
+    parser.add_argument("--react-calls", default="2,5", help="max_react_tool_calls values")
+    parser.add_argument("--run-concurrency", default="1,4", help="Concurrent graph runs")
+    parser.add_argument("--runs", type=int, default=8, help="Measured runs per sweep point")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per sweep point")
+    parser.add_argument("--llm-latency", default="lognormal:-1.6,0.5", help="Fake LLM latency spec")
+    parser.add_argument("--search-latency", default="lognormal:-1.2,0.4", help="Fake Tavily latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Injected failure rate for both fakes")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected failures")
+    parser.add_argument("--supervisor-fanout", type=int, default=20)
+    parser.add_argument("--raw-content-chars", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Previous --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--profile", action="store_true", help="Record a per-stage span breakdown")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    llm = FakeLLMServer(
+        EndpointProfile(LatencyModel.parse(args.llm_latency), args.error_rate, args.error_status),
+        supervisor_fanout=args.supervisor_fanout,
+        seed=args.seed,
+    ).start()
+    tavily = FakeTavilyServer(
+        EndpointProfile(LatencyModel.parse(args.search_latency), args.error_rate, args.error_status),
+        raw_content_chars=args.raw_content_chars,
+        seed=args.seed + 1,
+    ).start()
+
+    env = {
+        "OPENAI_API_KEY": "benchmark-key",
+        "OPENAI_BASE_URL": f"{llm.base_url}/v1",
+        "OPENAI_API_BASE": f"{llm.base_url}/v1",
+        "TAVILY_API_KEY": "tvly-benchmark-key",
+        "BENCHMARK_TAVILY_BASE_URL": tavily.base_url,
+        "LANGSMITH_TRACING": "false",
+        "LANGCHAIN_TRACING_V2": "false",
+        "GET_API_KEYS_FROM_CONFIG": "false",
+        # Every run must pay for its searches, with the default query plan: nothing
+        # learned by earlier runs (resolution index, yield priors) may change the results
+        "ENRICHMENT_INDEX_ENABLED": "false",
+        "ENRICHMENT_PRIORS_ENABLED": "false",
+    }
+
+    results = []
+    try:
+        for point in sweep_points(args):
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(
+                    run_point, args.graph, point, args.runs, args.warmup, env, args.profile
+                ).result()
+            result["llm_stats"] = llm.reset_stats()
+            result["tavily_stats"] = tavily.reset_stats()
+            results.append(result)
+            print_table([result])
+            if args.profile:
+                print_profile(result)
+    finally:
+        llm.stop()
+        tavily.stop()
+
+    print()
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nPerformance regressions detected:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\nNo performance regression against baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Admission control: a finished run must give its concurrency slot back.
+
+Run with ``python -m pytest tests/test_admission.py``.
+"""
+
+import asyncio
+
+import pytest
+from langgraph.graph import END
+from langgraph.types import Command
+
+from open_deep_research import admission
+from open_deep_research.admission import (
+    AdmissionLimits,
+    MemoryAdmissionController,
+    SQLiteAdmissionController,
+    ends_run,
+)
+
+LIMITS = AdmissionLimits(max_concurrent_runs=3, runs_per_minute=10, run_lease_seconds=900)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def controller(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        controller = MemoryAdmissionController(LIMITS)
+    else:
+        controller = SQLiteAdmissionController(str(tmp_path / "admission.sqlite"), LIMITS)
+    monkeypatch.setattr(admission, "get_admission_controller", lambda: controller)
+    return controller
+
+
+def test_finished_runs_free_their_slot(controller):
+    statuses = []
+    for i in range(5):
+        statuses.append(controller.admit("alice", f"run-{i}").status)
+        controller.release(f"run-{i}")
+    assert statuses == ["admitted"] * 5
+
+
+def test_running_runs_hold_their_slot(controller):
+    statuses = [controller.admit("alice", f"run-{i}").status for i in range(3)]
+    controller.release("run-0")
+    statuses.append(controller.admit("alice", "run-3").status)
+    fourth_running = controller.admit("alice", "run-4")
+    assert statuses == ["admitted"] * 4
+    assert fourth_running.status == "delayed"
+    assert fourth_running.delay_seconds == pytest.approx(LIMITS.run_lease_seconds, abs=5)
+
+
+def _config(run_id):
+    return {"configurable": {"run_id": run_id}}
+
+
+def test_node_routing_to_end_releases_the_run(controller):
+    async def last_node(state, config):
+        return Command(goto=END)
+
+    async def middle_node(state, config):
+        return Command(goto="next")
+
+    async def scenario():
+        statuses = []
+        for i in range(5):
+            statuses.append(controller.admit("alice", f"run-{i}").status)
+            await ends_run(middle_node)({}, _config(f"run-{i}"))
+            await ends_run(last_node)({}, _config(f"run-{i}"))
+        return statuses
+
+    assert asyncio.run(scenario()) == ["admitted"] * 5
+
+
+def test_terminal_and_failing_nodes_release_the_run(controller):
+    async def report(state, config):
+        return {"final_report": "done"}
+
+    async def failing(state, config):
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        for i in range(3):
+            controller.admit("alice", f"run-{i}")
+        await ends_run(report, terminal=True)({}, _config("run-0"))
+        with pytest.raises(RuntimeError):
+            await ends_run(failing)({}, _config("run-1"))
+        return [controller.admit("alice", f"run-{i}").status for i in range(3, 5)]
+
+    assert asyncio.run(scenario()) == ["admitted", "admitted"]
+
+
+def test_nodes_outside_a_server_run_are_unaffected(controller):
+    async def last_node(state, config):
+        return Command(goto=END)
+
+    assert asyncio.run(ends_run(last_node)({}, {})).goto == END
+
+
+def test_failing_research_phase_releases_the_run(controller, monkeypatch):
+    from open_deep_research import deep_researcher
+
+    class FailingSupervisor:
+        async def ainvoke(self, state, config):
+            raise RuntimeError("provider down")
+
+    monkeypatch.setattr(deep_researcher, "build_supervisor_subgraph", lambda: FailingSupervisor())
+    research_node = deep_researcher.get_deep_researcher_builder().nodes["research_supervisor"].runnable
+
+    async def scenario():
+        for i in range(3):
+            controller.admit("alice", f"run-{i}")
+        with pytest.raises(RuntimeError):
+            await research_node.ainvoke({}, _config("run-0"))
+        return controller.admit("alice", "run-3").status
+
+    assert asyncio.run(scenario()) == "admitted"
@@ -0,0 +1,378 @@
+"""Authentication: local JWT verification, its caches and run admission.
+
+Run with ``python -m pytest tests/test_auth.py``.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from langgraph_sdk import Auth
+
+from open_deep_research import admission
+from open_deep_research.admission import AdmissionLimits, MemoryAdmissionController
+
+AUTH_PATH = Path(__file__).resolve().parents[1] / "src" / "security" / "auth.py"
+JWKS_URL = "https://project.supabase.test/auth/v1/.well-known/jwks.json"
+SECRET = "project-jwt-secret-for-tests-only-0123456789"
+
+
+def _load_auth():
+    spec = importlib.util.spec_from_file_location("security_auth", AUTH_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+auth = _load_auth()
+
+
+class Clock:
+    """Stands in for the ``time`` module inside ``auth`` so that cache expiry can be stepped."""
+
+    def __init__(self):
+        self.wall = time.time()
+        self.mono = 1_000.0
+
+    def time(self):
+        return self.wall
+
+    def monotonic(self):
+        return self.mono
+
+    def advance(self, seconds):
+        self.wall += seconds
+        self.mono += seconds
+
+
+RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+OTHER_RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _jwk(private_key, kid, alg="RS256"):
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": alg, "use": "sig"})
+    return jwk
+
+
+def _claims(**overrides):
+    claims = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 3600}
+    claims.update(overrides)
+    return claims
+
+
+def _hs_token(secret=SECRET, **claims):
+    return jwt.encode(_claims(**claims), secret, algorithm="HS256")
+
+
+def _rs_token(private_key=RSA_KEY, kid="key-1", algorithm="RS256", **claims):
+    return jwt.encode(_claims(**claims), private_key, algorithm=algorithm, headers={"kid": kid})
+
+
+class JWKSServer:
+    """JWKS endpoint served through ``httpx.MockTransport``."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.requests = 0
+        self.fail = False
+
+    def handle(self, request):
+        self.requests += 1
+        if self.fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": self.keys})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def jwks_server(monkeypatch):
+    server = JWKSServer([_jwk(RSA_KEY, "key-1")])
+    async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        lambda **kwargs: async_client(transport=httpx.MockTransport(server.handle), **kwargs),
+    )
+    return server
+
+
+@pytest.fixture(autouse=True)
+def fresh_auth(monkeypatch, clock, jwks_server):
+    monkeypatch.setattr(auth, "jwt_secret", SECRET)
+    monkeypatch.setattr(auth, "jwt_audience", "authenticated")
+    monkeypatch.setattr(auth, "jwks_cache", auth.JWKSCache(JWKS_URL, refresh_seconds=600))
+    monkeypatch.setattr(auth, "verification_cache", auth.VerificationCache(max_entries=100))
+
+
+def _tamper(token):
+    header, payload, signature = token.split(".")
+    forged = jwt.utils.base64url_encode(json.dumps(_claims(sub="admin")).encode()).decode()
+    return ".".join([header, forged, signature])
+
+
+# =============================================================================
+# LOCAL VERIFICATION
+# =============================================================================
+
+def test_hs256_token_is_verified_with_the_project_secret():
+    claims = asyncio.run(auth.verify_token_locally(_hs_token()))
+    assert claims["sub"] == "user-1"
+
+
+@pytest.mark.parametrize("token, error", [
+    (_hs_token(exp=int(time.time()) - 60), jwt.ExpiredSignatureError),
+    (_tamper(_hs_token()), jwt.InvalidSignatureError),
+    (_hs_token(secret="another-secret-of-the-same-length-0123456789"), jwt.InvalidSignatureError),
+    (_hs_token(aud="anon"), jwt.InvalidAudienceError),
+])
+def test_invalid_hs256_tokens_are_rejected(token, error):
+    with pytest.raises(error):
+        asyncio.run(auth.verify_token_locally(token))
+
+
+def test_hs256_token_without_secret_is_left_to_supabase(monkeypatch):
+    monkeypatch.setattr(auth, "jwt_secret", None)
+    assert asyncio.run(auth.verify_token_locally(_hs_token())) is None
+
+
+def test_rs256_token_is_verified_with_the_published_key():
+    claims = asyncio.run(auth.verify_token_locally(_rs_token()))
+    assert claims["sub"] == "user-1"
+
+
+@pytest.mark.parametrize("token, error", [
+    (_rs_token(exp=int(time.time()) - 60), jwt.ExpiredSignatureError),
+    (_tamper(_rs_token()), jwt.InvalidSignatureError),
+    (_rs_token(private_key=OTHER_RSA_KEY), jwt.InvalidSignatureError),
+])
+def test_invalid_rs256_tokens_are_rejected(token, error):
+    with pytest.raises(error):
+        asyncio.run(auth.verify_token_locally(token))
+
+
+def test_algorithm_comes_from_the_published_key_not_the_token_header():
+    # Validly signed by the right key, but with an algorithm the JWK does not declare
+    token = _rs_token(algorithm="RS512")
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        asyncio.run(auth.verify_token_locally(token))
+
+
+def test_unsigned_token_claiming_a_published_key_is_rejected():
+    header = jwt.utils.base64url_encode(json.dumps({"alg": "none", "kid": "key-1"}).encode()).decode()
+    payload = jwt.utils.base64url_encode(json.dumps(_claims()).encode()).decode()
+    with pytest.raises(jwt.InvalidTokenError):
+        asyncio.run(auth.verify_token_locally(f"{header}.{payload}."))
+
+
+def test_unknown_key_id_is_left_to_supabase():
+    assert asyncio.run(auth.verify_token_locally(_rs_token(kid="unknown"))) is None
+
+
+# =============================================================================
+# JWKS CACHE
+# =============================================================================
+
+def test_jwks_is_fetched_once_and_served_from_memory(jwks_server):
+    async def scenario():
+        return [await auth.jwks_cache.get("key-1") for _ in range(3)]
+
+    keys = asyncio.run(scenario())
+    assert all(key is not None for key in keys)
+    assert keys[0].algorithm_name == "RS256"
+    assert jwks_server.requests == 1
+
+
+def test_stale_jwks_is_served_while_it_refreshes_in_the_background(clock, jwks_server):
+    async def scenario():
+        await auth.jwks_cache.get("key-1")
+        clock.advance(601)
+        jwks_server.keys = [_jwk(OTHER_RSA_KEY, "key-2")]
+        stale = await auth.jwks_cache.get("key-1")
+        await auth.jwks_cache._refresh_task
+        return stale, await auth.jwks_cache.get("key-1"), await auth.jwks_cache.get("key-2")
+
+    stale, rotated_out, rotated_in = asyncio.run(scenario())
+    assert stale is not None
+    assert rotated_out is None
+    assert rotated_in is not None
+    assert jwks_server.requests == 2
+
+
+def test_unknown_key_id_refetches_at_most_once_per_interval(clock, jwks_server):
+    async def scenario():
+        await auth.jwks_cache.get("key-1")
+        jwks_server.keys.append(_jwk(OTHER_RSA_KEY, "key-2"))
+        too_soon = await auth.jwks_cache.get("key-2")
+        clock.advance(auth.JWKS_MIN_REFETCH_SECONDS + 1)
+        return too_soon, await auth.jwks_cache.get("key-2")
+
+    too_soon, after_interval = asyncio.run(scenario())
+    assert too_soon is None
+    assert after_interval is not None
+    assert jwks_server.requests == 2
+
+
+def test_failed_jwks_fetch_keeps_the_previous_keys(clock, jwks_server):
+    async def scenario():
+        await auth.jwks_cache.get("key-1")
+        clock.advance(601)
+        jwks_server.fail = True
+        auth.jwks_cache.refresh()
+        await auth.jwks_cache._refresh_task
+        return await auth.jwks_cache.get("key-1")
+
+    assert asyncio.run(scenario()) is not None
+
+
+# =============================================================================
+# VERIFICATION CACHE
+# =============================================================================
+
+def test_verified_identity_expires_after_the_ttl(clock, monkeypatch):
+    monkeypatch.setattr(auth, "cache_ttl_seconds", 60)
+    cache = auth.VerificationCache(max_entries=10)
+    cache.put(b"token", "user-1")
+    clock.advance(59)
+    assert cache.get(b"token") == ("user-1", "")
+    clock.advance(2)
+    assert cache.get(b"token") is None
+
+
+def test_verified_identity_never_outlives_the_token(clock, monkeypatch):
+    monkeypatch.setattr(auth, "cache_ttl_seconds", 60)
+    cache = auth.VerificationCache(max_entries=10)
+    cache.put(b"token", "user-1", expires_at=clock.time() + 5)
+    clock.advance(6)
+    assert cache.get(b"token") is None
+
+
+def test_rejections_use_the_negative_ttl(clock, monkeypatch):
+    monkeypatch.setattr(auth, "negative_cache_ttl_seconds", 10)
+    cache = auth.VerificationCache(max_entries=10)
+    cache.put(b"token", None, "Authentication error: expired")
+    assert cache.get(b"token") == (None, "Authentication error: expired")
+    clock.advance(11)
+    assert cache.get(b"token") is None
+
+
+def test_least_recently_cached_tokens_are_evicted_first():
+    cache = auth.VerificationCache(max_entries=2)
+    for token in (b"a", b"b", b"c"):
+        cache.put(token, "user-1")
+    assert cache.get(b"a") is None
+    assert cache.get(b"b") is not None
+    assert cache.get(b"c") is not None
+
+
+# =============================================================================
+# AUTHENTICATION HANDLER
+# =============================================================================
+
+@pytest.fixture
+def remote(monkeypatch):
+    calls = []
+
+    async def verify_token_remotely(token):
+        calls.append(token)
+        return "remote-user"
+
+    monkeypatch.setattr(auth, "verify_token_remotely", verify_token_remotely)
+    return calls
+
+
+def test_locally_verified_token_is_cached(remote, monkeypatch):
+    token = _hs_token()
+    first = asyncio.run(auth.get_current_user(f"Bearer {token}"))
+    monkeypatch.setattr(auth, "verify_token_locally", pytest.fail)
+    second = asyncio.run(auth.get_current_user(f"Bearer {token}"))
+    assert first == second == {"identity": "user-1"}
+    assert remote == []
+
+
+def test_tokens_without_local_key_fall_back_to_supabase(remote, monkeypatch):
+    monkeypatch.setattr(auth, "jwt_secret", None)
+    token = _hs_token()
+    for _ in range(2):
+        assert asyncio.run(auth.get_current_user(f"Bearer {token}")) == {"identity": "remote-user"}
+    assert remote == [token]
+
+
+def test_rejected_token_is_answered_from_the_negative_cache(remote, monkeypatch):
+    token = _tamper(_hs_token())
+    with pytest.raises(Auth.exceptions.HTTPException) as first:
+        asyncio.run(auth.get_current_user(f"Bearer {token}"))
+    monkeypatch.setattr(auth, "verify_token_locally", pytest.fail)
+    with pytest.raises(Auth.exceptions.HTTPException) as second:
+        asyncio.run(auth.get_current_user(f"Bearer {token}"))
+    assert first.value.status_code == second.value.status_code == 401
+    assert first.value.detail == second.value.detail
+    assert auth.verification_cache.get(hashlib.sha256(token.encode()).digest())[0] is None
+    assert remote == []
+
+
+def test_malformed_authorization_header_is_rejected():
+    with pytest.raises(Auth.exceptions.HTTPException) as error:
+        asyncio.run(auth.get_current_user(f"Token {_hs_token()}"))
+    assert error.value.status_code == 401
+
+
+# =============================================================================
+# RUN ADMISSION
+# =============================================================================
+
+def _run_context(owner):
+    return SimpleNamespace(user=SimpleNamespace(identity=owner))
+
+
+def _use_controller(monkeypatch, max_queue_delay_seconds):
+    limits = AdmissionLimits(
+        max_concurrent_runs=1, runs_per_minute=60, run_lease_seconds=900,
+        max_queue_delay_seconds=max_queue_delay_seconds,
+    )
+    controller = MemoryAdmissionController(limits)
+    monkeypatch.setattr(admission, "get_admission_controller", lambda: controller)
+    return controller
+
+
+def test_run_over_the_limits_is_delayed_to_its_slot(monkeypatch):
+    controller = _use_controller(monkeypatch, max_queue_delay_seconds=3600)
+    controller.admit("alice", "run-0")
+    value = {"run_id": "run-1"}
+    asyncio.run(auth.on_run_create(_run_context("alice"), value))
+    assert value["metadata"] == {"owner": "alice"}
+    assert value["after_seconds"] == pytest.approx(900, abs=5)
+
+
+def test_run_that_would_wait_too_long_gets_429_with_retry_after(monkeypatch):
+    controller = _use_controller(monkeypatch, max_queue_delay_seconds=600)
+    controller.admit("alice", "run-0")
+    value = {"run_id": "run-1"}
+    with pytest.raises(Auth.exceptions.HTTPException) as error:
+        asyncio.run(auth.on_run_create(_run_context("alice"), value))
+    assert error.value.status_code == 429
+    retry_after = int(error.value.headers["Retry-After"])
+    assert retry_after == pytest.approx(900 - 600, abs=5)
+    assert f"retry in {retry_after}s" in error.value.detail
+    assert "after_seconds" not in value
+
+
+def test_other_owners_are_not_held_back(monkeypatch):
+    controller = _use_controller(monkeypatch, max_queue_delay_seconds=600)
+    controller.admit("alice", "run-0")
+    value = {"run_id": "run-1"}
+    asyncio.run(auth.on_run_create(_run_context("bob"), value))
+    assert "after_seconds" not in value
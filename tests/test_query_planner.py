@@ -0,0 +1,115 @@
+"""Batch query planner: only color / pack-size siblings of one model share a query.
+
+Run with ``python -m pytest tests/test_query_planner.py``.
+"""
+
+import asyncio
+
+import pytest
+
+from open_deep_research.query_planner import (
+    BatchQueryPlanner,
+    model_tokens,
+    normalize_query,
+    variant_free_query,
+)
+
+
+def _plan(*queries, reference=None):
+    planner = BatchQueryPlanner()
+    for query in queries:
+        planner.add_queries("tavily_search_amazon", [query], reference=reference)
+    planner.finalize()
+    return planner
+
+
+def _canonical(planner, query):
+    return planner.canonical_query("tavily_search_amazon", query)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Acme Kettle AK-17 Red lot de 2 amazon", "acme kettle ak-17 amazon"),
+    ("Acme Kettle AK-17 pack of 3", "acme kettle ak-17"),
+    ("Acme Kettle AK-17 set x4", "acme kettle ak-17"),
+    ("Acme Kettle AK-17 2x pack", "acme kettle ak-17"),
+    ("Acme Kettle AK-17 6 pcs", "acme kettle ak-17"),
+    ("Lenovo ThinkPad X1 Carbon amazon", "lenovo thinkpad x1 carbon amazon"),
+    ("BMW X5", "bmw x5"),
+    ("Acme Cable 2x", "acme cable 2x"),
+])
+def test_variant_free_query_strips_only_keyworded_pack_sizes(query, expected):
+    assert variant_free_query(normalize_query(query)) == expected
+
+
+def test_model_tokens_skip_measures():
+    assert model_tokens("acme kettle ak-17 1.7l 2200w x13") == {"ak-17", "x13"}
+
+
+def test_model_codes_are_never_merged():
+    planner = _plan(
+        "Lenovo ThinkPad X1 Carbon amazon",
+        "Lenovo ThinkPad X13 Carbon amazon",
+        "BMW X5 Noir",
+        "BMW X3 Noir",
+    )
+    assert _canonical(planner, "Lenovo ThinkPad X1 Carbon amazon") == "lenovo thinkpad x1 carbon amazon"
+    assert _canonical(planner, "Lenovo ThinkPad X13 Carbon amazon") == "lenovo thinkpad x13 carbon amazon"
+    assert _canonical(planner, "BMW X5 Noir") == "bmw x5 noir"
+    assert _canonical(planner, "BMW X3 Noir") == "bmw x3 noir"
+    assert planner.variant_groups == 0
+
+
+def test_color_siblings_of_one_model_are_merged():
+    planner = _plan("Lenovo ThinkPad X1 Carbon Black", "Lenovo ThinkPad X1 Carbon Red lot de 2")
+    assert _canonical(planner, "Lenovo ThinkPad X1 Carbon Black") == "lenovo thinkpad x1 carbon"
+    assert _canonical(planner, "Lenovo ThinkPad X1 Carbon Red lot de 2") == "lenovo thinkpad x1 carbon"
+    assert planner.variant_groups == 1
+
+
+def test_queries_without_a_model_keep_their_color():
+    planner = _plan("Fiat 500 Rosso", "Fiat 500 Nero")
+    assert _canonical(planner, "Fiat 500 Rosso") == "fiat 500 rosso"
+    assert _canonical(planner, "Fiat 500 Nero") == "fiat 500 nero"
+
+
+def test_supplier_reference_anchors_the_merge():
+    planner = _plan("Fiat 500 Rosso", "Fiat 500 Nero", reference="500")
+    assert _canonical(planner, "Fiat 500 Rosso") == "fiat 500"
+    assert _canonical(planner, "Fiat 500 Nero") == "fiat 500"
+
+
+def test_domain_order_does_not_split_shared_results():
+    planner = _plan("Acme Kettle AK-17", "Acme Kettle AK-17")
+    calls = []
+
+    async def execute(query):
+        calls.append(query)
+        return {"results": [query]}
+
+    async def run():
+        first = await planner.search(
+            "tavily_search_amazon", "Acme Kettle AK-17", {"include_domains": ["amazon.fr", "amazon.de"]}, execute
+        )
+        second = await planner.search(
+            "tavily_search_amazon", "Acme Kettle AK-17", {"include_domains": ["amazon.de", "amazon.fr"]}, execute
+        )
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert len(calls) == 1
+    assert planner.snapshot()["queries_shared"] == 1
+
+
+def test_last_consumer_releases_every_parameter_variant():
+    planner = _plan("Acme Kettle AK-17", "Acme Kettle AK-17")
+
+    async def execute(query):
+        return {"results": [query]}
+
+    async def run():
+        await planner.search("tavily_search_amazon", "Acme Kettle AK-17", {"include_domains": ["amazon.fr"]}, execute)
+        await planner.search("tavily_search_amazon", "Acme Kettle AK-17", {"include_domains": ["amazon.de"]}, execute)
+
+    asyncio.run(run())
+    assert not planner._results